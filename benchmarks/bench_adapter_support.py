@@ -0,0 +1,84 @@
+# ruff: noqa: INP001, E402, T201
+
+import random
+import sys
+import types
+from timeit import timeit
+
+import nonebot
+
+nonebot.init(
+    localstore_cache_dir="temp/cache",
+    localstore_config_dir="temp/config",
+    localstore_data_dir="temp/data",
+)
+
+nonebot.require("nonebot_plugin_picmenu_next")
+
+from nonebot.adapters import Adapter
+from nonebot.adapters.satori import Adapter as SatoriAdapter
+
+from nonebot_plugin_picmenu_next.__main__ import (
+    AdapterSupportCache,
+    filter_unsupported_adapters,
+    is_plugin_supported_adapter,
+)
+from nonebot_plugin_picmenu_next.data_source.models import PMNPluginInfo
+
+ADAPTER_COUNT = 20
+PLUGIN_COUNT = 500
+ROUNDS = 5
+
+# fake adapters living in importable modules, like installed adapters would
+adapters: list[Adapter] = []
+for i in range(ADAPTER_COUNT):
+    module_name = f"nonebot.adapters.bench{i}"
+    module = types.ModuleType(module_name)
+    adapter_cls = type("Adapter", (SatoriAdapter,), {"__module__": module_name})
+    module.Adapter = adapter_cls  # pyright: ignore[reportAttributeAccessIssue]
+    sys.modules[module_name] = module
+    adapters.append(adapter_cls.__new__(adapter_cls))
+
+rand = random.Random(0)
+adapter_sets = [
+    {f"~bench{x}" for x in rand.sample(range(ADAPTER_COUNT), rand.randint(1, 4))}
+    for _ in range(12)
+]
+infos = [
+    PMNPluginInfo(
+        name=f"plugin {i}",
+        supported_adapters=rand.choice([None, *adapter_sets]),
+    )
+    for i in range(PLUGIN_COUNT)
+]
+
+
+def check_uncached():
+    for adapter in adapters:
+        for info in infos:
+            is_plugin_supported_adapter(info, adapter)
+
+
+def check_cached():
+    # one cache per snapshot, shared by every adapter of it
+    cache: AdapterSupportCache = {}
+    for adapter in adapters:
+        for info in infos:
+            is_plugin_supported_adapter(info, adapter, cache)
+
+
+def filter_uncached():
+    for adapter in adapters:
+        filter_unsupported_adapters(infos, adapter)
+
+
+def filter_cached():
+    cache: AdapterSupportCache = {}
+    for adapter in adapters:
+        filter_unsupported_adapters(infos, adapter, cache)
+
+
+print(f"{PLUGIN_COUNT} plugins, {ADAPTER_COUNT} adapters, {ROUNDS} rounds")
+for func in (check_uncached, check_cached, filter_uncached, filter_cached):
+    cost = timeit(func, number=ROUNDS) / ROUNDS
+    print(f"{func.__name__:>15}: {cost * 1000:.2f}ms per snapshot")
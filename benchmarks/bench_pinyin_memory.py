@@ -0,0 +1,72 @@
+# ruff: noqa: INP001, E402, T201
+
+import random
+import tracemalloc
+from dataclasses import dataclass
+
+import nonebot
+
+nonebot.init(
+    localstore_cache_dir="temp/cache",
+    localstore_config_dir="temp/config",
+    localstore_data_dir="temp/data",
+)
+
+nonebot.require("nonebot_plugin_picmenu_next")
+
+from nonebot_plugin_picmenu_next.data_source.pinyin import (
+    PinyinChunk,
+    PinyinChunkSequence,
+)
+
+NAME_COUNT = 10_000
+CHUNKS_PER_NAME = (2, 8)
+SYLLABLES = ("bang", "zhu", "cai", "dan", "tu", "pian", "cha", "xun", "she", "zhi")
+
+
+# the previous representation: a list of frozen dataclasses
+@dataclass(frozen=True, order=True)
+class DataclassChunk:
+    is_pinyin: bool
+    text: str
+    tone: int = 0
+
+
+def random_chunks(rng: random.Random) -> list[tuple[bool, str, int]]:
+    return [
+        (True, rng.choice(SYLLABLES), rng.randint(1, 5))
+        if rng.random() < 0.8
+        else (False, f"Plugin{rng.randint(0, 99)}", 0)
+        for _ in range(rng.randint(*CHUNKS_PER_NAME))
+    ]
+
+
+def measure(name: str, build) -> None:
+    rng = random.Random(0)
+    raws = [random_chunks(rng) for _ in range(NAME_COUNT)]
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    built = [build(x) for x in raws]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    size = sum(x.size_diff for x in after.compare_to(before, "filename"))
+    print(
+        f"{name}: {size / 1024:.1f} KiB for {len(built)} names"
+        f" ({size / len(built):.0f} B/name)",
+    )
+
+
+def main() -> None:
+    measure(
+        "list[dataclass]",
+        lambda raw: [DataclassChunk(*x) for x in raw],
+    )
+    measure(
+        "list[PinyinChunk]",
+        lambda raw: [PinyinChunk(*x) for x in raw],
+    )
+    measure("PinyinChunkSequence", PinyinChunkSequence)
+
+
+if __name__ == "__main__":
+    main()
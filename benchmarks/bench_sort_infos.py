@@ -0,0 +1,87 @@
+# ruff: noqa: INP001, E402, T201
+
+import random
+from bisect import insort
+from collections.abc import Callable
+from functools import partial
+from timeit import timeit
+from typing import Any
+
+import nonebot
+
+nonebot.init(
+    localstore_cache_dir="temp/cache",
+    localstore_config_dir="temp/config",
+    localstore_data_dir="temp/data",
+)
+
+nonebot.require("nonebot_plugin_picmenu_next")
+
+from nonebot_plugin_picmenu_next.data_source.collect import info_sort_key
+from nonebot_plugin_picmenu_next.data_source.models import PMNPluginInfo
+
+PLUGIN_COUNT = 5000
+INSERT_COUNT = 100
+ROUNDS = 5
+WORDS = (
+    "菜单",
+    "帮助",
+    "图片",
+    "查询",
+    "签到",
+    "天气",
+    "Plugin",
+    "Bot",
+    "工具",
+    "管理",
+)
+
+
+def chunk_key(info: PMNPluginInfo):
+    # the previous key, compared chunk by chunk through Python-level methods
+    return (list(info.name_pinyin), info.plugin_id or "")
+
+
+def make_infos(rng: random.Random, count: int) -> list[PMNPluginInfo]:
+    return [
+        PMNPluginInfo(
+            name="".join(rng.choices(WORDS, k=rng.randint(1, 3))),
+            plugin_id=f"plugin_{i}",
+        )
+        for i in range(count)
+    ]
+
+
+def splice(
+    ordered: list[PMNPluginInfo],
+    inserted: list[PMNPluginInfo],
+    key: Callable[[PMNPluginInfo], Any],
+) -> None:
+    spliced = ordered.copy()
+    for x in inserted:
+        insort(spliced, x, key=key)
+
+
+def main() -> None:
+    rng = random.Random(0)
+    infos = make_infos(rng, PLUGIN_COUNT)
+    inserted = make_infos(rng, INSERT_COUNT)
+    for x in (*infos, *inserted):
+        _ = x.name_pinyin, x.sort_key, chunk_key(x)
+
+    for name, key in (("chunk key", chunk_key), ("sort key", info_sort_key)):
+        shuffled = infos.copy()
+        elapsed = timeit(partial(sorted, shuffled, key=key), number=ROUNDS)
+        print(
+            f"sort {PLUGIN_COUNT} infos with {name}: {elapsed / ROUNDS * 1000:.2f}ms",
+        )
+
+        ordered = sorted(infos, key=key)
+        elapsed = timeit(partial(splice, ordered, inserted, key), number=ROUNDS)
+        print(
+            f"insort {INSERT_COUNT} infos with {name}: {elapsed / ROUNDS * 1000:.2f}ms",
+        )
+
+
+if __name__ == "__main__":
+    main()
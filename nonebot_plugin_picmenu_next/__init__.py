@@ -1,33 +1,49 @@
 # ruff: noqa: E402
 
-from nonebot import get_driver
-from nonebot.plugin import PluginMetadata, inherit_supported_adapters, require
-
-require("nonebot_plugin_localstore")
-require("nonebot_plugin_alconna")
-
-from . import __main__ as __main__
-from .config import ConfigModel
-from .data_source import refresh_infos
-from .templates import preload_builtin_templates
+from .utils import nonebot_initialized
 
 __version__ = "0.5.0"
-__plugin_meta__ = PluginMetadata(
-    name="PicMenu Next",
-    description="新一代的图片帮助插件",
-    usage="发送“帮助”查看所有所有插件功能",
-    type="application",
-    homepage="https://github.com/lgc-NB2Dev/nonebot-plugin-picmenu-next",
-    config=ConfigModel,
-    supported_adapters=inherit_supported_adapters("nonebot_plugin_alconna"),
-    extra={"License": "MIT", "Author": "LgCuwukii"},
-)
-
-preload_builtin_templates()
-
-driver = get_driver()
-
 
-@driver.on_startup
-async def _():
-    await refresh_infos()
+# tools such as the menu bundle compiler import the pure submodules without
+# a running NoneBot, only set up the plugin when loaded by NoneBot
+if nonebot_initialized():
+    from nonebot import get_driver
+    from nonebot.plugin import PluginMetadata, inherit_supported_adapters, require
+
+    require("nonebot_plugin_localstore")
+    require("nonebot_plugin_alconna")
+
+    from . import __main__ as __main__
+    from .config import ConfigModel, config
+    from .data_source import apply_external_info_changes, refresh_infos
+    from .data_source.watch import external_menu_watcher
+    from .templates import preload_builtin_templates, require_builtin_template_plugins
+
+    __plugin_meta__ = PluginMetadata(
+        name="PicMenu Next",
+        description="新一代的图片帮助插件",
+        usage="发送“帮助”查看所有所有插件功能",
+        type="application",
+        homepage="https://github.com/lgc-NB2Dev/nonebot-plugin-picmenu-next",
+        config=ConfigModel,
+        supported_adapters=inherit_supported_adapters("nonebot_plugin_alconna"),
+        extra={"License": "MIT", "Author": "LgCuwukii"},
+    )
+
+    require_builtin_template_plugins()
+
+    driver = get_driver()
+
+    @driver.on_startup
+    async def _():
+        preload_builtin_templates()
+        await refresh_infos(use_cache=config.info_cache)
+        if config.external_infos_watch_interval:
+            external_menu_watcher.start(
+                config.external_infos_watch_interval,
+                apply_external_info_changes,
+            )
+
+    @driver.on_shutdown
+    async def _stop_external_menu_watcher():
+        external_menu_watcher.stop()
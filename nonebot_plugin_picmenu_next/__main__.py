@@ -1,7 +1,9 @@
-from collections.abc import Sequence
+from collections.abc import Iterable, Mapping, Sequence
 from contextlib import suppress
+from dataclasses import dataclass, field
+from functools import cached_property
 from pathlib import Path
-from typing import TypeVar, overload
+from typing import TypeAlias, TypeVar, overload
 from typing_extensions import override
 
 from arclet.alconna import (
@@ -21,17 +23,25 @@ from nonebot.utils import resolve_dot_notation
 from nonebot_plugin_alconna import Extension, Query, add_global_extension, on_alconna
 from nonebot_plugin_alconna.extension import OutputType
 from nonebot_plugin_alconna.uniseg import UniMessage
-from thefuzz import process
 
 from .config import config
-from .data_source import get_infos
+from .data_source import get_collect_profile, get_infos
 from .data_source.alconna import (
     PMNMarkdownTextFormatter,
     generate_alconna_menu_item,
     get_alconna_plugin_id,
 )
-from .data_source.mixin import resolve_detail_mixin, resolve_main_mixin
+from .data_source.mixin import (
+    MixinContext,
+    has_main_mixins,
+    resolve_detail_mixin,
+    resolve_main_mixin,
+    use_mixin_context,
+)
 from .data_source.models import PinyinChunkSequence, PMDataItem, PMNPluginInfo
+from .data_source.profile import mixin_stats
+from .data_source.snapshot import InfoSnapshot
+from .markdown import md_render_cache, resource_b64_cache
 from .templates import detail_templates, func_detail_templates, index_templates
 
 RES_DIR = Path(__file__).parent / "res"
@@ -64,6 +74,20 @@ m_cls = on_alconna(
     use_cmd_start=True,
 )
 
+profile_alc = Alconna(
+    "help-profile",
+    meta=CommandMeta(
+        description="查看最近一次插件信息收集的耗时报告",
+        author="LgCuwukii",
+    ),
+)
+m_profile = on_alconna(
+    profile_alc,
+    aliases={"菜单耗时"},
+    permission=SUPERUSER,
+    use_cmd_start=True,
+)
+
 
 def get_name_similarities(
     query: str,
@@ -73,6 +97,8 @@ def get_name_similarities(
     raw_weight: float = 0.6,
     pinyin_weight: float = 0.4,
 ) -> list[float]:
+    from thefuzz import process
+
     raw_scores = [x[1] for x in process.extractWithoutOrder(query, choices)]
     pinyin_scores = [
         x[1] for x in process.extractWithoutOrder(query_pinyin, choices_pinyin)
@@ -99,6 +125,30 @@ def get_name_similarities(
     return similarities
 
 
+@dataclass(frozen=True)
+class SearchChoices:
+    """模糊搜索使用的名称数组与其拼音数组"""
+
+    raw: list[str]
+    pinyin: list[str]
+
+    @classmethod
+    def from_infos(cls, infos: Iterable[PMNPluginInfo]):
+        self = cls([], [])
+        for info in infos:
+            self.raw.append(info.casefold_name)
+            self.pinyin.append(info.name_pinyin.casefold_str)
+        return self
+
+    @classmethod
+    def from_functions(cls, pm_data: Iterable[PMDataItem]):
+        self = cls([], [])
+        for data in pm_data:
+            self.raw.append(data.casefold_func)
+            self.pinyin.append(data.func_pinyin.casefold_str)
+        return self
+
+
 def handle_query_index(query: str, infos: Sequence[T]) -> tuple[int, T] | None:
     if query.isdigit() and query.strip("0"):
         return (
@@ -113,21 +163,17 @@ async def query_plugin(
     infos: list[PMNPluginInfo],
     query: str,
     score_cutoff: float = 60,
+    choices: SearchChoices | None = None,
 ) -> tuple[int, PMNPluginInfo] | None:
     if r := handle_query_index(query, infos):
         return r
 
-    choices: list[str] = []
-    choices_pinyin: list[str] = []
-    for info in infos:
-        choices.append(info.casefold_name)
-        choices_pinyin.append(info.name_pinyin.casefold_str)
-
+    choices = choices or SearchChoices.from_infos(infos)
     similarities = get_name_similarities(
         query.casefold(),
         PinyinChunkSequence.from_raw(query).casefold_str,
-        choices,
-        choices_pinyin,
+        choices.raw,
+        choices.pinyin,
     )
     i, s = max(enumerate(similarities), key=lambda x: x[1])
     if s >= score_cutoff:
@@ -139,21 +185,17 @@ async def query_func_detail(
     pm_data: list[PMDataItem],
     query: str,
     score_cutoff: float = 60,
+    choices: SearchChoices | None = None,
 ) -> tuple[int, PMDataItem] | None:
     if r := handle_query_index(query, pm_data):
         return r
 
-    choices: list[str] = []
-    choices_pinyin: list[str] = []
-    for data in pm_data:
-        choices.append(data.casefold_func)
-        choices_pinyin.append(data.func_pinyin.casefold_str)
-
+    choices = choices or SearchChoices.from_functions(pm_data)
     similarities = get_name_similarities(
         query.casefold(),
         PinyinChunkSequence.from_raw(query).casefold_str,
-        choices,
-        choices_pinyin,
+        choices.raw,
+        choices.pinyin,
     )
     i, s = max(enumerate(similarities), key=lambda x: x[1])
     if s >= score_cutoff:
@@ -162,18 +204,35 @@ async def query_func_detail(
 
 
 def filter_hidden_functions(info: PMNPluginInfo) -> PMNPluginInfo:
-    if not info.pm_data:
+    if (not info.pm_data) or not any(x.hidden for x in info.pm_data):
         return info
     return model_copy(
         info, update={"pm_data": [x for x in info.pm_data if not x.hidden]}
     )
 
 
-def is_plugin_supported_adapter(info: PMNPluginInfo, adapter: BaseAdapter) -> bool:
-    if (supported_adapters := info.supported_adapters) is None:
-        return True
+@dataclass(frozen=True)
+class FunctionView:
+    """插件详情请求看到的插件信息，以及其功能列表的搜索数组"""
+
+    info: PMNPluginInfo
+    choices: SearchChoices
+
+    @classmethod
+    def build(cls, info: PMNPluginInfo, show_hidden: bool):
+        if not show_hidden:
+            info = filter_hidden_functions(info)
+        return cls(info=info, choices=SearchChoices.from_functions(info.pm_data or ()))
 
-    current_module = type(adapter).__module__
+
+AdapterSupportCache: TypeAlias = dict[tuple[type[BaseAdapter], frozenset[str]], bool]
+
+
+def is_adapter_class_supported(
+    adapter_cls: type[BaseAdapter],
+    supported_adapters: Iterable[str],
+) -> bool:
+    current_module = adapter_cls.__module__
     for supported_adapter in supported_adapters:
         module, _, _ = supported_adapter.partition(":")
         if module.startswith("~"):
@@ -187,18 +246,44 @@ def is_plugin_supported_adapter(info: PMNPluginInfo, adapter: BaseAdapter) -> bo
                 "Adapter",
                 "nonebot.adapters.",
             )
-            if isinstance(adapter_class, type) and isinstance(adapter, adapter_class):
+            if isinstance(adapter_class, type) and issubclass(
+                adapter_cls,
+                adapter_class,
+            ):
                 return True
     return False
 
 
+def is_plugin_supported_adapter(
+    info: PMNPluginInfo,
+    adapter: BaseAdapter,
+    cache: AdapterSupportCache | None = None,
+) -> bool:
+    """
+    判断插件是否支持指定适配器。
+
+    传入 `cache` 时会以 (适配器类型, 支持的适配器集合) 为键缓存判断结果。
+    """
+
+    if (supported_adapters := info.supported_adapters) is None:
+        return True
+    if cache is None:
+        return is_adapter_class_supported(type(adapter), supported_adapters)
+
+    key = (type(adapter), frozenset(supported_adapters))
+    if (supported := cache.get(key)) is None:
+        supported = cache[key] = is_adapter_class_supported(*key)
+    return supported
+
+
 def filter_unsupported_adapters(
-    infos: list[PMNPluginInfo],
+    infos: Sequence[PMNPluginInfo],
     adapter: BaseAdapter,
+    cache: AdapterSupportCache | None = None,
 ) -> list[PMNPluginInfo]:
     return [
         info
-        if is_plugin_supported_adapter(info, adapter)
+        if is_plugin_supported_adapter(info, adapter, cache)
         else model_copy(
             info, update={"pmn": model_copy(info.pmn, update={"hidden": True})}
         )
@@ -206,6 +291,86 @@ def filter_unsupported_adapters(
     ]
 
 
+@dataclass(frozen=True)
+class InfoView:
+    """菜单请求看到的插件信息列表，以及插件 ID 到列表下标的映射"""
+
+    infos: list[PMNPluginInfo]
+    indexes: Mapping[str, int]
+    _function_views: dict[tuple[int, bool], FunctionView] = field(
+        default_factory=dict,
+        init=False,
+        repr=False,
+    )
+
+    @classmethod
+    def build(cls, infos: list[PMNPluginInfo]):
+        indexes: dict[str, int] = {}
+        for i, info in enumerate(infos):
+            if info.plugin_id:
+                indexes.setdefault(info.plugin_id, i)
+        return cls(infos=infos, indexes=indexes)
+
+    @cached_property
+    def choices(self) -> SearchChoices:
+        return SearchChoices.from_infos(self.infos)
+
+    def find(self, plugin_id: str) -> tuple[int, PMNPluginInfo] | None:
+        if (i := self.indexes.get(plugin_id)) is None:
+            return None
+        return i, self.infos[i]
+
+    def function_view(self, index: int, show_hidden: bool) -> FunctionView:
+        """获取指定下标插件的功能视图，随视图一同缓存"""
+
+        key = (index, show_hidden)
+        if key not in self._function_views:
+            self._function_views[key] = FunctionView.build(
+                self.infos[index],
+                show_hidden,
+            )
+        return self._function_views[key]
+
+
+def get_adapter_view(
+    snapshot: InfoSnapshot,
+    adapter: BaseAdapter,
+    show_hidden: bool,
+) -> InfoView:
+    """
+    获取快照在指定适配器下的插件信息视图，按 (适配器类型, 是否显示隐藏) 缓存在快照上。
+
+    不支持当前适配器的插件会被标记为隐藏，`show_hidden` 为假时隐藏的插件会被移除。
+    """
+
+    def build() -> InfoView:
+        if show_hidden:
+            cache = snapshot.derive("adapter_support", AdapterSupportCache)
+            return InfoView.build(
+                filter_unsupported_adapters(snapshot, adapter, cache),
+            )
+        infos = get_adapter_view(snapshot, adapter, show_hidden=True).infos
+        return InfoView.build([x for x in infos if not x.pmn.hidden])
+
+    return snapshot.derive(("adapter_view", type(adapter), show_hidden), build)
+
+
+async def resolve_menu_view(
+    snapshot: InfoSnapshot,
+    adapter: BaseAdapter,
+    show_hidden: bool,
+) -> InfoView:
+    if not has_main_mixins():
+        return get_adapter_view(snapshot, adapter, show_hidden)
+
+    # mixins may change hidden state, so hidden infos are removed after them
+    infos = get_adapter_view(snapshot, adapter, show_hidden=True).infos
+    infos = await resolve_main_mixin(infos)
+    if not show_hidden:
+        infos = [x for x in infos if not x.pmn.hidden]
+    return InfoView.build(infos)
+
+
 async def can_user_see_hidden(bot: BaseBot, ev: BaseEvent) -> bool:
     if not config.only_superuser_see_hidden:
         return True
@@ -249,21 +414,25 @@ async def render_menu(
     alc_detail_des: str | None = None,
     show_hidden: bool = False,
 ) -> tuple[UniMessage | None, PMNPluginInfo | None, PMDataItem | None]:
-    infos = filter_unsupported_adapters(get_infos(), bot.adapter)
-    infos = await resolve_main_mixin(infos)
-    if not show_hidden:
-        infos = [x for x in infos if not x.pmn.hidden]
+    snapshot = get_infos()
+    mixin_context = MixinContext(
+        generation=snapshot.generation,
+        bot=bot,
+        event=ev,
+        show_hidden=show_hidden,
+    )
+    with use_mixin_context(mixin_context):
+        view = await resolve_menu_view(snapshot, bot.adapter, show_hidden)
+    infos = view.infos
     if not infos:
         return None, None, None
 
     user_can_see_hidden = await can_user_see_hidden(bot, ev) if show_hidden else None
 
     if plugin_id:
-        r = next(
-            ((i, x) for i, x in enumerate(infos) if x.plugin_id == plugin_id), None
-        )
+        r = view.find(plugin_id)
     elif q_plugin:
-        r = await query_plugin(infos, q_plugin)
+        r = await query_plugin(infos, q_plugin, choices=view.choices)
     else:
         return (
             await index_templates.get()(infos, show_hidden, user_can_see_hidden),
@@ -274,10 +443,10 @@ async def render_menu(
     if not r:
         return None, None, None
 
-    info_index, info = r
-    if not show_hidden:
-        info = filter_hidden_functions(info)
-    info = await resolve_detail_mixin(info)
+    info_index, _ = r
+    func_view = view.function_view(info_index, show_hidden)
+    with use_mixin_context(mixin_context):
+        info = await resolve_detail_mixin(func_view.info)
 
     if (not q_function) and (not alc_cmd_id):
         return (
@@ -300,7 +469,12 @@ async def render_menu(
         pm_data = info.pm_data
         if not pm_data:
             return None, info, None
-        r = await query_func_detail(pm_data, q_function)
+        r = await query_func_detail(
+            pm_data,
+            q_function,
+            # detail mixins may replace functions, their search arrays are then stale
+            choices=(func_view.choices if pm_data is func_view.info.pm_data else None),
+        )
 
     if not r:
         return None, info, None
@@ -373,6 +547,20 @@ async def _(
     ).finish(reply_to=True)
 
 
+@m_profile.handle()
+async def _handle_profile():
+    if not (profile := get_collect_profile()):
+        await UniMessage.text("还没有收集过插件信息呢……").finish(reply_to=True)
+    report = profile.format_report()
+    if mixin_stats.timings:
+        report = f"{report}\n{mixin_stats.format_report()}"
+    if md_render_cache.hits or md_render_cache.misses:
+        report = f"{report}\n{md_render_cache.format_report()}"
+    if resource_b64_cache.hits or resource_b64_cache.misses:
+        report = f"{report}\n{resource_b64_cache.format_report()}"
+    await UniMessage.text(report).finish(reply_to=True)
+
+
 # Alconna formats `-h/--help` before `output_converter`, and that converter does
 # not receive the current Arparma. To avoid reparsing help text, replace the
 # command formatter with PicMenu's markdown formatter before parsing. `post_init`
@@ -396,8 +584,7 @@ class PMNHelpExtension(Extension):
         plugin_id = get_alconna_plugin_id(self.command)
         if not plugin_id:
             return
-        info = next((x for x in get_infos() if x.plugin_id == plugin_id), None)
-        if info is None:
+        if (info := get_infos().get(plugin_id)) is None:
             return
         self._formatter_checked = True
         if (nm := (not info.pmn.markdown)) or (
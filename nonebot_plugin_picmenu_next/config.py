@@ -1,18 +1,27 @@
 from pathlib import Path
 
-from cookit.nonebot.localstore import ensure_localstore_path_config
 from cookit.pyd import model_with_alias_generator
 from nonebot import get_plugin_config
-from nonebot_plugin_localstore import get_plugin_config_dir
 from pydantic import BaseModel
 
-ensure_localstore_path_config()
+from .utils import nonebot_initialized
 
-config_dir = get_plugin_config_dir()
+if nonebot_initialized():
+    from cookit.nonebot.localstore import ensure_localstore_path_config
+    from nonebot_plugin_localstore import get_plugin_cache_dir, get_plugin_config_dir
+
+    ensure_localstore_path_config()
+
+    config_dir = get_plugin_config_dir()
+    cache_dir = get_plugin_cache_dir()
+    external_infos_dir = config_dir / "external_infos"
+    external_infos_dir.mkdir(parents=True, exist_ok=True)
+else:
+    # imported by tools without a running NoneBot, which never use these dirs
+    config_dir = cache_dir = Path.cwd()
+    external_infos_dir = config_dir / "external_infos"
 
 pm_menus_dir = Path.cwd() / "menu_config/menus"
-external_infos_dir = config_dir / "external_infos"
-external_infos_dir.mkdir(parents=True, exist_ok=True)
 
 
 @model_with_alias_generator(lambda x: f"pmn_{x}")
@@ -22,9 +31,20 @@ class ConfigModel(BaseModel):
     func_detail_template: str = "default"
     only_superuser_see_hidden: bool = False
     alconna_global_ext: bool = False
-
-
-config: ConfigModel = get_plugin_config(ConfigModel)
+    version_import_fallback: bool = False
+    collect_workers: int | None = None
+    collect_timeout: float | None = 10
+    info_cache: bool = False
+    external_infos_watch_interval: float | None = None
+    mixin_slow_threshold: float | None = 0.5
+    mixin_timeout: float | None = None
+    prerender_html: bool = False
+    resource_b64_max_size: int | None = 1024 * 1024
+
+
+config: ConfigModel = (
+    get_plugin_config(ConfigModel) if nonebot_initialized() else ConfigModel()
+)
 
 
 def version():
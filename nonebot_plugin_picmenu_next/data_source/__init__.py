@@ -1,22 +1,229 @@
-from nonebot import get_loaded_plugins as _get_loaded_plugins
+from asyncio import Lock as _Lock, wait_for as _wait_for
+from bisect import insort as _insort
+from collections.abc import Iterable as _Iterable
 
-from .collect import collect_plugin_infos as _collect_plugin_infos
-from .models import PMNPluginInfo as _PMNPluginInfoRaw
+from cookit.loguru import warning_suppress as _warning_suppress
+from nonebot import (
+    get_loaded_plugins as _get_loaded_plugins,
+    get_plugin as _get_plugin,
+    logger as _logger,
+)
 
-_infos: list[_PMNPluginInfoRaw] = []
+from ..config import config as _config
+from .cache import (
+    compute_info_fingerprint as _compute_info_fingerprint,
+    load_info_cache as _load_info_cache,
+    save_info_cache as _save_info_cache,
+)
+from .collect import (
+    CollectState as _CollectState,
+    build_plugin_info as _build_plugin_info,
+    collect_plugin_infos as _collect_plugin_infos,
+    get_dist as _get_dist,
+    get_info_from_plugin as _get_info_from_plugin,
+    get_version_attr as _get_version_attr,
+    info_sort_key as _info_sort_key,
+)
+from .models import (
+    ExternalPluginInfo as _ExternalPluginInfo,
+    PMNPluginInfo as _PMNPluginInfoRaw,
+)
+from .profile import CollectProfile as _CollectProfile
+from .snapshot import InfoSnapshot as _InfoSnapshot
 
+_infos = _InfoSnapshot()
+_collect_state: _CollectState | None = None
+_collect_profile: _CollectProfile | None = None
+_refresh_lock = _Lock()
 
-def get_infos() -> list[_PMNPluginInfoRaw]:
+
+def get_infos() -> _InfoSnapshot:
+    """获取当前发布的插件信息快照"""
     return _infos
 
 
-async def refresh_infos() -> list[_PMNPluginInfoRaw]:
-    global _infos
+def get_collect_profile() -> _CollectProfile | None:
+    """获取最近一次完整收集插件信息的耗时记录"""
+    return _collect_profile
+
+
+def _splice_infos(
+    infos: _InfoSnapshot,
+    plugin_ids: set[str],
+    updated: list[_PMNPluginInfoRaw],
+) -> _InfoSnapshot:
+    spliced = [x for x in infos if x.plugin_id not in plugin_ids]
+    for x in updated:
+        _insort(spliced, x, key=_info_sort_key)
+    return _InfoSnapshot.build(spliced)
+
 
-    _infos = await _collect_plugin_infos(_get_loaded_plugins())
+def _forget_plugin_modules(module_name: str) -> None:
+    _get_dist.cache_discard(module_name)
+    _get_version_attr.cache_discard(module_name)
 
+
+def _on_infos_updated(
+    infos: _Iterable[_PMNPluginInfoRaw],
+    previous: _InfoSnapshot | None = None,
+    changed_ids: _Iterable[str] = (),
+):
+    from ..markdown import clear_prp_caches, md_render_cache
     from ..templates import preload_builtin_templates_from_infos
 
-    preload_builtin_templates_from_infos(_infos)
+    # rendered plugin resource paths depend on files that may have changed,
+    # an incremental update only affects the changed plugins
+    if previous is None:
+        clear_prp_caches()
+        md_render_cache.clear()
+    else:
+        changed = set(changed_ids)
+        clear_prp_caches(changed)
+        md_render_cache.discard_plugins(changed)
+    preload_builtin_templates_from_infos(infos)
+
+    if _config.prerender_html:
+        from ..templates.jj_utils import prerender_snapshot
+
+        with _warning_suppress("Failed to prerender menu HTML fragments"):
+            prerender_snapshot(_infos, previous, changed_ids)
+
+
+async def refresh_infos(use_cache: bool = False) -> _InfoSnapshot:
+    """
+    重新收集所有插件信息。
+
+    开启 `info_cache` 配置时会将收集结果按输入指纹缓存，
+    `use_cache` 为真且指纹一致时直接复用缓存，跳过完整收集。
+    有插件收集失败时不会写入缓存。
+    """
+
+    global _infos, _collect_state, _collect_profile
+
+    async with _refresh_lock:
+        plugins = _get_loaded_plugins()
+        profile = _CollectProfile()
+
+        fingerprint = None
+        if _config.info_cache:
+            with (
+                profile.stage("fingerprint"),
+                _warning_suppress("Failed to compute plugin info fingerprint"),
+            ):
+                fingerprint = _compute_info_fingerprint(plugins)
+
+        infos = None
+        if use_cache and fingerprint:
+            with profile.stage("load_info_cache"):
+                infos = _load_info_cache(fingerprint)
+        state = None
+        if infos is None:
+            state = _CollectState()
+            infos = await _collect_plugin_infos(plugins, state, profile)
+            if fingerprint and state.failed_plugin_ids:
+                # a transient failure must not be reused on later startups
+                _logger.warning(
+                    "Some plugins failed to collect, skipped saving info cache: "
+                    + ", ".join(sorted(state.failed_plugin_ids)),
+                )
+            elif fingerprint:
+                with profile.stage("save_info_cache"):
+                    _save_info_cache(fingerprint, infos)
+        profile.finish()
+        _infos = _InfoSnapshot.build(infos)
+        _collect_state = state
+        _collect_profile = profile
+
+    _on_infos_updated(_infos)
+    return _infos
+
+
+async def apply_external_info_changes(
+    changes: dict[str, _ExternalPluginInfo | None],
+) -> _InfoSnapshot:
+    """
+    只为外部菜单配置发生变化的插件 ID 重新合并信息，并发布替换后的新快照。
+
+    当前插件信息来自缓存而没有收集中间结果时，回退为完整收集。
+    """
+
+    global _infos
+
+    async with _refresh_lock:
+        # checked under the lock, a concurrent full refresh may replace the state
+        if (state := _collect_state) is not None:
+            for k, v in changes.items():
+                if v is None:
+                    state.external_infos.pop(k, None)
+                else:
+                    state.external_infos[k] = v
+
+            updated: list[_PMNPluginInfoRaw] = []
+            for k in changes:
+                with _warning_suppress(f"Failed to rebuild plugin info of {k}"):
+                    updated.extend(
+                        await _build_plugin_info(
+                            k,
+                            state.base_infos.get(k),
+                            state.external_infos.get(k),
+                        ),
+                    )
+
+            previous = _infos
+            _infos = _splice_infos(_infos, set(changes), updated)
+
+    if state is None:
+        return await refresh_infos()
+
+    _on_infos_updated(updated, previous, changes)
+    return _infos
+
+
+async def refresh_plugin_info(plugin_id: str) -> _InfoSnapshot:
+    """
+    只重新收集单个插件的信息，按排序位置替换后发布新快照。
+
+    适用于晚于启动加载、或在运行时修改了 Metadata 的插件。
+    收集出错或超时时保留该插件之前的信息，插件已不再加载时才将其移除；
+    当前插件信息来自缓存而没有收集中间结果时，回退为完整收集。
+    """
+
+    global _infos
+
+    async with _refresh_lock:
+        # checked under the lock, a concurrent full refresh may replace the state
+        if (state := _collect_state) is not None:
+            base_info = None
+            if plugin := _get_plugin(plugin_id):
+                # only drop lookups of this plugin's modules, before and after
+                # collecting so the refreshed info is never built from stale data
+                _forget_plugin_modules(plugin.module_name)
+                with _warning_suppress(f"Failed to get plugin info of {plugin_id}"):
+                    base_info = await _wait_for(
+                        _get_info_from_plugin(plugin),
+                        _config.collect_timeout,
+                    )
+                _forget_plugin_modules(plugin.module_name)
+                if base_info is None:
+                    # a transient failure, keep the plugin's current menu entry
+                    return _infos
+                state.base_infos[plugin_id] = base_info
+            else:
+                state.base_infos.pop(plugin_id, None)
+
+            updated: list[_PMNPluginInfoRaw] = []
+            with _warning_suppress(f"Failed to rebuild plugin info of {plugin_id}"):
+                updated = await _build_plugin_info(
+                    plugin_id,
+                    base_info,
+                    state.external_infos.get(plugin_id),
+                )
+
+            previous = _infos
+            _infos = _splice_infos(_infos, {plugin_id}, updated)
+
+    if state is None:
+        return await refresh_infos()
 
+    _on_infos_updated(updated, previous, (plugin_id,))
     return _infos
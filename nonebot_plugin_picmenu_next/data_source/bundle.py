@@ -0,0 +1,41 @@
+"""
+将目录中的外部菜单文件编译为单个合集文件，不需要启动 NoneBot。
+
+用法：`python -m nonebot_plugin_picmenu_next.data_source.bundle <目录> [输出文件]`
+"""
+
+import argparse
+from collections.abc import Sequence
+from pathlib import Path
+
+from cookit.pyd import type_dump_json
+
+from .collect import MENU_BUNDLE_SUFFIX, compile_menu_bundle
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="picmenu-next-compile-bundle",
+        description="Compile a directory of PicMenu Next external menu files"
+        " into a single bundle file",
+    )
+    parser.add_argument("source", type=Path, help="directory of menu files")
+    parser.add_argument(
+        "output",
+        type=Path,
+        nargs="?",
+        help=f"output file, defaults to <source>{MENU_BUNDLE_SUFFIX} next to it",
+    )
+    args = parser.parse_args(argv)
+    if not args.source.is_dir():
+        parser.error(f"{args.source} is not a directory")
+
+    source: Path = args.source
+    output: Path = args.output or source.with_name(source.name + MENU_BUNDLE_SUFFIX)
+    bundle = compile_menu_bundle(source)
+    output.write_text(type_dump_json(bundle, by_alias=True, exclude_unset=True), "u8")
+    print(f"Compiled {len(bundle.infos)} menus into {output}")  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+import hashlib
+import json
+import os
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any
+
+from arclet.alconna import command_manager
+from cookit.loguru import warning_suppress
+from cookit.pyd import PYDANTIC_V2, type_dump_json, type_validate_json
+from nonebot import logger
+from nonebot.plugin import Plugin
+from pydantic import Field
+
+from ..config import cache_dir, config, version
+from .alconna import get_alconna_plugin_id
+from .collect import get_dist, get_version_attr, scan_menu_files
+from .mixin import plugin_collect_mixins
+from .models import CompatModel, PMNPluginInfo
+
+info_cache_path = cache_dir / "infos.json"
+
+
+class InfoCacheItem(CompatModel):
+    info: PMNPluginInfo
+    alc_cmd_ids: list[str | None] = Field(default_factory=list)
+
+
+class InfoCache(CompatModel):
+    fingerprint: str
+    items: list[InfoCacheItem]
+
+
+def _dumps(data: Any) -> str:
+    return json.dumps(data, ensure_ascii=False, sort_keys=True, default=str)
+
+
+def _plugin_fingerprint(plugin: Plugin) -> dict[str, Any]:
+    meta = plugin.metadata
+    dist = get_dist(plugin.module_name)
+    return {
+        "id": plugin.id_,
+        "module": plugin.module_name,
+        "version": get_version_attr(plugin.module_name),
+        "dist_version": dist.version if dist else None,
+        "metadata": (
+            {
+                "name": meta.name,
+                "description": meta.description,
+                "usage": meta.usage,
+                "type": meta.type,
+                "supported_adapters": sorted(meta.supported_adapters or ()),
+                "extra": _dumps(meta.extra),
+            }
+            if meta
+            else None
+        ),
+    }
+
+
+def _external_files_fingerprint() -> list[tuple[str, int, int]]:
+    files: list[tuple[str, int, int]] = []
+    for path in scan_menu_files():
+        with warning_suppress(f"Failed to stat external menu file {path}", OSError):
+            stat = path.stat()
+            files.append((str(path), stat.st_mtime_ns, stat.st_size))
+    return files
+
+
+def _alconna_fingerprint() -> list[tuple[Any, ...]]:
+    return sorted(
+        (
+            command.path,
+            get_alconna_plugin_id(command) or "",
+            command_manager.is_disable(command),
+            command.get_help(),
+            _dumps(command.meta.extra.get("pmn")),
+        )
+        for command in command_manager.get_commands()
+    )
+
+
+def _collect_mixins_fingerprint() -> list[tuple[Any, ...]]:
+    return [
+        (
+            x.priority,
+            x.source.module_name if x.source else None,
+            x.source.lineno if x.source else None,
+        )
+        for x in plugin_collect_mixins.data
+    ]
+
+
+def compute_info_fingerprint(plugins: Iterable[Plugin]) -> str:
+    """
+    计算当前插件信息收集输入的指纹。
+
+    包含已加载插件及其版本与 Metadata、外部菜单文件的修改时间与大小、
+    Alconna 命令集、收集阶段 Mixin 以及本插件版本。
+    """
+
+    data = {
+        "picmenu_version": version(),
+        "pydantic_v2": PYDANTIC_V2,
+        "version_import_fallback": config.version_import_fallback,
+        "plugins": sorted(
+            (_plugin_fingerprint(x) for x in plugins),
+            key=lambda x: x["id"],
+        ),
+        "external_files": _external_files_fingerprint(),
+        "alconna_commands": _alconna_fingerprint(),
+        "collect_mixins": _collect_mixins_fingerprint(),
+    }
+    return hashlib.sha256(_dumps(data).encode()).hexdigest()
+
+
+def load_info_cache(
+    fingerprint: str,
+    path: Path | None = None,
+) -> list[PMNPluginInfo] | None:
+    path = path or info_cache_path
+    if not path.exists():
+        return None
+
+    with warning_suppress(f"Failed to load plugin info cache {path}"):
+        cache = type_validate_json(InfoCache, path.read_text("u8"))
+        if cache.fingerprint != fingerprint:
+            logger.debug("Plugin info cache fingerprint mismatched, ignoring")
+            return None
+
+        infos: list[PMNPluginInfo] = []
+        for item in cache.items:
+            for data, cmd_id in zip(item.info.pm_data or (), item.alc_cmd_ids):
+                data._alc_cmd_id = cmd_id  # noqa: SLF001
+            infos.append(item.info)
+        logger.success(f"Loaded {len(infos)} plugin infos from cache")
+        return infos
+    return None
+
+
+def save_info_cache(
+    fingerprint: str,
+    infos: Iterable[PMNPluginInfo],
+    path: Path | None = None,
+) -> None:
+    path = path or info_cache_path
+    cache = InfoCache(
+        fingerprint=fingerprint,
+        items=[
+            InfoCacheItem(
+                info=x,
+                alc_cmd_ids=[d.alc_cmd_id for d in x.pm_data or ()],
+            )
+            for x in infos
+        ],
+    )
+    with warning_suppress(f"Failed to save plugin info cache {path}"):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # write to a temp file first, an interrupted write must not leave
+        # a truncated cache that would be loaded on the next startup
+        temp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        try:
+            temp_path.write_text(type_dump_json(cache, by_alias=True), "u8")
+            os.replace(temp_path, path)
+        finally:
+            temp_path.unlink(missing_ok=True)
@@ -1,21 +1,45 @@
+import ast
 import asyncio
 import importlib
-from collections.abc import Generator, Iterable
+import os
+import sys
+import threading
+from collections.abc import Callable, Generator, Iterable
+from concurrent.futures import Executor, ThreadPoolExecutor
 from contextlib import suppress
-from functools import lru_cache
+from dataclasses import dataclass, field
+from functools import update_wrapper
+from importlib.machinery import PathFinder
 from importlib.metadata import Distribution, PackageNotFoundError, distribution
+from itertools import repeat
 from pathlib import Path
+from typing import Generic, TypeVar
 
 from cookit.loguru import warning_suppress
-from cookit.pyd import model_fields_set, type_validate_json, type_validate_python
+from cookit.pyd import (
+    model_copy,
+    model_fields_set,
+    type_validate_json,
+    type_validate_python,
+)
 from nonebot import logger
 from nonebot.plugin import Plugin
 
-from ..config import external_infos_dir, pm_menus_dir
+from ..config import config, external_infos_dir, pm_menus_dir
 from ..utils import normalize_plugin_name
 from .alconna import apply_alconna_command_infos, collect_alconna_detect_plugin_ids
+from .menu_cache import MenuFileCache
 from .mixin import chain_mixins, plugin_collect_mixins
-from .models import ExternalPluginInfo, PMNData, PMNPluginExtra, PMNPluginInfo
+from .models import (
+    ExternalPluginInfo,
+    ExternalPluginInfoBundle,
+    PMNData,
+    PMNPluginExtra,
+    PMNPluginInfo,
+)
+from .profile import CollectProfile
+
+T = TypeVar("T")
 
 
 def normalize_metadata_user(info: str, allow_multi: bool = False) -> str:
@@ -25,7 +49,28 @@ def normalize_metadata_user(info: str, allow_multi: bool = False) -> str:
     return " & ".join(x.split("<")[0].strip().strip("'\"") for x in infos)
 
 
-@lru_cache
+class ModuleCache(Generic[T]):
+    """按模块名缓存函数结果，可只让单个模块及其父包的结果失效"""
+
+    def __init__(self, func: Callable[[str], T]) -> None:
+        self.func = func
+        self.items: dict[str, T] = {}
+        update_wrapper(self, func)
+
+    def __call__(self, module_name: str) -> T:
+        if module_name not in self.items:
+            self.items[module_name] = self.func(module_name)
+        return self.items[module_name]
+
+    def cache_clear(self) -> None:
+        self.items.clear()
+
+    def cache_discard(self, module_name: str) -> None:
+        for name in iter_module_parents(module_name):
+            self.items.pop(name, None)
+
+
+@ModuleCache
 def get_dist(module_name: str) -> Distribution | None:
     with (
         warning_suppress(
@@ -40,22 +85,99 @@ def get_dist(module_name: str) -> Distribution | None:
     return get_dist(module_name)
 
 
-@lru_cache
-def get_version_attr(module_name: str) -> str | None:
+def iter_module_parents(module_name: str) -> Generator[str]:
+    yield module_name
+    while "." in module_name:
+        module_name = module_name.rsplit(".", 1)[0]
+        yield module_name
+
+
+def find_module_source(module_name: str) -> Path | None:
+    """在不导入模块（及其父包）的情况下查找模块源码文件"""
+
+    search_path: list[str] | None = None
+    spec = None
+    parts = module_name.split(".")
+    for i in range(len(parts)):
+        name = ".".join(parts[: i + 1])
+        if (m := sys.modules.get(name)) is not None:
+            spec = getattr(m, "__spec__", None)
+        else:
+            spec = PathFinder.find_spec(name, search_path)
+        if spec is None:
+            return None
+        search_path = (
+            list(spec.submodule_search_locations)
+            if spec.submodule_search_locations is not None
+            else None
+        )
+        if search_path is None and i < len(parts) - 1:
+            return None
+
+    origin = spec.origin if spec else None
+    return Path(origin) if origin and origin.endswith(".py") else None
+
+
+def parse_version_attr(source: str) -> str | None:
+    ver = None
+    for node in ast.parse(source).body:
+        if isinstance(node, ast.Assign):
+            targets = node.targets
+        elif isinstance(node, ast.AnnAssign) and node.value is not None:
+            targets = [node.target]
+        else:
+            continue
+        if (
+            any(isinstance(x, ast.Name) and x.id == "__version__" for x in targets)
+            and isinstance(node.value, ast.Constant)
+            and isinstance(node.value.value, str)
+        ):
+            ver = node.value.value
+    return ver
+
+
+def get_version_attr_no_import(module_name: str) -> str | None:
+    if (m := sys.modules.get(module_name)) is not None:
+        return getattr(m, "__version__", None)
+    with (
+        warning_suppress(f"Unexpected error happened when parsing {module_name}"),
+        suppress(ImportError, OSError, SyntaxError, ValueError),
+    ):
+        if path := find_module_source(module_name):
+            return parse_version_attr(path.read_text("u8"))
+    return None
+
+
+def get_imported_version_attr(module_name: str) -> str | None:
     with (
         warning_suppress(f"Unexpected error happened when importing {module_name}"),
         suppress(ImportError),
     ):
         m = importlib.import_module(module_name)
-        if ver := getattr(m, "__version__", None):
+        return getattr(m, "__version__", None)
+    return None
+
+
+@ModuleCache
+def get_version_attr(module_name: str) -> str | None:
+    """
+    获取模块或其最近父包的 `__version__`。
+
+    优先读取已导入模块，其次静态解析源码中的 `__version__` 赋值，
+    仅在开启 `version_import_fallback` 配置时才会导入模块读取。
+    """
+
+    for name in iter_module_parents(module_name):
+        if ver := get_version_attr_no_import(name):
             return ver
-    if "." not in module_name:
-        return None
-    module_name = module_name.rsplit(".", 1)[0]
-    return get_version_attr(module_name)
+    if config.version_import_fallback:
+        for name in iter_module_parents(module_name):
+            if ver := get_imported_version_attr(name):
+                return ver
+    return None
 
 
-async def get_info_from_plugin(plugin: Plugin) -> PMNPluginInfo:
+def get_info_from_plugin_sync(plugin: Plugin) -> PMNPluginInfo:
     meta = plugin.metadata
     extra: PMNPluginExtra | None = None
     if meta:
@@ -125,86 +247,297 @@ async def get_info_from_plugin(plugin: Plugin) -> PMNPluginInfo:
     )
 
 
-def scan_path(path: Path, suffixes: Iterable[str] | None = None) -> Generator[Path]:
-    with warning_suppress(f"Failed to scan external menu source {path}", OSError):
-        for child in path.iterdir():
-            if child.is_dir():
-                yield from scan_path(child, suffixes)
-            elif suffixes and child.suffix in suffixes:
-                yield child
+def get_info_from_plugin_profiled(
+    plugin: Plugin,
+    profile: CollectProfile,
+) -> PMNPluginInfo:
+    with profile.plugin(plugin.id_):
+        return get_info_from_plugin_sync(plugin)
+
+
+async def get_info_from_plugin(
+    plugin: Plugin,
+    executor: Executor | None = None,
+    profile: CollectProfile | None = None,
+) -> PMNPluginInfo:
+    loop = asyncio.get_running_loop()
+    if profile:
+        return await loop.run_in_executor(
+            executor,
+            get_info_from_plugin_profiled,
+            plugin,
+            profile,
+        )
+    return await loop.run_in_executor(executor, get_info_from_plugin_sync, plugin)
 
 
-def collect_menus():
-    yaml = None
-
-    supported_suffixes = {".json", ".yml", ".yaml", ".toml"}
-
-    def _load_file(path: Path) -> ExternalPluginInfo:
-        nonlocal yaml
-
-        if path.suffix == ".json":
-            return type_validate_json(ExternalPluginInfo, path.read_text("u8"))
-
-        if path.suffix in {".yml", ".yaml"}:
-            if not yaml:
-                try:
-                    from ruamel.yaml import YAML
-                except ImportError as e:
-                    raise ImportError(
-                        "Missing dependency for parsing yaml files, please install using"
-                        " `pip install nonebot-plugin-picmenu-next[yaml]`",
-                    ) from e
-                yaml = YAML()
-            return type_validate_python(
-                ExternalPluginInfo,
-                yaml.load(path.read_text("u8")),
+async def collect_base_infos(
+    plugins: Iterable[Plugin],
+    profile: CollectProfile | None = None,
+    failed: set[str] | None = None,
+) -> list[PMNPluginInfo]:
+    """
+    在线程池中并发收集插件信息，单个插件超时或出错时跳过。
+
+    超时从插件开始执行时计时；等待空闲工作线程时，若超时时间内
+    没有任何工作线程完成，剩余插件同样视为超时跳过。
+    传入 `failed` 时会将被跳过的插件 ID 加入其中。
+    """
+
+    loop = asyncio.get_running_loop()
+    # same default as `ThreadPoolExecutor`
+    workers = config.collect_workers or min(32, (os.cpu_count() or 1) + 4)
+    executor = ThreadPoolExecutor(
+        max_workers=workers,
+        thread_name_prefix="picmenu-next-collect",
+    )
+    # a slot is only freed when its worker thread finishes, so plugins waiting
+    # for a busy worker are not timed and the timeout starts with the job itself
+    slots = asyncio.Semaphore(workers)
+    last_release = loop.time()
+
+    def _release(future: "asyncio.Future[PMNPluginInfo]") -> None:
+        nonlocal last_release
+        last_release = loop.time()
+        slots.release()
+        if not future.cancelled():
+            future.exception()  # retrieved even if it finished after the timeout
+
+    async def _acquire() -> bool:
+        timeout = config.collect_timeout
+        if timeout is None:
+            await slots.acquire()
+            return True
+        # give up only when no worker finished for a whole timeout,
+        # hung workers would otherwise hold their slots forever
+        while (remaining := last_release + timeout - loop.time()) > 0:
+            with suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(slots.acquire(), remaining)
+                return True
+        return False
+
+    async def _get(p: Plugin):
+        if not await _acquire():
+            logger.warning(
+                f"Failed to get plugin info of {p.id_}:"
+                " no collect worker finished in time, skipped",
+            )
+            if failed is not None:
+                failed.add(p.id_)
+            return None
+        future = (
+            loop.run_in_executor(executor, get_info_from_plugin_profiled, p, profile)
+            if profile
+            else loop.run_in_executor(executor, get_info_from_plugin_sync, p)
+        )
+        future.add_done_callback(_release)
+        with warning_suppress(f"Failed to get plugin info of {p.id_}"):
+            return await asyncio.wait_for(
+                asyncio.shield(future),
+                config.collect_timeout,
             )
+        if failed is not None:
+            failed.add(p.id_)
+        return None
+
+    try:
+        infos = await asyncio.gather(*(_get(plugin) for plugin in plugins))
+    finally:
+        # do not block the event loop waiting for timed out workers
+        executor.shutdown(wait=False, cancel_futures=True)
+    return [x for x in infos if x]
+
+
+def scan_path(path: Path, suffixes: Iterable[str] | None = None) -> Generator[Path]:
+    entries: list[os.DirEntry[str]] = []
+    with (
+        warning_suppress(f"Failed to scan external menu source {path}", OSError),
+        os.scandir(path) as it,
+    ):
+        # sort to keep load order (and so duplicated id precedence) deterministic
+        entries = sorted(it, key=lambda x: x.name)
+
+    for entry in entries:
+        child = Path(entry.path)
+        if entry.is_dir():
+            yield from scan_path(child, suffixes)
+        elif suffixes and child.suffix in suffixes:
+            yield child
+
+
+supported_menu_suffixes = {".json", ".yml", ".yaml", ".toml"}
+MENU_BUNDLE_SUFFIX = ".bundle.json"
+
+
+_yaml_local = threading.local()
+
 
-        if path.suffix == ".toml":
+def get_yaml_loader():
+    # ruamel YAML instances are not thread safe, keep one per worker thread
+    if (yaml := getattr(_yaml_local, "yaml", None)) is not None:
+        return yaml
+    try:
+        from ruamel.yaml import YAML
+    except ImportError as e:
+        raise ImportError(
+            "Missing dependency for parsing yaml files, please install using"
+            " `pip install nonebot-plugin-picmenu-next[yaml]`",
+        ) from e
+    yaml = _yaml_local.yaml = YAML()
+    return yaml
+
+
+def parse_menu_file(suffix: str, text: str) -> ExternalPluginInfo:
+    if suffix == ".json":
+        return type_validate_json(ExternalPluginInfo, text)
+
+    if suffix in {".yml", ".yaml"}:
+        return type_validate_python(
+            ExternalPluginInfo,
+            get_yaml_loader().load(text),
+        )
+
+    if suffix == ".toml":
+        try:
+            import tomllib
+        except ImportError:
             try:
-                import tomllib
-            except ImportError:
-                try:
-                    import tomli as tomllib  # pyright: ignore[reportMissingImports]
-                except ImportError as e:
-                    raise ImportError(
-                        "Missing dependency for parsing toml files, please install using"
-                        " `pip install nonebot-plugin-picmenu-next[toml]`",
-                    ) from e
-            return type_validate_python(
-                ExternalPluginInfo,
-                tomllib.loads(path.read_text("u8")),
-            )
+                import tomli as tomllib  # pyright: ignore[reportMissingImports]
+            except ImportError as e:
+                raise ImportError(
+                    "Missing dependency for parsing toml files, please install using"
+                    " `pip install nonebot-plugin-picmenu-next[toml]`",
+                ) from e
+        return type_validate_python(
+            ExternalPluginInfo,
+            tomllib.loads(text),
+        )
 
+    raise ValueError("Unsupported file type")
+
+
+def load_menu_file(
+    path: Path,
+    cache: MenuFileCache | None = None,
+) -> ExternalPluginInfo:
+    if path.suffix not in supported_menu_suffixes:
         raise ValueError("Unsupported file type")
+    if not cache:
+        return parse_menu_file(path.suffix, path.read_text("u8"))
+
+    content = path.read_bytes()
+    key = cache.make_key(path.suffix, content)
+    if (info := cache.get(key)) is not None:
+        return info
+    info = parse_menu_file(path.suffix, content.decode("u8"))
+    cache.set(key, info)
+    return info
 
-    infos: dict[str, ExternalPluginInfo] = {}
 
-    def _load_to_infos(path: Path):
-        if (key := path.stem) in infos:
+def scan_menu_files(warn_deprecated: bool = False) -> list[Path]:
+    """按加载优先级列出所有外部菜单文件"""
+
+    files = list(scan_path(external_infos_dir, supported_menu_suffixes))
+    if pm_menus_dir.exists():
+        if warn_deprecated:
             logger.warning(
-                f"Find file with duplicated plugin id `{key}`! Skip loading {path}",
+                "Old PicMenu menus dir is deprecated"
+                ", recommended to migrate to PicMenu Next config dir",
             )
-            return
-        with warning_suppress(f"Failed to load file {path}"):
-            infos[key] = _load_file(path)
+        files.extend(scan_path(pm_menus_dir, supported_menu_suffixes))
+    return files
 
-    def _load_all(path: Path):
-        for x in scan_path(path, supported_suffixes):
-            _load_to_infos(x)
 
-    _load_all(external_infos_dir)
+def is_menu_bundle(path: Path) -> bool:
+    return path.name.endswith(MENU_BUNDLE_SUFFIX)
 
-    if pm_menus_dir.exists():
+
+def load_menu_source(
+    path: Path,
+    cache: MenuFileCache | None = None,
+) -> dict[str, ExternalPluginInfo]:
+    """读取单个外部菜单文件，返回其中定义的插件 ID 与外部菜单配置"""
+
+    if is_menu_bundle(path):
+        return type_validate_json(ExternalPluginInfoBundle, path.read_text("u8")).infos
+    return {path.stem: load_menu_file(path, cache)}
+
+
+def try_load_menu_source(
+    path: Path,
+    cache: MenuFileCache | None = None,
+) -> dict[str, ExternalPluginInfo] | Exception:
+    try:
+        return load_menu_source(path, cache)
+    except Exception as e:
+        return e
+
+
+def load_menu_sources(
+    paths: list[Path],
+    cache: MenuFileCache | None = None,
+) -> list[dict[str, ExternalPluginInfo] | Exception]:
+    """在线程池中并行读取并校验外部菜单文件，结果顺序与传入顺序一致"""
+
+    if len(paths) <= 1:
+        return [try_load_menu_source(x, cache) for x in paths]
+    with ThreadPoolExecutor(
+        max_workers=config.collect_workers,
+        thread_name_prefix="picmenu-next-menus",
+    ) as executor:
+        return list(executor.map(try_load_menu_source, paths, repeat(cache)))
+
+
+def merge_menu_sources(
+    paths: list[Path],
+    results: list[dict[str, ExternalPluginInfo] | Exception],
+) -> dict[str, ExternalPluginInfo]:
+    def _warn_duplicated(key: str, path: Path):
         logger.warning(
-            "Old PicMenu menus dir is deprecated"
-            ", recommended to migrate to PicMenu Next config dir",
+            f"Find file with duplicated plugin id `{key}`! Skip loading {path}",
         )
-        _load_all(pm_menus_dir)
 
+    infos: dict[str, ExternalPluginInfo] = {}
+    for path, result in zip(paths, results):
+        if isinstance(result, Exception):
+            if (not is_menu_bundle(path)) and path.stem in infos:
+                _warn_duplicated(path.stem, path)
+                continue
+            with warning_suppress(f"Failed to load file {path}"):
+                raise result
+            continue
+
+        for key, info in result.items():
+            if key in infos:
+                _warn_duplicated(key, path)
+                continue
+            infos[key] = info
     return infos
 
 
+def collect_menus():
+    paths = scan_menu_files(warn_deprecated=True)
+    cache = MenuFileCache.load() if config.info_cache else None
+    results = load_menu_sources(paths, cache)
+    if cache:
+        cache.save()
+    return merge_menu_sources(paths, results)
+
+
+def compile_menu_bundle(path: Path) -> ExternalPluginInfoBundle:
+    """
+    将目录中的外部菜单文件编译为单个合集文件的内容。
+
+    插件 ID 的确定方式与重复 ID 的优先级与直接加载该目录时一致。
+    """
+
+    paths = [
+        x for x in scan_path(path, supported_menu_suffixes) if not is_menu_bundle(x)
+    ]
+    infos = merge_menu_sources(paths, load_menu_sources(paths))
+    return ExternalPluginInfoBundle(infos=infos)
+
+
 def apply_user_custom_infos(
     infos: list[PMNPluginInfo],
     external_infos: dict[str, ExternalPluginInfo] | None = None,
@@ -226,35 +559,132 @@ def apply_user_custom_infos(
     return infos
 
 
-async def collect_plugin_infos(plugins: Iterable[Plugin]):
-    async def _get(p: Plugin):
-        with warning_suppress(f"Failed to get plugin info of {p.id_}"):
-            return await get_info_from_plugin(p)
+def info_sort_key(info: PMNPluginInfo):
+    return info.sort_key
 
-    infos = await asyncio.gather(
-        *(_get(plugin) for plugin in plugins),
-    )
-    infos = [x for x in infos if x]
 
-    alconna_detect_plugin_ids = collect_alconna_detect_plugin_ids(infos)
-    external_infos = collect_menus()
-    external_func_override_plugin_ids = {
-        k for k, v in external_infos.items() if v.has_func_override()
-    }
+def sort_infos(infos: list[PMNPluginInfo]) -> list[PMNPluginInfo]:
+    infos.sort(key=info_sort_key)
+    return infos
 
-    infos = apply_user_custom_infos(infos, external_infos)
-    infos = apply_alconna_command_infos(
-        infos,
-        alconna_detect_plugin_ids - external_func_override_plugin_ids,
-    )
 
+async def apply_collect_mixins(
+    infos: list[PMNPluginInfo],
+    profile: CollectProfile | None = None,
+) -> list[PMNPluginInfo]:
     async def final_mixin(infos: list[PMNPluginInfo]):
         return infos
 
-    mixin_chain = chain_mixins(plugin_collect_mixins.data, final_mixin)
-    infos = await mixin_chain(infos)
+    mixins = plugin_collect_mixins.data
+    if profile:
+        mixins = [profile.wrap_mixin(x) for x in mixins]
+    mixin_chain = chain_mixins(mixins, final_mixin)
+    return await mixin_chain(infos)
+
+
+@dataclass
+class CollectState:
+    """收集过程的中间结果，供增量更新单个插件信息时复用"""
+
+    base_infos: dict[str, PMNPluginInfo] = field(default_factory=dict)
+    """应用外部菜单配置、Alconna 自动探测与 Mixin 前的插件信息"""
+    external_infos: dict[str, ExternalPluginInfo] = field(default_factory=dict)
+    failed_plugin_ids: set[str] = field(default_factory=set)
+    """超时或出错而被跳过的插件 ID"""
+
+
+async def build_plugin_info(
+    plugin_id: str,
+    base_info: PMNPluginInfo | None,
+    external_info: ExternalPluginInfo | None,
+) -> list[PMNPluginInfo]:
+    """
+    对单个插件重新执行外部菜单覆盖、Alconna 自动探测与收集阶段 Mixin。
+
+    收集阶段 Mixin 只会收到该插件自身的信息，返回结果中其他插件 ID 的信息会被丢弃。
+    """
+
+    # collect mixins may edit the merged info in place, keep the stored
+    # intermediate results untouched so later rebuilds start from them again
+    if external_info:
+        external_info = model_copy(external_info, deep=True)
+
+    if base_info:
+        info = model_copy(base_info, deep=True)
+        detect = bool(collect_alconna_detect_plugin_ids([info]))
+        if external_info:
+            external_info.merge_to(info, plugin_id=plugin_id, copy=False)
+            detect = detect and not external_info.has_func_override()
+        if detect:
+            apply_alconna_command_infos([info], {plugin_id})
+    elif external_info:
+        info = external_info.to_plugin_info(plugin_id)
+    else:
+        return []
+
+    infos = await apply_collect_mixins([info])
+    return [x for x in infos if x.plugin_id == plugin_id]
+
+
+def collect_menus_profiled(profile: CollectProfile):
+    with profile.stage("collect_menus"):
+        return collect_menus()
+
+
+async def collect_base_infos_profiled(
+    plugins: Iterable[Plugin],
+    profile: CollectProfile,
+    failed: set[str] | None = None,
+):
+    with profile.stage("get_info_from_plugin"):
+        return await collect_base_infos(plugins, profile, failed)
+
+
+async def collect_plugin_infos(
+    plugins: Iterable[Plugin],
+    state: CollectState | None = None,
+    profile: CollectProfile | None = None,
+):
+    """
+    收集所有插件信息。
+
+    传入 `profile` 时会记录各插件与各阶段的耗时，由调用方负责调用其 `finish` 方法。
+    """
+
+    profile = profile or CollectProfile()
+    infos, external_infos = await asyncio.gather(
+        collect_base_infos_profiled(
+            plugins,
+            profile,
+            state.failed_plugin_ids if state is not None else None,
+        ),
+        asyncio.to_thread(collect_menus_profiled, profile),
+    )
+
+    alconna_detect_plugin_ids = collect_alconna_detect_plugin_ids(infos)
+    external_func_override_plugin_ids = {
+        k for k, v in external_infos.items() if v.has_func_override()
+    }
+    if state is not None:
+        state.base_infos = {
+            x.plugin_id: model_copy(x, deep=True) for x in infos if x.plugin_id
+        }
+        state.external_infos = {
+            k: model_copy(v, deep=True) for k, v in external_infos.items()
+        }
+
+    with profile.stage("apply_user_custom_infos"):
+        infos = apply_user_custom_infos(infos, external_infos)
+    with profile.stage("apply_alconna_command_infos"):
+        infos = apply_alconna_command_infos(
+            infos,
+            alconna_detect_plugin_ids - external_func_override_plugin_ids,
+        )
+    with profile.stage("plugin_collect_mixins"):
+        infos = await apply_collect_mixins(infos, profile)
 
-    infos.sort(key=lambda x: (x.name_pinyin, x.plugin_id or ""))
+    with profile.stage("sort_infos"):
+        sort_infos(infos)
     logger.success(f"Collected {len(infos)} plugin infos")
 
     get_dist.cache_clear()
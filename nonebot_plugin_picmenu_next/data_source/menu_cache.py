@@ -0,0 +1,106 @@
+import hashlib
+import json
+from pathlib import Path
+from typing import Any, TypeVar
+
+from cookit.loguru import warning_suppress
+from cookit.pyd import PYDANTIC_V2, model_dump
+from nonebot import logger
+from pydantic import BaseModel
+
+from ..config import cache_dir
+from .models import ExternalPluginInfo, ExternalPMNData, PMDataItem
+
+M = TypeVar("M", bound=BaseModel)
+
+# bump this when the parsing or validation result of the same file may change,
+# or when the layout of the cached entries changes
+MENU_PARSER_VERSION = 2
+
+external_infos_cache_path = cache_dir / "external_infos.json"
+
+
+def _json_default(obj: Any) -> Any:
+    if isinstance(obj, (set, frozenset)):
+        return sorted(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _construct(model: type[M], data: dict[str, Any]) -> M:
+    construct = model.model_construct if PYDANTIC_V2 else model.construct
+    return construct(_fields_set=set(data), **data)
+
+
+def restore_external_info(data: dict[str, Any]) -> ExternalPluginInfo:
+    """从缓存的已校验数据还原外部菜单配置，不再经过校验，并保留显式设置的字段"""
+
+    data = data.copy()
+    if data.get("funcs") is not None:
+        data["funcs"] = [_construct(PMDataItem, x) for x in data["funcs"]]
+    if "pmn" in data:
+        data["pmn"] = _construct(ExternalPMNData, data["pmn"])
+    if data.get("supported_adapters") is not None:
+        data["supported_adapters"] = set(data["supported_adapters"])
+    return _construct(ExternalPluginInfo, data)
+
+
+class MenuFileCache:
+    """按文件内容哈希缓存已校验的外部菜单配置，只有内容变化的文件才会重新解析与校验"""
+
+    def __init__(self, path: Path | None = None) -> None:
+        self.path = path or external_infos_cache_path
+        self.items: dict[str, dict[str, Any]] = {}
+        self.used: set[str] = set()
+        self.dirty = False
+
+    @property
+    def version_tag(self) -> str:
+        return f"{MENU_PARSER_VERSION}:{'v2' if PYDANTIC_V2 else 'v1'}"
+
+    @classmethod
+    def load(cls, path: Path | None = None):
+        self = cls(path)
+        if not self.path.exists():
+            return self
+        with warning_suppress(f"Failed to load external menu cache {self.path}"):
+            data = json.loads(self.path.read_text("u8"))
+            if data.get("version") == self.version_tag:
+                self.items = data["items"]
+            else:
+                logger.debug("External menu cache version mismatched, ignoring")
+        return self
+
+    def save(self) -> None:
+        if not self.dirty and self.used == self.items.keys():
+            return
+        items = {k: v for k, v in self.items.items() if k in self.used}
+        with warning_suppress(f"Failed to save external menu cache {self.path}"):
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.path.write_text(
+                json.dumps(
+                    {"version": self.version_tag, "items": items},
+                    ensure_ascii=False,
+                    default=_json_default,
+                ),
+                "u8",
+            )
+
+    @staticmethod
+    def make_key(suffix: str, content: bytes) -> str:
+        return hashlib.sha256(suffix.encode() + b"\0" + content).hexdigest()
+
+    def get(self, key: str) -> ExternalPluginInfo | None:
+        if (data := self.items.get(key)) is None:
+            return None
+        with warning_suppress("Failed to restore cached external menu config"):
+            info = restore_external_info(data)
+            self.used.add(key)
+            return info
+        return None
+
+    def set(self, key: str, info: ExternalPluginInfo) -> None:
+        # keep only explicitly set fields, external configs are sparse overlays;
+        # dumped by field name so entries can be restored without validation
+        self.items[key] = model_dump(info, exclude_unset=True)
+        self.used.add(key)
+        self.dirty = True
@@ -1,5 +1,8 @@
-from collections import defaultdict
-from collections.abc import Coroutine, Sequence
+import asyncio
+from collections import OrderedDict, defaultdict
+from collections.abc import Coroutine, Generator, Hashable, Sequence
+from contextlib import contextmanager, suppress
+from contextvars import ContextVar
 from dataclasses import dataclass
 from typing import (  # noqa: UP035 - Python 3.10 compat
     Any,
@@ -8,14 +11,17 @@ from typing import (  # noqa: UP035 - Python 3.10 compat
     Generic,
     TypeAlias,
     TypeVar,
+    cast,
 )
 from typing_extensions import ParamSpec
 
 from cookit import DecoListCollector
 from cookit.loguru import warning_suppress
+from nonebot.adapters import Adapter as BaseAdapter, Bot as BaseBot, Event as BaseEvent
 from nonebot.matcher import MatcherSource
 from nonebot.plugin.on import get_matcher_source
 
+from ..config import config
 from .models import PMNPluginInfo
 
 T = TypeVar("T")
@@ -70,26 +76,151 @@ PluginDetailMixin: TypeAlias = MixinFunc[
 ]
 
 
+MIXIN_MEMO_SIZE = 64
+SELF_MIXIN_CONCURRENCY = 16
+
+
+@dataclass(frozen=True)
+class MixinContext:
+    """当前菜单请求的信息，供可缓存 Mixin 计算缓存键使用"""
+
+    generation: int
+    """插件信息快照的版本号"""
+    bot: BaseBot
+    event: BaseEvent
+    show_hidden: bool = False
+
+    @property
+    def adapter(self) -> BaseAdapter:
+        return self.bot.adapter
+
+    @property
+    def user_id(self) -> str | None:
+        with suppress(Exception):
+            return self.event.get_user_id()
+        return None
+
+
+MixinCacheKey: TypeAlias = Callable[[MixinContext], Hashable]
+
+mixin_context: ContextVar[MixinContext | None] = ContextVar(
+    "pmn_mixin_context",
+    default=None,
+)
+
+
+@contextmanager
+def use_mixin_context(context: MixinContext) -> Generator[None]:
+    token = mixin_context.set(context)
+    try:
+        yield
+    finally:
+        mixin_context.reset(token)
+
+
+@dataclass
+class MixinRunState:
+    degraded: bool = False
+
+
+# shared by reference, so child tasks of the chain can still mark the run
+mixin_run_state: ContextVar[MixinRunState | None] = ContextVar(
+    "pmn_mixin_run_state",
+    default=None,
+)
+
+
+def mark_mixin_run_degraded() -> None:
+    """标记当前调用链的输出不完整（如有 Mixin 超时被跳过），不应被缓存"""
+    if state := mixin_run_state.get():
+        state.degraded = True
+
+
 @dataclass
 class MixinInfo(Generic[T]):
     func: T
     priority: int
     source: MatcherSource | None
+    cacheable: bool = False
+    """Mixin 是否只依赖输入与 `cache_key` 的结果，可以按快照版本缓存输出"""
+    cache_key: MixinCacheKey | None = None
+
+
+class MixinList(list[MixinInfo[T]]):
+    """记录修改次数的 Mixin 列表，调用链缓存只需比较版本号即可判断是否失效"""
+
+    def __init__(self, *args: Any) -> None:
+        super().__init__(*args)
+        self.version = 0
+
+
+def _bump_version(name: str) -> Callable[..., Any]:
+    method = getattr(list, name)
+
+    def wrapped(self: MixinList[Any], *args: Any, **kwargs: Any) -> Any:
+        self.version += 1
+        return method(self, *args, **kwargs)
+
+    return wrapped
+
+
+for _name in (
+    "__delitem__",
+    "__iadd__",
+    "__imul__",
+    "__setitem__",
+    "append",
+    "clear",
+    "extend",
+    "insert",
+    "pop",
+    "remove",
+    "reverse",
+    "sort",
+):
+    setattr(MixinList, _name, _bump_version(_name))
 
 
 class MixinCollector(DecoListCollector[MixinInfo[T]]):
+    def __init__(self, data: list[MixinInfo[T]] | None = None) -> None:
+        self._compiled: tuple[MixinList[T], int, Callable, Callable] | None = None
+        self._memo: OrderedDict[Hashable, tuple[Any, Any]] = OrderedDict()
+        super().__init__(data)
+
+    @property
+    def data(self) -> MixinList[T]:
+        return self._data
+
+    @data.setter
+    def data(self, value: list[MixinInfo[T]]) -> None:
+        self._data = value if isinstance(value, MixinList) else MixinList(value)
+
     def __call__(  # pyright: ignore[reportIncompatibleMethodOverride]
         self,
         priority: int = 5,
         _depth: int = 0,
         _matcher_source: MatcherSource | None = None,
+        cacheable: bool = False,
+        cache_key: MixinCacheKey | None = None,
     ):
+        """
+        注册 Mixin。
+
+        Args:
+            priority: 优先级，越小越先执行
+            cacheable: 声明 Mixin 的输出只取决于输入与 `cache_key` 的结果，
+                链上的 Mixin 都可缓存时，整条链的输出会按快照版本缓存
+            cache_key: 根据请求信息计算额外的缓存键，例如适配器类型或用户身份
+        """
+
         def deco(func: T) -> T:
             self.data.append(
                 MixinInfo(
                     func=func,
                     priority=priority,
                     source=get_matcher_source(_depth + 1),
+                    cacheable=cacheable,
+                    cache_key=cache_key,
                 ),
             )
             self.data.sort(key=lambda x: x.priority)
@@ -97,6 +228,42 @@ class MixinCollector(DecoListCollector[MixinInfo[T]]):
 
         return deco
 
+    def compile(self, final_mixin: Callable[P, Co[V]]) -> Callable[P, Co[V]]:
+        """
+        获取已注册 Mixin 与 `final_mixin` 链接成的调用链。
+
+        调用链在首次获取时构建并缓存，注册新的 Mixin 或修改、替换 `data` 后失效，
+        是否失效只比较 `data` 的版本号。
+        链上每个 Mixin 的耗时都会记录到 `profile.mixin_stats`。
+        """
+
+        from .profile import mixin_stats
+
+        compiled = self._compiled
+        data = self.data
+        if (
+            compiled is None
+            or compiled[0] is not data
+            or compiled[1] != data.version
+            or compiled[2] is not final_mixin
+        ):
+            self._memo.clear()
+            mixins = [
+                mixin_stats.wrap_mixin(
+                    x,
+                    config.mixin_slow_threshold,
+                    config.mixin_timeout,
+                )
+                for x in self.data
+            ]
+            compiled = self._compiled = (
+                data,
+                data.version,
+                final_mixin,
+                chain_mixins(cast("Any", mixins), final_mixin),
+            )
+        return compiled[3]
+
 
 class SelfMixinCollector(defaultdict[str, MixinCollector[T]]):
     def __init__(self) -> None:
@@ -107,12 +274,14 @@ class SelfMixinCollector(defaultdict[str, MixinCollector[T]]):
         priority: int = 1,
         _depth: int = 0,
         _matcher_source: MatcherSource | None = None,
+        cacheable: bool = False,
+        cache_key: MixinCacheKey | None = None,
     ):
         def deco(f: T) -> T:
             s = _matcher_source or get_matcher_source()
             if (not s) or not (pid := s.plugin_id):
                 raise ValueError("Self plugin not found")
-            self[pid](priority, _depth + 1, s)(f)
+            self[pid](priority, _depth + 1, s, cacheable, cache_key)(f)
             return f
 
         return deco
@@ -136,6 +305,12 @@ def format_source_warn_msg(info: MixinInfo) -> str:
     )
 
 
+def format_mixin_source(info: MixinInfo) -> str:
+    if (s := info.source) and s.plugin_id:
+        return f"{s.plugin_id}:{s.module_name or 'unknown'}:{s.lineno or 'unknown'}"
+    return getattr(info.func, "__qualname__", repr(info.func))
+
+
 def chain_mixins(
     mixins: Sequence[MixinInfo[MixinFunc[P, Co[T]]]],
     final_mixin: Callable[P, Co[T]],
@@ -177,56 +352,119 @@ def chain_mixins(
     return chain
 
 
-async def resolve_main_mixin(infos: list[PMNPluginInfo]):
-    if not infos:
-        return infos
+def has_main_mixins() -> bool:
+    return bool(plugin_mixins.data) or any(x.data for x in self_mixins.values())
 
-    infos = infos.copy()
 
-    if plugin_mixins.data:
+async def _last_mixin(value: T) -> T:
+    return value
 
-        async def last_external_mixin(infos: list[PMNPluginInfo]):
-            return infos
 
-        external_mixin_chain = chain_mixins(
-            plugin_mixins.data,
-            last_external_mixin,
-        )
-        infos = await external_mixin_chain(infos)
+def _memo_key(
+    collector: MixinCollector[Any],
+    context: MixinContext,
+    value: object,
+) -> Hashable | None:
+    """计算调用链的缓存键，有 Mixin 的缓存键获取失败或不可哈希时返回 `None`"""
 
-    for i in range(len(infos)):
-        x = infos[i]
-        if (not x.plugin_id) or (x.plugin_id not in self_mixins):
+    keys: list[Hashable] = []
+    for x in collector.data:
+        with warning_suppress(
+            f"Failed to get cache key of mixin {format_mixin_source(x)},"
+            " running the chain without cache",
+        ):
+            key = x.cache_key(context) if x.cache_key else None
+            hash(key)
+            keys.append(key)
             continue
+        return None
+    return (context.generation, id(value), tuple(keys))
 
-        async def last_mixin(info: PMNPluginInfo):
-            return info
 
-        self_mixin_chain = chain_mixins(
-            self_mixins[x.plugin_id].data,
-            last_mixin,
-        )
-        infos[i] = await self_mixin_chain(x)
+async def run_mixins(
+    collector: MixinCollector[Any],
+    value: T,
+    prepare: Callable[[T], T] | None = None,
+) -> T:
+    """
+    执行 Mixin 调用链。
 
-    return infos
+    链上的 Mixin 都声明为可缓存，且存在当前请求信息时，
+    按 (快照版本, 输入对象, 各 Mixin 缓存键) 缓存输出；
+    有 Mixin 超时被跳过或缓存键获取失败时不缓存本次输出。
 
+    Args:
+        prepare: 传入调用链前对输入的处理，例如复制，缓存仍以原输入对象为键
+    """
 
-async def resolve_detail_mixin(info: PMNPluginInfo):
-    async def last_mixin(info: PMNPluginInfo):
+    chain = collector.compile(_last_mixin)
+    context = mixin_context.get()
+    if (
+        context is None
+        or not collector.data
+        or not all(x.cacheable for x in collector.data)
+        or (key := _memo_key(collector, context, value)) is None
+    ):
+        return await chain(prepare(value) if prepare else value)
+
+    memo = collector._memo  # noqa: SLF001
+    # the input is kept in the entry, so its id cannot be reused while cached
+    if (cached := memo.get(key)) and cached[0] is value:
+        memo.move_to_end(key)
+        return cached[1]
+
+    state = MixinRunState()
+    token = mixin_run_state.set(state)
+    try:
+        result = await chain(prepare(value) if prepare else value)
+    finally:
+        mixin_run_state.reset(token)
+    if state.degraded:
+        return result
+    if memo and next(iter(memo))[0] != context.generation:
+        memo.clear()
+    memo[key] = (value, result)
+    if len(memo) > MIXIN_MEMO_SIZE:
+        memo.popitem(last=False)
+    return result
+
+
+async def resolve_main_mixin(infos: list[PMNPluginInfo]):
+    if not infos:
+        return infos
+
+    if plugin_mixins.data:
+        # mixins may edit the list in place, keep the input untouched
+        infos = await run_mixins(plugin_mixins, infos, list.copy)
+
+    # always return a new list, the one above may be a memoized result
+    infos = infos.copy()
+
+    # chains of different plugins are independent, run them concurrently
+    semaphore = asyncio.Semaphore(SELF_MIXIN_CONCURRENCY)
+
+    async def resolve_self(info: PMNPluginInfo) -> PMNPluginInfo:
+        async with semaphore:
+            with warning_suppress(
+                f"Failed to run self mixins of plugin {info.plugin_id}",
+            ):
+                return await run_mixins(self_mixins[cast("str", info.plugin_id)], info)
         return info
 
+    indexes = [
+        i for i, x in enumerate(infos) if x.plugin_id and x.plugin_id in self_mixins
+    ]
+    results = await asyncio.gather(*(resolve_self(infos[i]) for i in indexes))
+    for i, info in zip(indexes, results):
+        infos[i] = info
+    return infos
+
+
+async def resolve_detail_mixin(info: PMNPluginInfo):
     if plugin_detail_mixins.data:
-        mixin_chain = chain_mixins(
-            plugin_detail_mixins.data,
-            last_mixin,
-        )
-        info = await mixin_chain(info)
+        info = await run_mixins(plugin_detail_mixins, info)
 
     if info.plugin_id and info.plugin_id in self_detail_mixins:
-        mixin_chain = chain_mixins(
-            self_detail_mixins[info.plugin_id].data,
-            last_mixin,
-        )
-        info = await mixin_chain(info)
+        info = await run_mixins(self_detail_mixins[info.plugin_id], info)
 
     return info
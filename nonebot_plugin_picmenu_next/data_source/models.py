@@ -14,7 +14,7 @@ from nonebot.plugin import Plugin
 from pydantic import BaseModel, ConfigDict, Field, PrivateAttr
 
 from ..utils import normalize_plugin_name
-from .pinyin import PinyinChunkSequence
+from .pinyin import PinyinChunkSequence, PinyinSortKey
 
 T = TypeVar("T")
 
@@ -135,6 +135,11 @@ class PMNPluginInfo(CompatModel):
     def name_pinyin(self) -> PinyinChunkSequence:
         return PinyinChunkSequence.from_raw(self.name)
 
+    @cached_property
+    def sort_key(self) -> tuple[PinyinSortKey, str]:
+        """菜单排序键，按名称拼音排序，相同时按插件 ID 排序"""
+        return (self.name_pinyin.sort_key, self.plugin_id or "")
+
     @property
     def subtitle(self) -> str:
         return " | ".join(
@@ -223,3 +228,7 @@ class ExternalPluginInfo(CompatModel):
             else:
                 setattr(other, k, getattr(self, k))
         return other
+
+
+class ExternalPluginInfoBundle(CompatModel):
+    infos: dict[str, ExternalPluginInfo]
@@ -1,12 +1,12 @@
-from collections.abc import Callable
+from collections.abc import Callable, Iterable, Iterator, Sequence
 from contextlib import suppress
-from dataclasses import dataclass
-from functools import cached_property
+from functools import cache
+from itertools import chain
+from typing import NamedTuple, TypeAlias, overload
 from typing_extensions import Self
 
-from pypinyin import Style, pinyin
-
 
+@cache
 def _get_lcut() -> Callable[[str], list[str]]:
     """自动选择分词器: spacy_pkuseg > rjieba > jieba_fast > jieba"""
     with suppress(ImportError):
@@ -31,29 +31,33 @@ def _get_lcut() -> Callable[[str], list[str]]:
     return lcut
 
 
-_lcut = _get_lcut()
+def _lcut(text: str) -> list[str]:
+    # segmenters load their dictionaries on import, defer it to first use
+    return _get_lcut()(text)
+
+
+PinyinSortKey: TypeAlias = tuple[bool | str | int, ...]
 
 
 class _NotCHNStr(str):
     __slots__ = ()
 
 
-@dataclass(frozen=True, order=True)
-class PinyinChunk:
+class PinyinChunk(NamedTuple):
     is_pinyin: bool
     text: str
     tone: int = 0
 
     @classmethod
-    def from_pinyin_res(cls, text: str) -> Self:
+    def from_pinyin_res(cls, text: str) -> "PinyinChunk":
         is_pinyin = not isinstance(text, _NotCHNStr)
         tone = 0
         if is_pinyin:
             tone = int(text[-1])
             text = text[:-1]
-        return cls(is_pinyin=is_pinyin, text=text, tone=tone)
+        return cls(is_pinyin=is_pinyin, text=str(text), tone=tone)
 
-    @cached_property
+    @property
     def casefold_str(self) -> str:
         return self.text.casefold()
 
@@ -61,9 +65,24 @@ class PinyinChunk:
         return f"{self.text}{self.tone}" if self.is_pinyin else self.text
 
 
-class PinyinChunkSequence(list[PinyinChunk]):
+class PinyinChunkSequence(Sequence[PinyinChunk]):
+    """
+    拼音块序列。
+
+    所有拼音块按 `(is_pinyin, text, tone, ...)` 展平存放在同一个元组中，
+    比较结果与逐个比较拼音块一致，迭代或下标访问时才会生成 `PinyinChunk`。
+    """
+
+    __slots__ = ("_casefold_str", "_data")
+
+    def __init__(self, chunks: Iterable[tuple[bool, str, int]] = ()) -> None:
+        self._data: PinyinSortKey = tuple(chain.from_iterable(chunks))
+        self._casefold_str: str | None = None
+
     @classmethod
     def from_raw(cls, text: str) -> Self:
+        from pypinyin import Style, pinyin
+
         transformed = pinyin(
             [x.strip() for x in _lcut(text)],
             style=Style.TONE3,
@@ -72,9 +91,59 @@ class PinyinChunkSequence(list[PinyinChunk]):
         )
         return cls(PinyinChunk.from_pinyin_res(x[0]) for x in transformed)
 
-    @cached_property
+    @property
+    def sort_key(self) -> PinyinSortKey:
+        """只由内置类型组成的排序键，比较时无需经过 Python 层的比较方法"""
+        return self._data
+
+    @property
     def casefold_str(self) -> str:
-        return str(self).casefold()
+        if self._casefold_str is None:
+            self._casefold_str = str(self).casefold()
+        return self._casefold_str
+
+    def __len__(self) -> int:
+        return len(self._data) // 3
+
+    @overload
+    def __getitem__(self, index: int) -> PinyinChunk: ...
+    @overload
+    def __getitem__(self, index: slice) -> Self: ...
+    def __getitem__(self, index: int | slice):
+        if isinstance(index, slice):
+            return type(self)(self[i] for i in range(*index.indices(len(self))))
+        i = range(len(self))[index] * 3
+        return PinyinChunk(*self._data[i : i + 3])  # pyright: ignore[reportArgumentType]
+
+    def __iter__(self) -> Iterator[PinyinChunk]:
+        data = self._data
+        for i in range(0, len(data), 3):
+            yield PinyinChunk(*data[i : i + 3])  # pyright: ignore[reportArgumentType]
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, PinyinChunkSequence):
+            return self._data == other._data
+        if isinstance(other, (list, tuple)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(self._data)
+
+    def __lt__(self, other: "PinyinChunkSequence") -> bool:
+        return self._data < other._data
+
+    def __le__(self, other: "PinyinChunkSequence") -> bool:
+        return self._data <= other._data
+
+    def __gt__(self, other: "PinyinChunkSequence") -> bool:
+        return self._data > other._data
+
+    def __ge__(self, other: "PinyinChunkSequence") -> bool:
+        return self._data >= other._data
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({list(self)!r})"
 
     def __str__(self):
         return " ".join(str(x) for x in self)
@@ -0,0 +1,218 @@
+import asyncio
+from collections.abc import Callable, Generator
+from contextlib import contextmanager, suppress
+from dataclasses import dataclass, field
+from datetime import datetime
+from time import perf_counter
+from typing import Any
+
+from nonebot import logger
+
+from .mixin import MixinInfo, format_mixin_source, mark_mixin_run_degraded
+
+SLOWEST_COUNT = 5
+
+
+def format_duration(seconds: float) -> str:
+    return f"{seconds * 1000:.1f}ms"
+
+
+def format_ranking(items: dict[str, float], count: int | None = None) -> list[str]:
+    ranked = sorted(items.items(), key=lambda x: x[1], reverse=True)
+    return [f"{k}: {format_duration(v)}" for k, v in ranked[:count]]
+
+
+def wrap_timed_mixin(
+    info: MixinInfo[Any],
+    on_finish: Callable[[float], Any],
+    timeout: float | None = None,
+    on_timeout: Callable[[], Any] | None = None,
+) -> MixinInfo[Any]:
+    """
+    包装 Mixin 以记录其自身耗时，不含其调用的后续 Mixin。
+
+    设置 `timeout` 后，若 Mixin 超时时尚未调用后续 Mixin，
+    会取消其执行并直接调用后续 Mixin，此时调用链的输出不会被缓存。
+    """
+
+    async def wrapped(next_chain: Any, *args: Any, **kwargs: Any) -> Any:
+        downstream = 0.0
+        entered = False
+
+        async def timed_next(*args: Any, **kwargs: Any) -> Any:
+            nonlocal downstream, entered
+            entered = True
+            start = perf_counter()
+            try:
+                return await next_chain(*args, **kwargs)
+            finally:
+                downstream += perf_counter() - start
+
+        start = perf_counter()
+        try:
+            if timeout is None:
+                return await info.func(timed_next, *args, **kwargs)
+
+            task = asyncio.ensure_future(info.func(timed_next, *args, **kwargs))
+            try:
+                done, _ = await asyncio.wait({task}, timeout=timeout)
+            except asyncio.CancelledError:
+                task.cancel()
+                raise
+            # once the mixin called `next` the rest of the chain is running
+            # inside it, cancelling then would run the chain twice
+            if done or entered:
+                return await task
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
+        finally:
+            on_finish(perf_counter() - start - downstream)
+
+        mark_mixin_run_degraded()
+        if on_timeout:
+            on_timeout()
+        return await next_chain(*args, **kwargs)
+
+    return MixinInfo(
+        func=wrapped,
+        priority=info.priority,
+        source=info.source,
+        cacheable=info.cacheable,
+        cache_key=info.cache_key,
+    )
+
+
+@dataclass
+class CollectProfile:
+    """单次插件信息收集的耗时记录，单位为秒"""
+
+    started_at: datetime = field(default_factory=datetime.now)
+    total: float = 0
+    stages: dict[str, float] = field(default_factory=dict)
+    """各收集阶段耗时，并行执行的阶段各自计时"""
+    plugins: dict[str, float] = field(default_factory=dict)
+    """各插件 `get_info_from_plugin` 耗时"""
+    mixins: dict[str, float] = field(default_factory=dict)
+    """各收集阶段 Mixin 自身耗时，不含其调用的后续 Mixin"""
+    _start: float = field(default_factory=perf_counter, repr=False)
+
+    @contextmanager
+    def measure(self, records: dict[str, float], key: str) -> Generator[None]:
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            records[key] = records.get(key, 0) + perf_counter() - start
+
+    def stage(self, name: str):
+        return self.measure(self.stages, name)
+
+    def plugin(self, plugin_id: str):
+        return self.measure(self.plugins, plugin_id)
+
+    def wrap_mixin(self, info: MixinInfo[Any]) -> MixinInfo[Any]:
+        """包装 Mixin 以记录其自身耗时"""
+
+        key = format_mixin_source(info)
+
+        def on_finish(elapsed: float) -> None:
+            self.mixins[key] = self.mixins.get(key, 0) + elapsed
+
+        return wrap_timed_mixin(info, on_finish)
+
+    def finish(self) -> None:
+        self.total = perf_counter() - self._start
+        logger.info(
+            f"Plugin info collection took {format_duration(self.total)}"
+            f" ({', '.join(format_ranking(self.stages))})",
+        )
+        if self.plugins:
+            logger.info(
+                "Slowest plugins: "
+                + ", ".join(format_ranking(self.plugins, SLOWEST_COUNT)),
+            )
+        if self.mixins:
+            logger.info(
+                "Slowest collect mixins: "
+                + ", ".join(format_ranking(self.mixins, SLOWEST_COUNT)),
+            )
+
+    def format_report(self, count: int | None = 10) -> str:
+        lines = [
+            f"插件信息收集耗时报告（{self.started_at:%Y-%m-%d %H:%M:%S}）",
+            f"总耗时：{format_duration(self.total)}",
+        ]
+        for title, records in (
+            ("各阶段", self.stages),
+            ("最慢的插件", self.plugins),
+            ("最慢的收集阶段 Mixin", self.mixins),
+        ):
+            if records:
+                lines.append(f"{title}：")
+                lines.extend(f"  {x}" for x in format_ranking(records, count))
+        return "\n".join(lines)
+
+
+@dataclass
+class MixinTiming:
+    calls: int = 0
+    total: float = 0
+    max: float = 0
+    slow: int = 0
+    timeouts: int = 0
+
+
+@dataclass
+class MixinStats:
+    """首页与详情页 Mixin 的累计自身耗时，按 Mixin 来源统计，单位为秒"""
+
+    timings: dict[str, MixinTiming] = field(default_factory=dict)
+
+    def wrap_mixin(
+        self,
+        info: MixinInfo[Any],
+        slow_threshold: float | None = None,
+        timeout: float | None = None,
+    ) -> MixinInfo[Any]:
+        """包装 Mixin 以记录耗时，超过 `slow_threshold` 时告警，超过 `timeout` 时跳过"""
+
+        key = format_mixin_source(info)
+
+        def on_finish(elapsed: float) -> None:
+            timing = self.timings.setdefault(key, MixinTiming())
+            timing.calls += 1
+            timing.total += elapsed
+            timing.max = max(timing.max, elapsed)
+            if slow_threshold is not None and elapsed > slow_threshold:
+                timing.slow += 1
+                logger.warning(
+                    f"Mixin {key} took {format_duration(elapsed)},"
+                    f" slower than {format_duration(slow_threshold)}",
+                )
+
+        def on_timeout() -> None:
+            self.timings[key].timeouts += 1
+            logger.warning(
+                f"Mixin {key} did not finish in {format_duration(timeout or 0)},"
+                " skipped to next mixin",
+            )
+
+        return wrap_timed_mixin(info, on_finish, timeout, on_timeout)
+
+    def format_report(self, count: int | None = 10) -> str:
+        ranked = sorted(self.timings.items(), key=lambda x: x[1].total, reverse=True)
+        lines = ["菜单 Mixin 累计耗时："]
+        lines.extend(
+            (
+                f"  {k}: {format_duration(v.total)} / {v.calls} 次"
+                f"，最长 {format_duration(v.max)}"
+                + (f"，慢调用 {v.slow} 次" if v.slow else "")
+                + (f"，超时跳过 {v.timeouts} 次" if v.timeouts else "")
+            )
+            for k, v in ranked[:count]
+        )
+        return "\n".join(lines)
+
+
+mixin_stats = MixinStats()
@@ -0,0 +1,74 @@
+from collections.abc import Callable, Hashable, Iterable, Iterator, Mapping, Sequence
+from dataclasses import dataclass, field
+from datetime import datetime
+from itertools import count
+from types import MappingProxyType
+from typing import Any, TypeVar, cast, overload
+
+from .models import PMNPluginInfo
+
+T = TypeVar("T")
+
+_generations = count(1)
+
+
+@dataclass(frozen=True, eq=False)
+class InfoSnapshot(Sequence[PMNPluginInfo]):
+    """
+    某一次收集得到的、已排序的插件信息快照，发布后不会再被修改。
+
+    每次刷新都会生成新的快照并分配递增的 `generation`，
+    下游缓存可以以其作为键，进行中的请求也会始终看到一致的插件信息。
+    """
+
+    infos: tuple[PMNPluginInfo, ...] = ()
+    generation: int = 0
+    built_at: datetime = field(default_factory=datetime.now)
+    by_plugin_id: Mapping[str, PMNPluginInfo] = field(
+        default_factory=lambda: MappingProxyType({}),
+    )
+    _derived: dict[Hashable, Any] = field(default_factory=dict, init=False, repr=False)
+
+    @classmethod
+    def build(cls, infos: Iterable[PMNPluginInfo]):
+        infos = tuple(infos)
+        by_plugin_id: dict[str, PMNPluginInfo] = {}
+        for info in infos:
+            if info.plugin_id:
+                by_plugin_id.setdefault(info.plugin_id, info)
+        return cls(
+            infos=infos,
+            generation=next(_generations),
+            by_plugin_id=MappingProxyType(by_plugin_id),
+        )
+
+    def get(self, plugin_id: str) -> PMNPluginInfo | None:
+        return self.by_plugin_id.get(plugin_id)
+
+    def derive(self, key: Hashable, factory: Callable[[], T]) -> T:
+        """
+        获取基于该快照计算出的派生数据，首次获取时调用 `factory` 计算并缓存。
+
+        派生数据随快照一同失效，刷新后的新快照会重新计算。
+        """
+
+        if key not in self._derived:
+            self._derived[key] = factory()
+        return cast("T", self._derived[key])
+
+    def peek(self, key: Hashable) -> Any | None:
+        """获取已计算的派生数据，尚未计算时返回 `None`"""
+        return self._derived.get(key)
+
+    def __len__(self) -> int:
+        return len(self.infos)
+
+    def __iter__(self) -> Iterator[PMNPluginInfo]:
+        return iter(self.infos)
+
+    @overload
+    def __getitem__(self, index: int) -> PMNPluginInfo: ...
+    @overload
+    def __getitem__(self, index: slice) -> tuple[PMNPluginInfo, ...]: ...
+    def __getitem__(self, index: int | slice):
+        return self.infos[index]
@@ -0,0 +1,117 @@
+import asyncio
+from collections.abc import Callable, Coroutine
+from pathlib import Path
+from typing import Any, TypeAlias
+
+from cookit.loguru import warning_suppress
+from nonebot import logger
+
+from .collect import is_menu_bundle, load_menu_source, scan_menu_files
+from .models import ExternalPluginInfo
+
+FileState: TypeAlias = tuple[int, int]
+ExternalInfoChanges: TypeAlias = dict[str, ExternalPluginInfo | None]
+ExternalInfoChangeHandler: TypeAlias = Callable[
+    [ExternalInfoChanges],
+    Coroutine[Any, Any, Any],
+]
+
+
+def stat_menu_files() -> dict[Path, FileState]:
+    states: dict[Path, FileState] = {}
+    for path in scan_menu_files():
+        with warning_suppress(f"Failed to stat external menu file {path}", OSError):
+            stat = path.stat()
+            states[path] = (stat.st_mtime_ns, stat.st_size)
+    return states
+
+
+class ExternalMenuWatcher:
+    """轮询外部菜单文件的修改时间与大小，只重新解析受影响插件 ID 的文件"""
+
+    def __init__(self) -> None:
+        self.states: dict[Path, FileState] = {}
+        self.loaded: dict[Path, dict[str, ExternalPluginInfo] | None] = {}
+        self.task: asyncio.Task[None] | None = None
+
+    def reset(self) -> None:
+        self.states = stat_menu_files()
+        self.loaded.clear()
+        # plugin ids provided by bundles are only known after loading them
+        for path in self.states:
+            if is_menu_bundle(path):
+                self.load(path)
+
+    def load(self, path: Path) -> dict[str, ExternalPluginInfo] | None:
+        if path not in self.loaded:
+            self.loaded[path] = None
+            with warning_suppress(f"Failed to load file {path}"):
+                self.loaded[path] = load_menu_source(path)
+        return self.loaded[path]
+
+    def resolve(self, key: str) -> ExternalPluginInfo | None:
+        # keep the same precedence as `collect_menus`:
+        # the first successfully loaded source defining the id wins
+        for path in self.states:
+            if (is_menu_bundle(path) or path.stem == key) and (
+                (infos := self.load(path)) and key in infos
+            ):
+                return infos[key]
+        return None
+
+    def poll(self) -> ExternalInfoChanges:
+        """
+        检查外部菜单文件变化。
+
+        Returns:
+            受影响的插件 ID 与其当前生效的外部菜单配置，配置被删除时值为 `None`。
+        """
+
+        states = stat_menu_files()
+        changed = {
+            path
+            for path in states.keys() | self.states.keys()
+            if states.get(path) != self.states.get(path)
+        }
+        self.states = states
+        if not changed:
+            return {}
+
+        affected: set[str] = set()
+        for path in changed:
+            if is_menu_bundle(path):
+                affected.update(self.loaded.get(path) or ())
+            else:
+                affected.add(path.stem)
+            self.loaded.pop(path, None)
+        for path in changed:
+            if is_menu_bundle(path) and path in states:
+                affected.update(self.load(path) or ())
+
+        changes: ExternalInfoChanges = {key: self.resolve(key) for key in affected}
+        logger.info(f"External menu files changed, affected ids: {', '.join(changes)}")
+        return changes
+
+    async def _run(
+        self,
+        interval: float,
+        on_change: ExternalInfoChangeHandler,
+    ) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            with warning_suppress("Failed to reload external menu files"):
+                if changes := await asyncio.to_thread(self.poll):
+                    await on_change(changes)
+
+    def start(self, interval: float, on_change: ExternalInfoChangeHandler) -> None:
+        self.stop()
+        self.reset()
+        self.task = asyncio.create_task(self._run(interval, on_change))
+
+    def stop(self) -> None:
+        if self.task:
+            self.task.cancel()
+            self.task = None
+
+
+external_menu_watcher = ExternalMenuWatcher()
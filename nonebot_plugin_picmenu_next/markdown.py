@@ -1,35 +1,72 @@
 import re
-from collections.abc import Callable
+from collections import OrderedDict
+from collections.abc import Callable, Collection, Hashable
+from dataclasses import dataclass
+from functools import cache, lru_cache
 from html import escape
 from pathlib import Path
-from typing import TYPE_CHECKING, Any, TypeAlias, cast
+from typing import TYPE_CHECKING, Any, Generic, TypeAlias, TypeVar, cast
+from weakref import WeakSet
 from typing_extensions import NotRequired, TypedDict
 
 from cookit import to_b64_url
 from cookit.loguru import warning_suppress
-from markdown_it import MarkdownIt
-from mdit_py_plugins.dollarmath import dollarmath_plugin
-from mdit_py_plugins.tasklists import tasklists_plugin
-from nonebot import get_plugin
+from nonebot import get_plugin, logger
 from nonebot.plugin import Plugin
-from pygments import highlight
-from pygments.formatters import HtmlFormatter
-from pygments.lexers import get_lexer_by_name
 
+from .config import config
 from .data_source.models import PMNPluginInfo
 
 if TYPE_CHECKING:
+    from markdown_it import MarkdownIt
     from markdown_it.renderer import RendererHTML
     from markdown_it.token import Token
     from markdown_it.utils import EnvType, OptionsDict
+    from pygments.formatters import HtmlFormatter
+    from pygments.lexer import Lexer
+
+
+HIGHLIGHT_MAX_CODE_LENGTH = 64 * 1024
+"""超过该长度的代码块不进行高亮"""
+HIGHLIGHT_CACHE_SIZE = 128
+
+
+@lru_cache(maxsize=256)
+def get_lexer(name: str) -> "Lexer | None":
+    """按语言名获取 Pygments Lexer 并缓存，未知语言同样缓存为 `None`"""
+
+    from pygments.lexers import get_lexer_by_name
+    from pygments.util import ClassNotFound
+
+    try:
+        return get_lexer_by_name(name)
+    except ClassNotFound:
+        logger.debug(f"Unknown code language {name}, skipping highlight")
+        return None
+
+
+@cache
+def get_html_formatter() -> "HtmlFormatter":
+    from pygments.formatters import HtmlFormatter
+
+    return HtmlFormatter(nowrap=True)
+
+
+@lru_cache(maxsize=HIGHLIGHT_CACHE_SIZE)
+def highlight_code_cached(code: str, name: str) -> str | None:
+    if not (lexer := get_lexer(name)):
+        return None
+
+    from pygments import highlight
+
+    return highlight(code, lexer, get_html_formatter())
 
 
 def highlight_code(code: str, name: str, _attrs: Any):
-    if name:
+    if name and len(code) <= HIGHLIGHT_MAX_CODE_LENGTH:
         with warning_suppress(f"Failed to highlight code, lang: {name}"):
-            lexer = get_lexer_by_name(name)
-            formatter = HtmlFormatter(nowrap=True)
-            return highlight(code, lexer, formatter)
+            if (highlighted := highlight_code_cached(code, name)) is not None:
+                return highlighted
     return escape(code)
 
 
@@ -45,17 +82,92 @@ PluginResPathTransformer: TypeAlias = Callable[[str, Path, PMNPluginInfo, Plugin
 
 
 def b64_prp_transformer(
-    path: str, module_path: Path, _info: PMNPluginInfo, _plugin: Plugin
+    path: str, module_path: Path, info: PMNPluginInfo, plugin: Plugin
 ) -> str:
+    """
+    将插件资源编码为 Data URL，结果按 (路径, 修改时间, 大小) 缓存。
+
+    文件超过 `resource_b64_max_size` 配置时回退为本地文件路由 URL。
+    """
+
+    file = module_path.joinpath(path)
+    stat = file.stat()
+    max_size = config.resource_b64_max_size
+    if max_size is not None and stat.st_size > max_size:
+        from .templates.pw_utils import local_file_route_prp_transformer
+
+        return local_file_route_prp_transformer(path, module_path, info, plugin)
+
+    key = (str(file), stat.st_mtime_ns, stat.st_size)
+    if (url := resource_b64_cache.get(key)) is not None:
+        return url
+
     import mimetypes
 
     mime, _ = mimetypes.guess_type(path)
-    return to_b64_url(module_path.joinpath(path).read_bytes(), mime)
+    url = to_b64_url(file.read_bytes(), mime)
+    resource_b64_cache.set(key, url, len(url))
+    return url
+
+
+class PluginResPathCache:
+    """
+    `plugin:` 路径解析结果缓存，键为 (插件 ID, 相对路径)，
+    值为 (插件, 插件模块目录, 资源相对路径)，`None` 表示无法解析。
+
+    只缓存路径，转换为 URL 仍在每次渲染时进行，以便感知资源文件的变化；
+    Markdown 渲染缓存与预渲染片段中同样只保留路径占位符。
+    """
+
+    def __init__(self) -> None:
+        self.items: dict[tuple[str, str], tuple[Plugin, Path, str] | None] = {}
+
+    def clear(self) -> None:
+        self.items.clear()
+
+    def discard_plugins(self, plugin_ids: Collection[str]) -> None:
+        for key in [k for k in self.items if k[0] in plugin_ids]:
+            del self.items[key]
+
+
+_prp_caches: "WeakSet[PluginResPathCache]" = WeakSet()
+
+
+def clear_prp_caches(plugin_ids: Collection[str] | None = None) -> None:
+    """
+    清空所有 `plugin:` 路径解析缓存，插件信息刷新时调用。
+
+    传入 `plugin_ids` 时只清除这些插件的缓存。
+    """
+    for x in _prp_caches:
+        if plugin_ids is None:
+            x.clear()
+        else:
+            x.discard_plugins(plugin_ids)
 
 
 def build_default_prp_processor(
     prp_transformer: PluginResPathTransformer,
 ):
+    cache = PluginResPathCache()
+    _prp_caches.add(cache)
+
+    def _resolve(
+        plugin_id: str,
+        relative_path: Path,
+    ) -> tuple[Plugin, Path, str] | None:
+        if not (plugin := get_plugin(plugin_id)):
+            return None
+        try:
+            module_path = Path(plugin.module.__path__[0]).resolve()
+            resource_path = (module_path / relative_path).resolve()
+            relative = resource_path.relative_to(module_path)
+            if not resource_path.is_file():
+                return None
+        except (OSError, RuntimeError, ValueError):
+            return None
+        return plugin, module_path, str(relative)
+
     def _prp_processor(info: PMNPluginInfo, path: str) -> str:
         if not (path.startswith("plugin:") and info.plugin_id):
             return path
@@ -69,17 +181,15 @@ def build_default_prp_processor(
         relative_path = Path(rel_path)
         if relative_path.drive or relative_path.root:
             return path
-        if not (plugin := get_plugin(plugin_id)):
+
+        key = (plugin_id, rel_path)
+        if key not in cache.items:
+            cache.items[key] = _resolve(plugin_id, relative_path)
+        if not (resolved := cache.items[key]):
             return path
+        plugin, module_path, resource_path = resolved
         try:
-            module_path = Path(plugin.module.__path__[0]).resolve()
-            resource_path = (module_path / relative_path).resolve()
-            resource_path.relative_to(module_path)
-            if not resource_path.is_file():
-                return path
-            return prp_transformer(
-                str(resource_path.relative_to(module_path)), module_path, info, plugin
-            )
+            return prp_transformer(resource_path, module_path, info, plugin)
         except (OSError, RuntimeError, ValueError):
             return path
 
@@ -117,7 +227,7 @@ def _resolve_html_content(content: str, env: PluginResPathProcessPluginEnv) -> s
     return _HTML_ATTR_RE.sub(_repl, content)
 
 
-def resource_resolve_plugin(md: MarkdownIt):
+def resource_resolve_plugin(md: "MarkdownIt"):
     """将 markdown 中 image/link/html 的 plugin: 路径转为实际 URL。"""
 
     renderer = cast("RendererHTML", md.renderer)
@@ -188,10 +298,174 @@ def resource_resolve_plugin(md: MarkdownIt):
     rules["html_inline"] = _html_inline
 
 
-md = (
-    MarkdownIt("commonmark", {"highlight": highlight_code})
-    .enable(["strikethrough", "linkify", "table"])
-    .use(tasklists_plugin, enabled=True)
-    .use(dollarmath_plugin, renderer=render_math_script)
-    .use(resource_resolve_plugin)
-)
+@cache
+def get_md() -> "MarkdownIt":
+    """获取共享的 MarkdownIt 实例，首次调用时才导入 markdown-it 及其插件"""
+
+    from markdown_it import MarkdownIt
+    from mdit_py_plugins.dollarmath import dollarmath_plugin
+    from mdit_py_plugins.tasklists import tasklists_plugin
+
+    return (
+        MarkdownIt("commonmark", {"highlight": highlight_code})
+        .enable(["strikethrough", "linkify", "table"])
+        .use(tasklists_plugin, enabled=True)
+        .use(dollarmath_plugin, renderer=render_math_script)
+        .use(resource_resolve_plugin)
+    )
+
+
+V = TypeVar("V")
+
+MD_RENDER_CACHE_MAX_BYTES = 8 * 1024 * 1024
+B64_CACHE_MAX_BYTES = 32 * 1024 * 1024
+
+
+class SizedLRUCache(Generic[V]):
+    """按总字节数限制大小的 LRU 缓存，并记录命中次数"""
+
+    title: str = "缓存"
+    default_max_bytes: int = MD_RENDER_CACHE_MAX_BYTES
+
+    def __init__(self, max_bytes: int | None = None) -> None:
+        self.max_bytes = self.default_max_bytes if max_bytes is None else max_bytes
+        self.items: OrderedDict[Hashable, tuple[V, int]] = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> V | None:
+        if (item := self.items.get(key)) is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.items.move_to_end(key)
+        return item[0]
+
+    def set(self, key: Hashable, value: V, size: int) -> None:
+        if size > self.max_bytes:
+            return
+        if (old := self.items.pop(key, None)) is not None:
+            self.size -= old[1]
+        self.items[key] = (value, size)
+        self.size += size
+        while self.size > self.max_bytes:
+            _, (_, evicted) = self.items.popitem(last=False)
+            self.size -= evicted
+
+    def clear(self) -> None:
+        self.items.clear()
+        self.size = 0
+
+    def format_report(self) -> str:
+        return (
+            f"{self.title}：命中 {self.hits} 次，未命中 {self.misses} 次，"
+            f"{len(self.items)} 项，占用 {self.size / 1024:.1f} KiB"
+        )
+
+
+_PRP_MARK_RE = re.compile("\ue000pmn-prp:(\\d+)\ue001")
+
+
+@dataclass(frozen=True)
+class RenderedMarkdown:
+    """
+    资源路径尚未处理的 Markdown 渲染结果。
+
+    `html` 中的资源路径以占位符表示，`paths` 为各占位符对应的原路径，
+    每次使用时再交给路径处理器，以免缓存住过期的资源 URL。
+    """
+
+    html: str
+    paths: tuple[str, ...] = ()
+
+    def resolve(
+        self,
+        info: PMNPluginInfo | None = None,
+        prp_processor: PluginResPathProcessor | None = None,
+    ) -> str:
+        if not (self.paths and info and prp_processor):
+            return self.html
+
+        from markdown_it.common.utils import escapeHtml
+
+        def _repl(m: re.Match[str]) -> str:
+            index = int(m.group(1))
+            if index >= len(self.paths):
+                return m.group(0)
+            return escapeHtml(prp_processor(info, self.paths[index]))
+
+        return _PRP_MARK_RE.sub(_repl, self.html)
+
+
+class MarkdownRenderCache(SizedLRUCache[RenderedMarkdown]):
+    """Markdown 渲染结果的 LRU 缓存，按源文本与渲染结果的总字节数限制大小"""
+
+    title = "Markdown 渲染缓存"
+
+    def discard_plugins(self, plugin_ids: Collection[str]) -> None:
+        """移除以指定插件 ID 渲染的结果"""
+        for key in [k for k in self.items if cast("tuple", k)[1] in plugin_ids]:
+            self.size -= self.items.pop(key)[1]
+
+
+class ResourceB64Cache(SizedLRUCache[str]):
+    """插件资源 Data URL 的 LRU 缓存，按 (路径, 修改时间, 大小) 缓存"""
+
+    title = "资源 Base64 缓存"
+    default_max_bytes = B64_CACHE_MAX_BYTES
+
+
+md_render_cache = MarkdownRenderCache()
+resource_b64_cache = ResourceB64Cache()
+
+
+def render_markdown_template(
+    value: str,
+    info: PMNPluginInfo | None = None,
+    prp_processor: PluginResPathProcessor | None = None,
+) -> RenderedMarkdown:
+    """
+    渲染 Markdown，资源路径以占位符保留，
+    结果按 (源文本, 插件 ID, 路径处理器, MarkdownIt 实例) 缓存。
+    """
+
+    md = get_md()
+    key = (value, info.plugin_id if info else None, prp_processor, md)
+    if (rendered := md_render_cache.get(key)) is not None:
+        return rendered
+
+    paths: list[str] = []
+
+    def _record(_info: PMNPluginInfo, path: str) -> str:
+        paths.append(path)
+        return f"\ue000pmn-prp:{len(paths) - 1}\ue001"
+
+    env: PluginResPathProcessPluginEnv = {
+        "info": info,
+        "prp_processor": _record if prp_processor else None,
+    }
+    html = md.render(value, env=cast("Any", env))
+    rendered = RenderedMarkdown(html, tuple(paths))
+    md_render_cache.set(key, rendered, len(value.encode()) + len(html.encode()))
+    return rendered
+
+
+def render_markdown(
+    value: str,
+    info: PMNPluginInfo | None = None,
+    prp_processor: PluginResPathProcessor | None = None,
+) -> str:
+    """渲染 Markdown，渲染结果会被缓存，资源路径则每次重新处理"""
+
+    return render_markdown_template(value, info, prp_processor).resolve(
+        info,
+        prp_processor,
+    )
+
+
+def __getattr__(name: str) -> Any:
+    # keep `from .markdown import md` working without importing markdown-it eagerly
+    if name == "md":
+        return get_md()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -4,7 +4,7 @@ from pathlib import Path
 from typing import Protocol, TypeVar
 
 from cookit import HasNameProtocol, NameDecoCollector
-from nonebot import logger
+from nonebot import logger, require
 from nonebot_plugin_alconna.uniseg import UniMessage
 
 from ..config import config
@@ -15,6 +15,12 @@ TN = TypeVar("TN", bound=HasNameProtocol)
 BUILTIN_TEMPLATE_DIR = Path(__file__).parent
 loaded_builtin_templates: set[str] = set()
 
+# plugins that builtin templates `require`, they must be loaded before startup
+# to get their lifecycle hooks registered, even if the template is imported later
+builtin_template_requirements: dict[str, tuple[str, ...]] = {
+    "default": ("nonebot_plugin_htmlrender",),
+}
+
 
 def is_builtin_template(name: str) -> bool:
     if not name or name.startswith("_"):
@@ -111,12 +117,28 @@ func_detail_templates = TemplateDecoCollector[FuncDetailTemplateHandler](
 )
 
 
-def preload_builtin_templates():
-    for name in {
+def get_configured_template_names() -> set[str]:
+    return {
         config.index_template,
         config.detail_template,
         config.func_detail_template,
-    }:
+    }
+
+
+def require_builtin_template_plugins():
+    """
+    加载已配置内置模板依赖的 NoneBot 插件。
+
+    在插件加载阶段调用，模板本身较重的依赖则推迟到 `preload_builtin_templates` 时导入。
+    """
+
+    for name in get_configured_template_names() | {"default"}:
+        for plugin_name in builtin_template_requirements.get(name, ()):
+            require(plugin_name)
+
+
+def preload_builtin_templates():
+    for name in get_configured_template_names():
         load_builtin_template(name)
 
 
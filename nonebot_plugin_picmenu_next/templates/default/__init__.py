@@ -14,10 +14,17 @@ from nonebot.plugin import require
 from nonebot_plugin_alconna.uniseg import UniMessage
 from pydantic import Field
 
+from ...config import config
+from ...data_source import get_infos
 from ...data_source.models import PMDataItem, PMNPluginInfo, compat_model_config
 from ...markdown import build_default_prp_processor
 from .. import detail_templates, func_detail_templates, index_templates
-from ..jj_utils import build_base_render_kwargs, filters
+from ..jj_utils import (
+    build_base_render_kwargs,
+    filters,
+    get_fragments,
+    prerender_processors,
+)
 from ..pw_utils import ROUTE_BASE_URL, base_routers, local_file_route_prp_transformer
 
 if TYPE_CHECKING:
@@ -72,6 +79,7 @@ jj_env = jj.Environment(
 jj_env.filters.update(filters.data)
 
 prp_processor = build_default_prp_processor(local_file_route_prp_transformer)
+prerender_processors.append(prp_processor)
 
 ## Routers
 
@@ -106,6 +114,11 @@ async def render(
         **build_base_render_kwargs(
             info=kwargs.get("info"),
             prp_processor=prp_processor,
+            fragments=(
+                get_fragments(get_infos(), prp_processor)
+                if config.prerender_html
+                else None
+            ),
         ),
         **kwargs,
     )
@@ -1,4 +1,5 @@
-from typing import Any, cast
+from collections.abc import Iterable, Iterator, Mapping
+from typing import TYPE_CHECKING, TypeAlias
 
 from cookit.jinja import cookit_global_filter
 from cookit.jinja.filters import br, safe_layout, space
@@ -7,36 +8,150 @@ from markupsafe import Markup
 
 from ..data_source.models import PMNPluginInfo
 from ..ft_parser import transform_ft
-from ..markdown import PluginResPathProcessor, PluginResPathProcessPluginEnv, md
+from ..markdown import (
+    PluginResPathProcessor,
+    RenderedMarkdown,
+    render_markdown,
+    render_markdown_template,
+)
+
+if TYPE_CHECKING:
+    from ..data_source.snapshot import InfoSnapshot
 
 filters = type(cookit_global_filter)(cookit_global_filter.data.copy())
 
+FragmentKey: TypeAlias = tuple[str, bool, str | None]
+"""(源文本, 是否为 Markdown, 渲染时的插件 ID)"""
+Fragment: TypeAlias = Markup | RenderedMarkdown
+"""预渲染的 HTML 片段，含资源路径的 Markdown 在使用时才处理路径"""
+Fragments: TypeAlias = Mapping[FragmentKey, Fragment]
+
+prerender_processors: list[PluginResPathProcessor | None] = []
+"""需要在收集插件信息后预渲染 HTML 片段的资源路径处理器，由模板注册"""
+
+
+def render_layout(
+    value: str,
+    is_md: bool = False,
+    info: PMNPluginInfo | None = None,
+    prp_processor: PluginResPathProcessor | None = None,
+) -> Markup:
+    if is_md:
+        return Markup(render_markdown(value, info, prp_processor))  # noqa: S704
+
+    if "<ft" in value and "</ft>" in value:
+        with warning_suppress("Failed to parse PicMenu format rich text"):
+            txt = transform_ft(value)
+            return Markup(space(br(txt)))  # noqa: S704
+
+    return safe_layout(value)
+
+
+def render_fragment(
+    value: str,
+    is_md: bool = False,
+    info: PMNPluginInfo | None = None,
+    prp_processor: PluginResPathProcessor | None = None,
+) -> Fragment:
+    if (
+        is_md
+        and (rendered := render_markdown_template(value, info, prp_processor)).paths
+    ):
+        return rendered
+    return render_layout(value, is_md, info, prp_processor)
+
+
+def iter_fragment_sources(
+    infos: Iterable[PMNPluginInfo],
+) -> Iterator[tuple[str, bool, PMNPluginInfo | None]]:
+    """列出模板中会经过 `layout` 渲染的文本，以及渲染时传入的插件信息"""
+
+    for info in infos:
+        is_md = info.pmn.markdown
+        if info.description:
+            # the index page renders descriptions without a plugin context
+            yield info.description, is_md, None
+            yield info.description, is_md, info
+        if info.usage:
+            yield info.usage, is_md, info
+        for x in info.pm_data or ():
+            for value in (
+                x.trigger_method,
+                x.trigger_condition,
+                x.brief_des,
+                x.detail_des,
+            ):
+                yield value, is_md, info
+
+
+def build_fragments(
+    infos: Iterable[PMNPluginInfo],
+    prp_processor: PluginResPathProcessor | None = None,
+    reuse: Fragments | None = None,
+) -> dict[FragmentKey, Fragment]:
+    fragments: dict[FragmentKey, Fragment] = {}
+    for value, is_md, info in iter_fragment_sources(infos):
+        key = (value, is_md, info.plugin_id if info else None)
+        if key in fragments:
+            continue
+        if reuse and (fragment := reuse.get(key)) is not None:
+            fragments[key] = fragment
+        else:
+            fragments[key] = render_fragment(value, is_md, info, prp_processor)
+    return fragments
+
+
+def get_fragments(
+    snapshot: "InfoSnapshot",
+    prp_processor: PluginResPathProcessor | None = None,
+) -> Fragments:
+    """获取快照预渲染的 HTML 片段，首次获取时渲染并缓存在快照上"""
+
+    return snapshot.derive(
+        ("html_fragments", prp_processor),
+        lambda: build_fragments(snapshot, prp_processor),
+    )
+
+
+def prerender_snapshot(
+    snapshot: "InfoSnapshot",
+    previous: "InfoSnapshot | None" = None,
+    changed_ids: Iterable[str] = (),
+) -> None:
+    """
+    为已注册的资源路径处理器预渲染快照的 HTML 片段。
+
+    传入 `previous` 时会复用上一快照中未变化插件的片段。
+    """
+
+    changed = set(changed_ids)
+    for prp_processor in prerender_processors:
+        key = ("html_fragments", prp_processor)
+        reuse: Fragments | None = None
+        if previous is not None and (old := previous.peek(key)) is not None:
+            reuse = {k: v for k, v in old.items() if k[2] not in changed}
+        fragments = build_fragments(snapshot, prp_processor, reuse)
+        snapshot.derive(key, lambda f=fragments: f)
+
 
 def build_base_render_kwargs(
     info: PMNPluginInfo | None = None,
     prp_processor: PluginResPathProcessor | None = None,
+    fragments: Fragments | None = None,
 ):
     from ..config import version
 
     def markdown(value: str) -> Markup:
-        env: PluginResPathProcessPluginEnv = {
-            "info": info,
-            "prp_processor": prp_processor,
-        }
-        return Markup(  # noqa: S704
-            md.render(value, env=cast("Any", env))
-        )
+        return render_layout(value, True, info, prp_processor)
 
     def layout(value: str, is_md: bool = False):
-        if is_md:
-            return markdown(value)
-
-        if "<ft" in value and "</ft>" in value:
-            with warning_suppress("Failed to parse PicMenu format rich text"):
-                txt = transform_ft(value)
-                return Markup(space(br(txt)))  # noqa: S704
-
-        return safe_layout(value)
+        if fragments and (
+            fragment := fragments.get((value, is_md, info.plugin_id if info else None))
+        ):
+            if isinstance(fragment, RenderedMarkdown):
+                return Markup(fragment.resolve(info, prp_processor))  # noqa: S704
+            return fragment
+        return render_layout(value, is_md, info, prp_processor)
 
     return {
         "layout": layout,
@@ -1,5 +1,7 @@
 import re
 
+from nonebot import get_driver
+
 full_pkg_name_re = re.compile(r"^(nonebot[-_]plugin[-_])?(?P<name>.+)$")
 pkg_name_re = re.compile(r"[A-Za-z0-9-_\.:]+")
 
@@ -16,3 +18,12 @@ def normalize_plugin_name(name: str) -> str:
     if name[0].isascii() and name.islower():
         name = name.title()
     return name
+
+
+def nonebot_initialized() -> bool:
+    """NoneBot 是否已初始化，未初始化时本包只作为库被工具导入"""
+    try:
+        get_driver()
+    except ValueError:
+        return False
+    return True
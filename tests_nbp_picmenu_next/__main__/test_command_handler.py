@@ -152,3 +152,56 @@ async def test_command_handler_finishes_each_user_facing_terminal_path(
             query(value="function"),
             query(value=False),
         )
+
+
+async def test_profile_handler_reports_the_last_collection(
+    picmenu_plugin: object,
+    monkeypatch: "pytest.MonkeyPatch",
+) -> None:
+    """The profile command replies with the latest report or a not-yet hint."""
+    import pytest
+    from nonebot_plugin_picmenu_next import __main__ as main
+    from nonebot_plugin_picmenu_next.data_source.profile import (
+        CollectProfile,
+        MixinStats,
+        MixinTiming,
+    )
+    from nonebot_plugin_picmenu_next.markdown import MarkdownRenderCache
+
+    class FinishedError(Exception):
+        pass
+
+    class FakeUniMessage:
+        messages: ClassVar[list[str]] = []
+
+        @classmethod
+        def text(cls, text: str) -> "FakeUniMessage":
+            cls.messages.append(text)
+            return cls()
+
+        async def finish(self, **_kwargs: object) -> None:
+            raise FinishedError
+
+    monkeypatch.setattr(main, "UniMessage", FakeUniMessage)
+    monkeypatch.setattr(main, "mixin_stats", MixinStats())
+    monkeypatch.setattr(main, "md_render_cache", MarkdownRenderCache())
+    monkeypatch.setattr(main, "get_collect_profile", lambda: None)
+    with pytest.raises(FinishedError):
+        await main._handle_profile()
+    assert FakeUniMessage.messages == ["还没有收集过插件信息呢……"]
+
+    profile = CollectProfile(stages={"sort_infos": 0.001}, plugins={"a": 0.002})
+    monkeypatch.setattr(main, "get_collect_profile", lambda: profile)
+    with pytest.raises(FinishedError):
+        await main._handle_profile()
+    assert FakeUniMessage.messages[-1] == profile.format_report()
+    assert "  a: 2.0ms" in FakeUniMessage.messages[-1]
+
+    stats = MixinStats(timings={"owner:mod:1": MixinTiming(2, 0.003, 0.002, 1, 1)})
+    monkeypatch.setattr(main, "mixin_stats", stats)
+    with pytest.raises(FinishedError):
+        await main._handle_profile()
+    assert FakeUniMessage.messages[-1] == (
+        f"{profile.format_report()}\n菜单 Mixin 累计耗时：\n"
+        "  owner:mod:1: 3.0ms / 2 次，最长 2.0ms，慢调用 1 次，超时跳过 1 次"
+    )
@@ -34,19 +34,22 @@ def test_help_extension_applies_markdown_formatter_when_registry_is_ready(
     from nonebot_plugin_picmenu_next import __main__ as main
     from nonebot_plugin_picmenu_next.data_source.alconna import PMNMarkdownTextFormatter
     from nonebot_plugin_picmenu_next.data_source.models import PMNData, PMNPluginInfo
+    from nonebot_plugin_picmenu_next.data_source.snapshot import InfoSnapshot
 
     command = _owned_command("formatter-picmenu", "formatter_plugin")
     ext = main.PMNHelpExtension()
     monkeypatch.setattr(
         main,
         "get_infos",
-        lambda: [
-            PMNPluginInfo(
-                name="formatter",
-                plugin_id="formatter_plugin",
-                pmn=PMNData(markdown=True),
-            )
-        ],
+        lambda: InfoSnapshot.build(
+            [
+                PMNPluginInfo(
+                    name="formatter",
+                    plugin_id="formatter_plugin",
+                    pmn=PMNData(markdown=True),
+                )
+            ]
+        ),
     )
 
     assert type(command.formatter) is TextFormatter
@@ -63,23 +66,26 @@ def test_help_extension_retries_formatter_setup_until_registry_is_ready(
     from nonebot_plugin_picmenu_next import __main__ as main
     from nonebot_plugin_picmenu_next.data_source.alconna import PMNMarkdownTextFormatter
     from nonebot_plugin_picmenu_next.data_source.models import PMNData, PMNPluginInfo
+    from nonebot_plugin_picmenu_next.data_source.snapshot import InfoSnapshot
 
     command = _owned_command("late-formatter-picmenu", "late_formatter_plugin")
     ext = main.PMNHelpExtension()
-    monkeypatch.setattr(main, "get_infos", list)
+    monkeypatch.setattr(main, "get_infos", InfoSnapshot)
     ext.post_init(command)
     assert type(command.formatter) is TextFormatter
 
     monkeypatch.setattr(
         main,
         "get_infos",
-        lambda: [
-            PMNPluginInfo(
-                name="late formatter",
-                plugin_id="late_formatter_plugin",
-                pmn=PMNData(markdown=True),
-            )
-        ],
+        lambda: InfoSnapshot.build(
+            [
+                PMNPluginInfo(
+                    name="late formatter",
+                    plugin_id="late_formatter_plugin",
+                    pmn=PMNData(markdown=True),
+                )
+            ]
+        ),
     )
     ext.validate(
         cast("Bot", SimpleNamespace()),
@@ -96,6 +102,7 @@ def test_help_extension_leaves_default_formatter_for_unowned_or_plain_commands(
     """Formatter setup skips commands without an owning Markdown-enabled menu item."""
     from nonebot_plugin_picmenu_next import __main__ as main
     from nonebot_plugin_picmenu_next.data_source.models import PMNData, PMNPluginInfo
+    from nonebot_plugin_picmenu_next.data_source.snapshot import InfoSnapshot
 
     unowned = Alconna("unowned-picmenu")
     ext = main.PMNHelpExtension()
@@ -106,13 +113,15 @@ def test_help_extension_leaves_default_formatter_for_unowned_or_plain_commands(
     monkeypatch.setattr(
         main,
         "get_infos",
-        lambda: [
-            PMNPluginInfo(
-                name="plain",
-                plugin_id="plain_plugin",
-                pmn=PMNData(markdown=False),
-            )
-        ],
+        lambda: InfoSnapshot.build(
+            [
+                PMNPluginInfo(
+                    name="plain",
+                    plugin_id="plain_plugin",
+                    pmn=PMNData(markdown=False),
+                )
+            ]
+        ),
     )
     ext = main.PMNHelpExtension()
     ext.post_init(plain)
@@ -148,6 +148,7 @@ async def test_help_interception_uses_hidden_snapshot_for_adapter_hidden_plugin(
         PMNData,
         PMNPluginInfo,
     )
+    from nonebot_plugin_picmenu_next.data_source.snapshot import InfoSnapshot
 
     command = _owned_command("adapter-hidden-picmenu", "adapter_hidden_plugin")
     item = PMDataItem(
@@ -182,7 +183,7 @@ async def test_help_interception_uses_hidden_snapshot_for_adapter_hidden_plugin(
     ext = main.PMNHelpExtension()
     ext.command = command
     monkeypatch.setattr(ext, "inject", _inject_context)
-    monkeypatch.setattr(main, "get_infos", lambda: [info])
+    monkeypatch.setattr(main, "get_infos", lambda: InfoSnapshot.build([info]))
     monkeypatch.setitem(
         main.func_detail_templates.data,
         "adapter-hidden-index",
@@ -74,6 +74,141 @@ def test_adapter_filter_accepts_known_variants_and_unknown_support(
     assert main.filter_unsupported_adapters([known], adapter) == [known]
 
 
+async def test_adapter_views_are_computed_once_per_snapshot(
+    picmenu_plugin: object,
+    monkeypatch: "pytest.MonkeyPatch",
+) -> None:
+    """Requests reuse per-adapter views until a new snapshot is published."""
+    from nonebot import get_driver
+    from nonebot.adapters.satori import Adapter as SatoriAdapter
+    from nonebot_plugin_picmenu_next import __main__ as main
+    from nonebot_plugin_picmenu_next.data_source import mixin
+    from nonebot_plugin_picmenu_next.data_source.models import PMNPluginInfo
+    from nonebot_plugin_picmenu_next.data_source.snapshot import InfoSnapshot
+
+    class OtherAdapter(SatoriAdapter):
+        pass
+
+    supported = PMNPluginInfo(name="a", plugin_id="a")
+    unsupported = PMNPluginInfo(
+        name="b",
+        plugin_id="b",
+        supported_adapters={"tests.missing_adapter:Adapter"},
+    )
+    snapshot = InfoSnapshot.build([supported, unsupported])
+    adapter = SatoriAdapter(get_driver())
+
+    calls: list[str] = []
+    original = main.is_plugin_supported_adapter
+
+    def counted(info: PMNPluginInfo, adapter: object, *args: Any) -> bool:
+        calls.append(info.name)
+        return original(info, cast("Any", adapter), *args)
+
+    monkeypatch.setattr(main, "is_plugin_supported_adapter", counted)
+    monkeypatch.setattr(mixin.plugin_mixins, "data", [])
+    monkeypatch.setattr(mixin, "self_mixins", mixin.SelfMixinCollector())
+
+    visible = await main.resolve_menu_view(snapshot, adapter, show_hidden=False)
+    hidden = await main.resolve_menu_view(snapshot, adapter, show_hidden=True)
+
+    assert visible.infos == [supported]
+    assert visible.find("b") is None
+    assert hidden.find("b") == (1, hidden.infos[1])
+    assert hidden.infos[1].pmn.hidden is True
+    assert await main.resolve_menu_view(snapshot, adapter, show_hidden=False) is visible
+    assert calls == ["a", "b"]
+
+    await main.resolve_menu_view(snapshot, OtherAdapter(get_driver()), False)
+    assert len(calls) == 4
+    rebuilt = InfoSnapshot.build(snapshot)
+    assert await main.resolve_menu_view(rebuilt, adapter, False) is not visible
+
+
+def test_adapter_support_cache_resolves_each_adapter_set_once(
+    picmenu_plugin: object,
+    monkeypatch: "pytest.MonkeyPatch",
+) -> None:
+    """Plugins sharing a supported-adapter set reuse one cached resolution."""
+    from nonebot import get_driver
+    from nonebot.adapters.satori import Adapter as SatoriAdapter
+    from nonebot_plugin_picmenu_next import __main__ as main
+    from nonebot_plugin_picmenu_next.data_source.models import PMNPluginInfo
+
+    resolved: list[str] = []
+    original = main.resolve_dot_notation
+
+    def counted(obj_str: str, *args: Any) -> Any:
+        resolved.append(obj_str)
+        return original(obj_str, *args)
+
+    monkeypatch.setattr(main, "resolve_dot_notation", counted)
+    infos = [
+        PMNPluginInfo(name=str(i), supported_adapters={"~satori", "~onebot.v11"})
+        for i in range(5)
+    ]
+    infos.append(PMNPluginInfo(name="other", supported_adapters={"~onebot.v11"}))
+    cache: main.AdapterSupportCache = {}
+
+    result = main.filter_unsupported_adapters(
+        infos,
+        SatoriAdapter(get_driver()),
+        cache,
+    )
+
+    assert [x.pmn.hidden for x in result] == [False] * 5 + [True]
+    assert resolved == ["~satori"]
+    assert set(cache.values()) == {True, False}
+
+
+async def test_main_mixins_can_reveal_adapter_hidden_plugins(
+    picmenu_plugin: object,
+    monkeypatch: "pytest.MonkeyPatch",
+) -> None:
+    """With main mixins registered, hidden plugins are filtered after the mixins."""
+    from cookit.pyd import model_copy
+    from nonebot import get_driver
+    from nonebot.adapters.satori import Adapter as SatoriAdapter
+    from nonebot_plugin_picmenu_next import __main__ as main
+    from nonebot_plugin_picmenu_next.data_source import mixin
+    from nonebot_plugin_picmenu_next.data_source.models import PMNPluginInfo
+    from nonebot_plugin_picmenu_next.data_source.snapshot import InfoSnapshot
+
+    async def reveal(next_chain: Any, infos: list[PMNPluginInfo]) -> Any:
+        return await next_chain(
+            [
+                model_copy(
+                    x, update={"pmn": model_copy(x.pmn, update={"hidden": False})}
+                )
+                for x in infos
+            ],
+        )
+
+    monkeypatch.setattr(
+        mixin.plugin_mixins,
+        "data",
+        [mixin.MixinInfo(func=reveal, priority=1, source=None)],
+    )
+    snapshot = InfoSnapshot.build(
+        [
+            PMNPluginInfo(
+                name="b",
+                plugin_id="b",
+                supported_adapters={"tests.missing_adapter:Adapter"},
+            ),
+        ],
+    )
+
+    view = await main.resolve_menu_view(
+        snapshot,
+        SatoriAdapter(get_driver()),
+        show_hidden=False,
+    )
+
+    assert [x.plugin_id for x in view.infos] == ["b"]
+    assert view.find("b") == (0, view.infos[0])
+
+
 def test_adapter_filter_skips_resolution_when_module_prefix_cannot_match(
     picmenu_plugin: object,
     monkeypatch: "pytest.MonkeyPatch",
@@ -119,10 +254,12 @@ async def test_menu_queries_prioritize_valid_snapshot_indexes(
     monkeypatch.setattr(main, "get_name_similarities", lambda *_args: [60])
     assert await main.query_plugin([info], "00") == (0, info)
 
+    from thefuzz import process
+
     monkeypatch.setattr(main, "get_name_similarities", original)
     score_sets = iter([[("name", 100, 0)], [("pinyin", 50, 0)]])
     monkeypatch.setattr(
-        main.process,
+        process,
         "extractWithoutOrder",
         lambda *_args: next(score_sets),
     )
@@ -157,6 +294,120 @@ async def test_function_queries_support_indexes_and_similarity_thresholds(
     assert await main.query_func_detail([item], "function") == (0, item)
 
 
+def test_hidden_function_filter_returns_the_same_info_when_nothing_is_hidden(
+    picmenu_plugin: object,
+) -> None:
+    """Plugins without hidden functions are shown as-is instead of being copied."""
+    from nonebot_plugin_picmenu_next import __main__ as main
+    from nonebot_plugin_picmenu_next.data_source.models import (
+        PMDataItem,
+        PMNPluginInfo,
+    )
+
+    def item(func: str, *, hidden: bool = False) -> PMDataItem:
+        return PMDataItem(
+            func=func,
+            trigger_method=func,
+            trigger_condition="command",
+            brief_des=func,
+            detail_des=func,
+            pmn_hidden=hidden,
+        )
+
+    empty = PMNPluginInfo(name="empty", plugin_id="empty")
+    visible = PMNPluginInfo(name="visible", plugin_id="visible", pm_data=[item("a")])
+    mixed = PMNPluginInfo(
+        name="mixed",
+        plugin_id="mixed",
+        pm_data=[item("a"), item("b", hidden=True)],
+    )
+
+    assert main.filter_hidden_functions(empty) is empty
+    assert main.filter_hidden_functions(visible) is visible
+    filtered = main.filter_hidden_functions(mixed)
+    assert filtered is not mixed
+    assert [x.func for x in filtered.pm_data or ()] == ["a"]
+    assert [x.func for x in mixed.pm_data or ()] == ["a", "b"]
+
+
+async def test_function_views_and_search_arrays_are_reused_per_view(
+    picmenu_plugin: object,
+    monkeypatch: "pytest.MonkeyPatch",
+) -> None:
+    """Detail requests reuse one hidden-filtered copy and its search arrays."""
+    from nonebot_plugin_alconna.uniseg import UniMessage
+    from nonebot_plugin_picmenu_next import __main__ as main
+    from nonebot_plugin_picmenu_next.data_source import mixin
+    from nonebot_plugin_picmenu_next.data_source.models import (
+        PMDataItem,
+        PMNPluginInfo,
+    )
+    from nonebot_plugin_picmenu_next.data_source.snapshot import InfoSnapshot
+
+    async def render_func(*_args: object, **_kwargs: object) -> UniMessage:
+        return UniMessage("function")
+
+    info = PMNPluginInfo(
+        name="plugin",
+        plugin_id="plugin",
+        pm_data=[
+            PMDataItem(
+                func=func,
+                trigger_method=func,
+                trigger_condition="command",
+                brief_des=func,
+                detail_des=func,
+                pmn_hidden=func == "secret",
+            )
+            for func in ("visible", "secret")
+        ],
+    )
+    snapshot = InfoSnapshot.build([info])
+    monkeypatch.setattr(main, "get_infos", lambda: snapshot)
+    monkeypatch.setattr(mixin.plugin_mixins, "data", [])
+    monkeypatch.setattr(mixin, "self_mixins", mixin.SelfMixinCollector())
+    monkeypatch.setitem(main.func_detail_templates.data, "default", render_func)
+    monkeypatch.setattr(
+        main, "get_name_similarities", lambda *args: [100] * len(args[2])
+    )
+
+    copies: list[object] = []
+    original_copy = main.model_copy
+
+    def counted_copy(model: Any, **kwargs: Any) -> Any:
+        copies.append(model)
+        return original_copy(model, **kwargs)
+
+    built: list[int] = []
+    original_from_functions = main.SearchChoices.from_functions.__func__
+
+    def counted_from_functions(cls: Any, pm_data: Any) -> Any:
+        built.append(0)
+        return original_from_functions(cls, pm_data)
+
+    monkeypatch.setattr(main, "model_copy", counted_copy)
+    monkeypatch.setattr(
+        main.SearchChoices,
+        "from_functions",
+        classmethod(counted_from_functions),
+    )
+
+    bot = cast("Bot", SimpleNamespace(adapter=SimpleNamespace()))
+    event = cast("Event", SimpleNamespace())
+    results = [
+        await main.render_menu(bot, event, q_plugin="plugin", q_function="visible")
+        for _ in range(3)
+    ]
+
+    rendered = [x[1] for x in results]
+    assert rendered[0] is not None
+    assert all(x is rendered[0] for x in rendered)
+    assert [x.func for x in rendered[0].pm_data or ()] == ["visible"]
+    assert [x[2].func for x in results if x[2]] == ["visible"] * 3
+    assert copies == [info]
+    assert built == [0]
+
+
 async def test_hidden_visibility_policy_can_be_restricted_to_superusers(
     picmenu_plugin: object,
     monkeypatch: "pytest.MonkeyPatch",
@@ -193,6 +444,7 @@ async def test_ordinary_menu_omits_hidden_plugins(
     """ADR-0003 removes hidden plugins from ordinary menu discovery."""
     from nonebot_plugin_picmenu_next import __main__ as main
     from nonebot_plugin_picmenu_next.data_source.models import PMNData, PMNPluginInfo
+    from nonebot_plugin_picmenu_next.data_source.snapshot import InfoSnapshot
 
     hidden = PMNPluginInfo(
         name="hidden",
@@ -203,7 +455,7 @@ async def test_ordinary_menu_omits_hidden_plugins(
     async def unchanged(infos: list[PMNPluginInfo]) -> list[PMNPluginInfo]:
         return infos
 
-    monkeypatch.setattr(main, "get_infos", lambda: [hidden])
+    monkeypatch.setattr(main, "get_infos", lambda: InfoSnapshot.build([hidden]))
     monkeypatch.setattr(main, "resolve_main_mixin", unchanged)
 
     assert await main.render_menu(
@@ -222,6 +474,7 @@ async def test_show_hidden_reveals_adapter_unsupported_plugin(
     from nonebot_plugin_alconna.uniseg import UniMessage
     from nonebot_plugin_picmenu_next import __main__ as main
     from nonebot_plugin_picmenu_next.data_source.models import PMNPluginInfo
+    from nonebot_plugin_picmenu_next.data_source.snapshot import InfoSnapshot
 
     async def unchanged(infos: list[PMNPluginInfo]) -> list[PMNPluginInfo]:
         return infos
@@ -234,7 +487,7 @@ async def test_show_hidden_reveals_adapter_unsupported_plugin(
         plugin_id="incompatible",
         supported_adapters=set(),
     )
-    monkeypatch.setattr(main, "get_infos", lambda: [info])
+    monkeypatch.setattr(main, "get_infos", lambda: InfoSnapshot.build([info]))
     monkeypatch.setattr(main, "resolve_main_mixin", unchanged)
     monkeypatch.setitem(main.index_templates.data, "default", render_incompatible)
 
@@ -261,6 +514,7 @@ async def test_show_hidden_reveals_both_plugin_and_function_switches(
         PMNData,
         PMNPluginInfo,
     )
+    from nonebot_plugin_picmenu_next.data_source.snapshot import InfoSnapshot
 
     async def unchanged_main(infos: list[PMNPluginInfo]) -> list[PMNPluginInfo]:
         return infos
@@ -286,7 +540,7 @@ async def test_show_hidden_reveals_both_plugin_and_function_switches(
             )
         ],
     )
-    monkeypatch.setattr(main, "get_infos", lambda: [info])
+    monkeypatch.setattr(main, "get_infos", lambda: InfoSnapshot.build([info]))
     monkeypatch.setattr(main, "resolve_main_mixin", unchanged_main)
     monkeypatch.setattr(main, "resolve_detail_mixin", unchanged_detail)
     monkeypatch.setitem(main.func_detail_templates.data, "default", render_func)
@@ -318,6 +572,7 @@ async def test_function_detail_inherits_or_ignores_plugin_template_as_configured
         PMNData,
         PMNPluginInfo,
     )
+    from nonebot_plugin_picmenu_next.data_source.snapshot import InfoSnapshot
 
     async def unchanged_main(infos: list[PMNPluginInfo]) -> list[PMNPluginInfo]:
         return infos
@@ -353,14 +608,18 @@ async def test_function_detail_inherits_or_ignores_plugin_template_as_configured
     bot = cast("Bot", SimpleNamespace(adapter=SimpleNamespace()))
     event = cast("Event", SimpleNamespace())
 
-    monkeypatch.setattr(main, "get_infos", lambda: [make_info(inherit=True)])
+    monkeypatch.setattr(
+        main, "get_infos", lambda: InfoSnapshot.build([make_info(inherit=True)])
+    )
     inherited_message, _, _ = await main.render_menu(
         bot,
         event,
         q_plugin="1",
         q_function="1",
     )
-    monkeypatch.setattr(main, "get_infos", lambda: [make_info(inherit=False)])
+    monkeypatch.setattr(
+        main, "get_infos", lambda: InfoSnapshot.build([make_info(inherit=False)])
+    )
     default_message, _, _ = await main.render_menu(
         bot,
         event,
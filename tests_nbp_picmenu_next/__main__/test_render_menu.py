@@ -38,6 +38,7 @@ async def test_render_menu_uses_function_template_before_plugin_inheritance(
         PMNData,
         PMNPluginInfo,
     )
+    from nonebot_plugin_picmenu_next.data_source.snapshot import InfoSnapshot
 
     async def unchanged_main(infos: list[PMNPluginInfo]) -> list[PMNPluginInfo]:
         return infos
@@ -65,7 +66,7 @@ async def test_render_menu_uses_function_template_before_plugin_inheritance(
             )
         ],
     )
-    monkeypatch.setattr(main, "get_infos", lambda: [info])
+    monkeypatch.setattr(main, "get_infos", lambda: InfoSnapshot.build([info]))
     monkeypatch.setattr(main, "resolve_main_mixin", unchanged_main)
     monkeypatch.setattr(main, "resolve_detail_mixin", unchanged_detail)
     monkeypatch.setitem(main.func_detail_templates.data, "inherited", inherited)
@@ -90,6 +91,7 @@ async def test_render_menu_generates_current_alconna_item_after_hidden_retry(
     from nonebot_plugin_alconna.uniseg import UniMessage
     from nonebot_plugin_picmenu_next import __main__ as main
     from nonebot_plugin_picmenu_next.data_source.models import PMDataItem, PMNPluginInfo
+    from nonebot_plugin_picmenu_next.data_source.snapshot import InfoSnapshot
 
     command = _owned_command("temporary-picmenu", "temporary_plugin")
     captured: dict[str, object] = {}
@@ -112,7 +114,7 @@ async def test_render_menu_generates_current_alconna_item_after_hidden_retry(
         return UniMessage("temporary")
 
     info = PMNPluginInfo(name="temporary", plugin_id="temporary_plugin", pm_data=[])
-    monkeypatch.setattr(main, "get_infos", lambda: [info])
+    monkeypatch.setattr(main, "get_infos", lambda: InfoSnapshot.build([info]))
     monkeypatch.setattr(main, "resolve_main_mixin", unchanged_main)
     monkeypatch.setattr(main, "resolve_detail_mixin", unchanged_detail)
     monkeypatch.setitem(main.func_detail_templates.data, "default", render_temporary)
@@ -143,6 +145,7 @@ async def test_render_menu_returns_plugin_when_requested_function_data_is_absent
     """A normal function query preserves the matched plugin when it has no functions."""
     from nonebot_plugin_picmenu_next import __main__ as main
     from nonebot_plugin_picmenu_next.data_source.models import PMNPluginInfo
+    from nonebot_plugin_picmenu_next.data_source.snapshot import InfoSnapshot
 
     async def unchanged(infos: list[PMNPluginInfo]) -> list[PMNPluginInfo]:
         return infos
@@ -151,7 +154,7 @@ async def test_render_menu_returns_plugin_when_requested_function_data_is_absent
         return info
 
     info = PMNPluginInfo(name="empty", plugin_id="empty", pm_data=None)
-    monkeypatch.setattr(main, "get_infos", lambda: [info])
+    monkeypatch.setattr(main, "get_infos", lambda: InfoSnapshot.build([info]))
     monkeypatch.setattr(main, "resolve_main_mixin", unchanged)
     monkeypatch.setattr(main, "resolve_detail_mixin", unchanged_detail)
 
@@ -171,6 +174,7 @@ async def test_render_menu_covers_unmatched_plugin_detail_and_function_queries(
     from nonebot_plugin_alconna.uniseg import UniMessage
     from nonebot_plugin_picmenu_next import __main__ as main
     from nonebot_plugin_picmenu_next.data_source.models import PMDataItem, PMNPluginInfo
+    from nonebot_plugin_picmenu_next.data_source.snapshot import InfoSnapshot
 
     async def unchanged_main(infos: list[PMNPluginInfo]) -> list[PMNPluginInfo]:
         return infos
@@ -181,10 +185,10 @@ async def test_render_menu_covers_unmatched_plugin_detail_and_function_queries(
     async def detail_template(*_args: object, **_kwargs: object) -> UniMessage:
         return UniMessage("detail")
 
-    async def no_matching_plugin(*_args: object) -> None:
+    async def no_matching_plugin(*_args: object, **_kwargs: object) -> None:
         return None
 
-    async def no_matching_function(*_args: object) -> None:
+    async def no_matching_function(*_args: object, **_kwargs: object) -> None:
         return None
 
     item = PMDataItem(
@@ -195,7 +199,7 @@ async def test_render_menu_covers_unmatched_plugin_detail_and_function_queries(
         detail_des="detail",
     )
     info = PMNPluginInfo(name="plugin", plugin_id="plugin", pm_data=[item])
-    monkeypatch.setattr(main, "get_infos", lambda: [info])
+    monkeypatch.setattr(main, "get_infos", lambda: InfoSnapshot.build([info]))
     monkeypatch.setattr(main, "resolve_main_mixin", unchanged_main)
     monkeypatch.setattr(main, "resolve_detail_mixin", unchanged_detail)
     monkeypatch.setitem(main.detail_templates.data, "default", detail_template)
@@ -22,8 +22,7 @@ def pytest_configure(config: pytest.Config) -> None:
     config.stash[NONEBOT_INIT_KWARGS] = init_kwargs
 
 
-@pytest.fixture
-def picmenu_plugin(app: Any):
+def _load_picmenu_plugin():
     import importlib
 
     import nonebot
@@ -36,3 +35,14 @@ def picmenu_plugin(app: Any):
         if "Plugin already exists" not in str(e):
             raise
     return importlib.import_module("nonebot_plugin_picmenu_next")
+
+
+@pytest.fixture
+def picmenu_plugin(app: Any):
+    plugin = _load_picmenu_plugin()
+
+    # builtin templates are imported by the startup hook, which tests do not run
+    from nonebot_plugin_picmenu_next.templates import preload_builtin_templates
+
+    preload_builtin_templates()
+    return plugin
@@ -1,5 +1,6 @@
 """Tests for external help-data collection."""
 
+import os
 from pathlib import Path
 from types import SimpleNamespace
 from typing import TYPE_CHECKING, cast
@@ -268,18 +269,16 @@ def test_collect_menus_skips_an_unreadable_subdirectory(
     valid_file = external_dir / "valid.json"
     unreadable_dir.mkdir(parents=True)
     valid_file.write_text('{"name": "Valid"}', encoding="utf-8")
-    original_iterdir = Path.iterdir
+    original_scandir = os.scandir
 
-    def iterdir(path: Path):
-        if path == external_dir:
-            return iter((unreadable_dir, valid_file))
-        if path == unreadable_dir:
+    def scandir(path: Path):
+        if Path(path) == unreadable_dir:
             raise OSError("directory unavailable")
-        return original_iterdir(path)
+        return original_scandir(path)
 
     monkeypatch.setattr(collect, "external_infos_dir", external_dir)
     monkeypatch.setattr(collect, "pm_menus_dir", tmp_path / "missing-legacy-dir")
-    monkeypatch.setattr(Path, "iterdir", iterdir)
+    monkeypatch.setattr(collect.os, "scandir", scandir)
 
     infos = collect.collect_menus()
 
@@ -299,16 +298,16 @@ def test_collect_menus_isolates_an_unreadable_legacy_source(
     external_dir.mkdir()
     legacy_dir.mkdir()
     (external_dir / "valid.json").write_text('{"name": "Valid"}', encoding="utf-8")
-    original_iterdir = Path.iterdir
+    original_scandir = os.scandir
 
-    def iterdir(path: Path):
-        if path == legacy_dir:
+    def scandir(path: Path):
+        if Path(path) == legacy_dir:
             raise OSError("legacy source unavailable")
-        return original_iterdir(path)
+        return original_scandir(path)
 
     monkeypatch.setattr(collect, "external_infos_dir", external_dir)
     monkeypatch.setattr(collect, "pm_menus_dir", legacy_dir)
-    monkeypatch.setattr(Path, "iterdir", iterdir)
+    monkeypatch.setattr(collect.os, "scandir", scandir)
 
     infos = collect.collect_menus()
 
@@ -328,17 +327,199 @@ def test_collect_menus_isolates_an_unreadable_primary_source(
     localstore_dir.mkdir()
     legacy_dir.mkdir()
     (legacy_dir / "legacy.json").write_text('{"name": "Legacy"}', encoding="utf-8")
-    original_iterdir = Path.iterdir
+    original_scandir = os.scandir
 
-    def iterdir(path: Path):
-        if path == localstore_dir:
+    def scandir(path: Path):
+        if Path(path) == localstore_dir:
             raise OSError("primary source unavailable")
-        return original_iterdir(path)
+        return original_scandir(path)
 
     monkeypatch.setattr(collect, "external_infos_dir", localstore_dir)
     monkeypatch.setattr(collect, "pm_menus_dir", legacy_dir)
-    monkeypatch.setattr(Path, "iterdir", iterdir)
+    monkeypatch.setattr(collect.os, "scandir", scandir)
 
     infos = collect.collect_menus()
 
     assert infos["legacy"].name == "Legacy"
+
+
+def test_collect_menus_parses_in_parallel_with_deterministic_precedence(
+    picmenu_plugin: object,
+    monkeypatch: "pytest.MonkeyPatch",
+    tmp_path: Path,
+) -> None:
+    """Worker-pool parsing keeps name-ordered duplicate precedence and warnings."""
+    import threading
+
+    from nonebot_plugin_picmenu_next.data_source import collect
+
+    external_dir = tmp_path / "external_infos"
+    (external_dir / "b").mkdir(parents=True)
+    (external_dir / "a.json").write_text("{", encoding="utf-8")
+    (external_dir / "a.toml").write_text('name = "A toml"', encoding="utf-8")
+    (external_dir / "b" / "shared.json").write_text(
+        '{"name": "Nested"}', encoding="utf-8"
+    )
+    (external_dir / "shared.yaml").write_text("name: Top\n", encoding="utf-8")
+    for i in range(8):
+        (external_dir / f"plugin_{i}.json").write_text(
+            f'{{"name": "Plugin {i}"}}', encoding="utf-8"
+        )
+    monkeypatch.setattr(collect, "external_infos_dir", external_dir)
+    monkeypatch.setattr(collect, "pm_menus_dir", tmp_path / "missing-legacy-dir")
+
+    threads: set[int] = set()
+    original = collect.load_menu_file
+
+    def load_menu_file(path: Path, *args: object):
+        threads.add(threading.get_ident())
+        return original(path, *args)
+
+    monkeypatch.setattr(collect, "load_menu_file", load_menu_file)
+
+    infos = collect.collect_menus()
+
+    assert infos["a"].name == "A toml"
+    assert infos["shared"].name == "Nested"
+    assert [infos[f"plugin_{i}"].name for i in range(8)] == [
+        f"Plugin {i}" for i in range(8)
+    ]
+    assert threading.get_ident() not in threads
+
+
+def test_collect_menus_reuses_validated_configs_for_unchanged_files(
+    picmenu_plugin: object,
+    monkeypatch: "pytest.MonkeyPatch",
+    tmp_path: Path,
+) -> None:
+    """Only files whose content changed are parsed again across collections."""
+    from cookit.pyd import model_fields_set
+    from nonebot_plugin_picmenu_next.config import config
+    from nonebot_plugin_picmenu_next.data_source import collect, menu_cache
+
+    external_dir = tmp_path / "external_infos"
+    external_dir.mkdir()
+    (external_dir / "kept.yaml").write_text(
+        "description: null\nfuncs: []\npmn:\n  hidden: true\n", encoding="utf-8"
+    )
+    (external_dir / "changed.json").write_text('{"name": "Old"}', encoding="utf-8")
+    monkeypatch.setattr(collect, "external_infos_dir", external_dir)
+    monkeypatch.setattr(collect, "pm_menus_dir", tmp_path / "missing-legacy-dir")
+    monkeypatch.setattr(
+        menu_cache, "external_infos_cache_path", tmp_path / "cache" / "menus.json"
+    )
+    monkeypatch.setattr(config, "info_cache", True)
+
+    parsed: list[str] = []
+    original = collect.parse_menu_file
+
+    def parse_menu_file(suffix: str, text: str):
+        parsed.append(suffix)
+        return original(suffix, text)
+
+    monkeypatch.setattr(collect, "parse_menu_file", parse_menu_file)
+
+    collect.collect_menus()
+    assert sorted(parsed) == [".json", ".yaml"]
+
+    parsed.clear()
+    (external_dir / "changed.json").write_text('{"name": "New"}', encoding="utf-8")
+    infos = collect.collect_menus()
+
+    assert parsed == [".json"]
+    assert infos["changed"].name == "New"
+    kept = infos["kept"]
+    assert model_fields_set(kept) == {"description", "funcs", "pmn"}
+    assert model_fields_set(kept.pmn) == {"hidden"}
+    assert kept.has_func_override() is True
+    assert kept.pmn.hidden is True
+
+
+def test_menu_file_cache_restores_configs_without_validation(
+    picmenu_plugin: object,
+    tmp_path: Path,
+) -> None:
+    """Cache hits rebuild the same models, including nested and set fields."""
+    from cookit.pyd import model_dump, model_fields_set
+    from nonebot_plugin_picmenu_next.data_source import collect, menu_cache, models
+
+    info = collect.parse_menu_file(
+        ".yaml",
+        "funcs:\n"
+        "  - func: f\n"
+        "    trigger_method: m\n"
+        "    trigger_condition: c\n"
+        "    brief_des: b\n"
+        "    detail_des: d\n"
+        "    pmn_hidden: true\n"
+        "pmn:\n"
+        "  markdown: true\n"
+        "supported_adapters: [b, a]\n",
+    )
+    cache = menu_cache.MenuFileCache(tmp_path / "menus.json")
+    cache.set("key", info)
+    cache.save()
+
+    loaded = menu_cache.MenuFileCache.load(tmp_path / "menus.json")
+    restored = loaded.get("key")
+
+    assert restored is not None
+    assert model_dump(restored) == model_dump(info)
+    assert model_fields_set(restored) == model_fields_set(info)
+    assert model_fields_set(restored.pmn) == {"markdown"}
+    assert restored.supported_adapters == {"a", "b"}
+    assert restored.funcs
+    assert isinstance(restored.funcs[0], models.PMDataItem)
+    assert restored.funcs[0].hidden is True
+    assert restored.funcs[0].alc_cmd_id is None
+
+    # entries were validated before caching, a hit does not validate them again
+    loaded.items["unchecked"] = {"name": None}
+    unchecked = loaded.get("unchecked")
+    assert unchecked is not None
+    assert unchecked.name is None
+
+
+def test_compiled_menu_bundle_loads_like_its_source_directory(
+    picmenu_plugin: object,
+    monkeypatch: "pytest.MonkeyPatch",
+    tmp_path: Path,
+) -> None:
+    """A compiled bundle keeps sparse overlays and shares duplicate precedence."""
+    from cookit.pyd import model_fields_set, type_dump_json
+    from nonebot_plugin_picmenu_next.data_source import collect
+
+    source_dir = tmp_path / "source"
+    (source_dir / "nested").mkdir(parents=True)
+    (source_dir / "sparse.yaml").write_text(
+        "description: null\npmn:\n  hidden: true\n", encoding="utf-8"
+    )
+    (source_dir / "nested" / "shared.json").write_text(
+        '{"name": "Nested"}', encoding="utf-8"
+    )
+    (source_dir / "shared.toml").write_text('name = "Top"', encoding="utf-8")
+    (source_dir / "old.bundle.json").write_text(
+        '{"infos": {"stale": {"name": "Stale"}}}', encoding="utf-8"
+    )
+
+    bundle = collect.compile_menu_bundle(source_dir)
+    assert set(bundle.infos) == {"sparse", "shared"}
+
+    external_dir = tmp_path / "external_infos"
+    external_dir.mkdir()
+    (external_dir / "menus.bundle.json").write_text(
+        type_dump_json(bundle, by_alias=True, exclude_unset=True), encoding="utf-8"
+    )
+    (external_dir / "sparse.json").write_text('{"name": "Late"}', encoding="utf-8")
+    (external_dir / "extra.json").write_text('{"name": "Extra"}', encoding="utf-8")
+    monkeypatch.setattr(collect, "external_infos_dir", external_dir)
+    monkeypatch.setattr(collect, "pm_menus_dir", tmp_path / "missing-legacy-dir")
+
+    infos = collect.collect_menus()
+
+    assert set(infos) == {"sparse", "shared", "extra"}
+    assert infos["shared"].name == "Nested"
+    sparse = infos["sparse"]
+    assert model_fields_set(sparse) == {"description", "pmn"}
+    assert model_fields_set(sparse.pmn) == {"hidden"}
+    assert sparse.description is None
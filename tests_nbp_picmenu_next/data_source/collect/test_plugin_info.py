@@ -1,5 +1,6 @@
 """Tests for external help-data collection."""
 
+import sys
 from types import SimpleNamespace
 from typing import TYPE_CHECKING, cast
 
@@ -7,6 +8,8 @@ from arclet.alconna import Alconna, CommandMeta, command_manager
 from nonebot.plugin import PluginMetadata
 
 if TYPE_CHECKING:
+    from pathlib import Path
+
     import pytest
     from nonebot.plugin import Plugin
 
@@ -59,18 +62,11 @@ def test_collect_helpers_normalize_metadata_and_recurse_to_parent_packages(
             raise PackageNotFoundError(module_name)
         return distribution
 
-    version_calls: list[str] = []
-
-    def import_module(module_name: str) -> object:
-        version_calls.append(module_name)
-        if module_name == "package.child":
-            return SimpleNamespace()
-        return SimpleNamespace(__version__="3.0")
-
     collect.get_dist.cache_clear()
     collect.get_version_attr.cache_clear()
     monkeypatch.setattr(collect, "distribution", find_distribution)
-    monkeypatch.setattr(collect.importlib, "import_module", import_module)
+    monkeypatch.setitem(sys.modules, "package", SimpleNamespace(__version__="3.0"))
+    monkeypatch.setitem(sys.modules, "package.child", SimpleNamespace())
 
     assert collect.normalize_metadata_user("Alice <a>, Bob <b>") == "Alice"
     assert collect.normalize_metadata_user("Alice <a>, Bob <b>", allow_multi=True) == (
@@ -79,7 +75,53 @@ def test_collect_helpers_normalize_metadata_and_recurse_to_parent_packages(
     assert collect.get_dist("package.child") is distribution
     assert dist_calls == ["package.child", "package"]
     assert collect.get_version_attr("package.child") == "3.0"
-    assert version_calls == ["package.child", "package"]
+
+
+def test_version_attr_is_parsed_statically_without_importing(
+    picmenu_plugin: object,
+    monkeypatch: "pytest.MonkeyPatch",
+    tmp_path: "Path",
+) -> None:
+    """Unloaded packages expose `__version__` through source parsing, not import."""
+    from nonebot_plugin_picmenu_next.data_source import collect
+
+    package = tmp_path / "pmn_static_version_pkg"
+    package.mkdir()
+    (package / "__init__.py").write_text(
+        'raise RuntimeError("imported")\n__version__: str = "1.2.3"\n',
+    )
+    (package / "child.py").write_text("raise RuntimeError('imported')\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    collect.get_version_attr.cache_clear()
+
+    assert collect.get_version_attr("pmn_static_version_pkg.child") == "1.2.3"
+    assert "pmn_static_version_pkg" not in sys.modules
+    assert collect.get_version_attr("pmn_static_version_missing") is None
+
+
+def test_version_attr_imports_only_when_fallback_is_enabled(
+    picmenu_plugin: object,
+    monkeypatch: "pytest.MonkeyPatch",
+) -> None:
+    from nonebot_plugin_picmenu_next.config import config
+    from nonebot_plugin_picmenu_next.data_source import collect
+
+    import_calls: list[str] = []
+
+    def import_module(module_name: str) -> object:
+        import_calls.append(module_name)
+        return SimpleNamespace(__version__="4.0")
+
+    monkeypatch.setattr(collect.importlib, "import_module", import_module)
+    collect.get_version_attr.cache_clear()
+    assert collect.get_version_attr("pmn_dynamic_version_missing") is None
+    assert import_calls == []
+
+    monkeypatch.setattr(config, "version_import_fallback", True)
+    collect.get_version_attr.cache_clear()
+    assert collect.get_version_attr("pmn_dynamic_version_missing") == "4.0"
+    assert import_calls == ["pmn_dynamic_version_missing"]
+    collect.get_version_attr.cache_clear()
 
 
 async def test_plugin_metadata_falls_back_to_distribution_version_and_author(
@@ -338,3 +380,111 @@ async def test_loaded_plugins_keep_display_metadata_fallbacks(
     assert metadata_less.version == "module-version"
     assert metadata_less.author == "Carol & Dan"
     assert metadata_less.description == "distribution summary"
+
+
+async def test_collect_plugin_infos_runs_off_loop_and_skips_timed_out_plugins(
+    picmenu_plugin: object,
+    monkeypatch: "pytest.MonkeyPatch",
+) -> None:
+    """Metadata collection runs in worker threads and a stuck plugin is skipped."""
+    import threading
+
+    from nonebot_plugin_picmenu_next.config import config
+    from nonebot_plugin_picmenu_next.data_source import collect
+
+    loop_thread = threading.get_ident()
+    worker_threads: set[int] = set()
+    release = threading.Event()
+    original = collect.get_info_from_plugin_sync
+
+    def get_info(plugin: "Plugin"):
+        worker_threads.add(threading.get_ident())
+        if plugin.id_ == "stuck_plugin":
+            release.wait(5)
+        return original(plugin)
+
+    metadata = PluginMetadata(name="Plugin", description="d", usage="u", extra={})
+    monkeypatch.setattr(collect, "get_info_from_plugin_sync", get_info)
+    monkeypatch.setattr(collect, "collect_menus", dict)
+    monkeypatch.setattr(config, "collect_timeout", 0.2)
+
+    try:
+        infos = await collect.collect_plugin_infos(
+            [
+                make_plugin("stuck_plugin", metadata),
+                make_plugin("fast_plugin", metadata),
+            ]
+        )
+    finally:
+        release.set()
+
+    assert [info.plugin_id for info in infos] == ["fast_plugin"]
+    assert worker_threads
+    assert loop_thread not in worker_threads
+
+
+async def test_collect_timeout_does_not_count_time_queued_for_a_worker(
+    picmenu_plugin: object,
+    monkeypatch: "pytest.MonkeyPatch",
+) -> None:
+    """Healthy plugins waiting behind busy workers are not dropped as timed out."""
+    import time
+
+    from nonebot_plugin_picmenu_next.config import config
+    from nonebot_plugin_picmenu_next.data_source import collect
+
+    original = collect.get_info_from_plugin_sync
+
+    def get_info(plugin: "Plugin"):
+        time.sleep(0.1)
+        return original(plugin)
+
+    metadata = PluginMetadata(name="Plugin", description="d", usage="u", extra={})
+    monkeypatch.setattr(collect, "get_info_from_plugin_sync", get_info)
+    monkeypatch.setattr(config, "collect_workers", 1)
+    monkeypatch.setattr(config, "collect_timeout", 0.25)
+
+    infos = await collect.collect_base_infos(
+        [make_plugin(f"plugin_{i}", metadata) for i in range(4)],
+    )
+
+    assert sorted(x.plugin_id or "" for x in infos) == [f"plugin_{i}" for i in range(4)]
+
+
+async def test_collect_gives_up_on_plugins_queued_behind_a_hung_worker(
+    picmenu_plugin: object,
+    monkeypatch: "pytest.MonkeyPatch",
+) -> None:
+    """A worker that never finishes cannot block the rest of the collection."""
+    import threading
+    import time
+
+    from nonebot_plugin_picmenu_next.config import config
+    from nonebot_plugin_picmenu_next.data_source import collect
+
+    original = collect.get_info_from_plugin_sync
+    release = threading.Event()
+
+    def get_info(plugin: "Plugin"):
+        if plugin.id_ == "hung":
+            release.wait()
+        return original(plugin)
+
+    metadata = PluginMetadata(name="Plugin", description="d", usage="u", extra={})
+    monkeypatch.setattr(collect, "get_info_from_plugin_sync", get_info)
+    monkeypatch.setattr(config, "collect_workers", 1)
+    monkeypatch.setattr(config, "collect_timeout", 0.1)
+
+    failed: set[str] = set()
+    start = time.perf_counter()
+    try:
+        infos = await collect.collect_base_infos(
+            [make_plugin(x, metadata) for x in ("fast", "hung", "late", "later")],
+            failed=failed,
+        )
+    finally:
+        release.set()
+
+    assert time.perf_counter() - start < 1
+    assert [x.plugin_id for x in infos] == ["fast"]
+    assert failed == {"hung", "late", "later"}
@@ -6,6 +6,8 @@ from typing import TYPE_CHECKING
 from nonebot.plugin import PluginMetadata
 
 if TYPE_CHECKING:
+    from pathlib import Path
+
     import pytest
 
 
@@ -34,3 +36,377 @@ async def test_refresh_infos_sorts_and_publishes_the_current_snapshot(
 
     assert [info.plugin_id for info in refreshed] == ["a_plugin", "z_plugin"]
     assert data_source.get_infos() is refreshed
+
+
+async def test_refresh_infos_reuses_cache_only_while_fingerprint_matches(
+    picmenu_plugin: object,
+    monkeypatch: "pytest.MonkeyPatch",
+    tmp_path: "Path",
+) -> None:
+    """A startup refresh reuses persisted infos until any collection input changes."""
+    from nonebot_plugin_picmenu_next import data_source
+    from nonebot_plugin_picmenu_next.config import config
+    from nonebot_plugin_picmenu_next.data_source import cache, collect
+    from nonebot_plugin_picmenu_next.data_source.models import PMDataItem
+
+    item = PMDataItem(
+        func="功能",
+        trigger_method="trigger",
+        trigger_condition="condition",
+        brief_des="brief",
+        detail_des="detail",
+        pmn_hidden=True,
+    )
+    item._alc_cmd_id = "cached-command"  # noqa: SLF001
+    metadata = PluginMetadata(
+        name="缓存插件",
+        description="description",
+        usage="usage",
+        extra={"menu_data": [item]},
+    )
+    plugins = [
+        SimpleNamespace(
+            id_="cache_plugin", module_name="cache_plugin", metadata=metadata
+        )
+    ]
+    monkeypatch.setattr(data_source, "_get_loaded_plugins", lambda: plugins)
+    monkeypatch.setattr(collect, "collect_menus", dict)
+    monkeypatch.setattr(cache, "info_cache_path", tmp_path / "infos.json")
+    monkeypatch.setattr(config, "info_cache", True)
+
+    collected = await data_source.refresh_infos(use_cache=True)
+    assert (tmp_path / "infos.json").exists()
+
+    async def fail_collect(*_args: object) -> object:
+        raise AssertionError("collection should be skipped")
+
+    monkeypatch.setattr(data_source, "_collect_plugin_infos", fail_collect)
+    cached = await data_source.refresh_infos(use_cache=True)
+
+    assert cached is not collected
+    assert [x.plugin_id for x in cached] == ["cache_plugin"]
+    assert cached[0].pm_data is not None
+    assert cached[0].pm_data[0].hidden is True
+    assert cached[0].pm_data[0].alc_cmd_id == "cached-command"
+
+    collect_calls: list[object] = []
+
+    async def count_collect(plugins: object, *_args: object) -> list[object]:
+        collect_calls.append(plugins)
+        return []
+
+    monkeypatch.setattr(data_source, "_collect_plugin_infos", count_collect)
+    metadata.description = "changed"
+    assert (await data_source.refresh_infos(use_cache=True)).infos == ()
+    assert len(collect_calls) == 1
+
+
+async def test_refresh_infos_does_not_cache_a_collection_with_failed_plugins(
+    picmenu_plugin: object,
+    monkeypatch: "pytest.MonkeyPatch",
+    tmp_path: "Path",
+) -> None:
+    """A one-off plugin failure is not persisted to later startups."""
+    from nonebot_plugin_picmenu_next import data_source
+    from nonebot_plugin_picmenu_next.config import config
+    from nonebot_plugin_picmenu_next.data_source import cache, collect
+
+    metadata = PluginMetadata(name="插件", description="d", usage="u", extra={})
+    plugins = [
+        SimpleNamespace(id_=x, module_name=x, metadata=metadata)
+        for x in ("ok_plugin", "broken_plugin")
+    ]
+    original = collect.get_info_from_plugin_sync
+    broken = True
+
+    def get_info(plugin: SimpleNamespace):
+        if broken and plugin.id_ == "broken_plugin":
+            raise OSError("transient")
+        return original(plugin)  # type: ignore[arg-type]
+
+    monkeypatch.setattr(data_source, "_get_loaded_plugins", lambda: plugins)
+    monkeypatch.setattr(collect, "get_info_from_plugin_sync", get_info)
+    monkeypatch.setattr(collect, "collect_menus", dict)
+    monkeypatch.setattr(cache, "info_cache_path", tmp_path / "infos.json")
+    monkeypatch.setattr(config, "info_cache", True)
+
+    infos = await data_source.refresh_infos(use_cache=True)
+    assert [x.plugin_id for x in infos] == ["ok_plugin"]
+    assert not (tmp_path / "infos.json").exists()
+
+    broken = False
+    infos = await data_source.refresh_infos(use_cache=True)
+    assert sorted(x.plugin_id or "" for x in infos) == ["broken_plugin", "ok_plugin"]
+    assert [x.name for x in tmp_path.iterdir()] == ["infos.json"]
+
+
+async def test_refresh_plugin_info_splices_one_plugin_into_sorted_snapshot(
+    picmenu_plugin: object,
+    monkeypatch: "pytest.MonkeyPatch",
+) -> None:
+    """Refreshing one plugin re-sorts it in place and keeps other infos as-is."""
+    from nonebot_plugin_picmenu_next import data_source
+    from nonebot_plugin_picmenu_next.config import config
+    from nonebot_plugin_picmenu_next.data_source import collect
+
+    def make_plugin(plugin_id: str, name: str) -> SimpleNamespace:
+        return SimpleNamespace(
+            id_=plugin_id,
+            module_name=plugin_id,
+            metadata=PluginMetadata(
+                name=name, description="description", usage="usage", extra={}
+            ),
+        )
+
+    plugins = {
+        x.id_: x
+        for x in (make_plugin("a_plugin", "Alpha"), make_plugin("m_plugin", "Mid"))
+    }
+    monkeypatch.setattr(data_source, "_get_loaded_plugins", lambda: plugins.values())
+    monkeypatch.setattr(data_source, "_get_plugin", plugins.get)
+    monkeypatch.setattr(collect, "collect_menus", dict)
+    monkeypatch.setattr(config, "info_cache", False)
+
+    infos = await data_source.refresh_infos()
+    mid = infos[1]
+
+    plugins["a_plugin"] = make_plugin("a_plugin", "Zulu")
+    refreshed = await data_source.refresh_plugin_info("a_plugin")
+    assert [x.name for x in refreshed] == ["Mid", "Zulu"]
+    assert refreshed[0] is mid
+
+    plugins["late_plugin"] = make_plugin("late_plugin", "Beta")
+    refreshed = await data_source.refresh_plugin_info("late_plugin")
+    assert [x.name for x in refreshed] == ["Beta", "Mid", "Zulu"]
+
+    del plugins["m_plugin"]
+    refreshed = await data_source.refresh_plugin_info("m_plugin")
+    assert [x.name for x in refreshed] == ["Beta", "Zulu"]
+    assert data_source.get_infos() is refreshed
+
+
+async def test_refresh_plugin_info_keeps_a_loaded_plugin_when_collecting_fails(
+    picmenu_plugin: object,
+    monkeypatch: "pytest.MonkeyPatch",
+) -> None:
+    """Errors and timeouts keep the previous info, only unloading removes it."""
+    import asyncio
+
+    from nonebot_plugin_picmenu_next import data_source
+    from nonebot_plugin_picmenu_next.config import config
+    from nonebot_plugin_picmenu_next.data_source import collect
+
+    metadata = PluginMetadata(name="插件", description="d", usage="u", extra={})
+    plugins = {
+        x: SimpleNamespace(id_=x, module_name=x, metadata=metadata)
+        for x in ("a_plugin", "b_plugin")
+    }
+    monkeypatch.setattr(data_source, "_get_loaded_plugins", lambda: plugins.values())
+    monkeypatch.setattr(data_source, "_get_plugin", plugins.get)
+    monkeypatch.setattr(collect, "collect_menus", dict)
+    monkeypatch.setattr(config, "info_cache", False)
+    monkeypatch.setattr(config, "collect_timeout", 0.05)
+
+    infos = await data_source.refresh_infos()
+    state = data_source._collect_state  # noqa: SLF001
+    assert state is not None
+    base_info = state.base_infos["a_plugin"]
+
+    async def broken(_plugin: object) -> object:
+        raise RuntimeError("broken")
+
+    async def stuck(_plugin: object) -> object:
+        await asyncio.sleep(10)
+        raise AssertionError("should time out")
+
+    for get_info in (broken, stuck):
+        monkeypatch.setattr(data_source, "_get_info_from_plugin", get_info)
+        assert await data_source.refresh_plugin_info("a_plugin") is infos
+        assert state.base_infos["a_plugin"] is base_info
+
+    del plugins["a_plugin"]
+    refreshed = await data_source.refresh_plugin_info("a_plugin")
+    assert [x.plugin_id for x in refreshed] == ["b_plugin"]
+    assert "a_plugin" not in state.base_infos
+
+
+async def test_refresh_plugin_info_only_invalidates_caches_of_that_plugin(
+    picmenu_plugin: object,
+    monkeypatch: "pytest.MonkeyPatch",
+) -> None:
+    """Render and module lookup caches of other plugins survive a single refresh."""
+    from nonebot_plugin_picmenu_next import data_source, markdown
+    from nonebot_plugin_picmenu_next.config import config
+    from nonebot_plugin_picmenu_next.data_source import collect
+
+    metadata = PluginMetadata(name="插件", description="d", usage="u", extra={})
+    plugins = {
+        x: SimpleNamespace(id_=x, module_name=x, metadata=metadata)
+        for x in ("a_plugin", "b_plugin")
+    }
+    monkeypatch.setattr(data_source, "_get_loaded_plugins", lambda: plugins.values())
+    monkeypatch.setattr(data_source, "_get_plugin", plugins.get)
+    monkeypatch.setattr(collect, "collect_menus", dict)
+    monkeypatch.setattr(config, "info_cache", False)
+    render_cache = markdown.MarkdownRenderCache()
+    monkeypatch.setattr(markdown, "md_render_cache", render_cache)
+    prp_cache = markdown.PluginResPathCache()
+    monkeypatch.setattr(markdown, "_prp_caches", {prp_cache})
+    monkeypatch.setattr(collect.get_version_attr, "items", {})
+
+    await data_source.refresh_infos()
+    for plugin_id in ("a_plugin", "b_plugin"):
+        render_cache.set(("text", plugin_id, None, None), "html", 10)
+        prp_cache.items[plugin_id, "res.png"] = None
+        collect.get_version_attr.items[plugin_id] = "1.0"
+
+    await data_source.refresh_plugin_info("a_plugin")
+
+    assert [k[1] for k in render_cache.items] == ["b_plugin"]  # type: ignore[index]
+    assert render_cache.size == 10
+    assert list(prp_cache.items) == [("b_plugin", "res.png")]
+    assert collect.get_version_attr.items == {"b_plugin": "1.0"}
+
+
+async def test_prerendered_fragments_are_published_and_reused_on_splice(
+    picmenu_plugin: object,
+    monkeypatch: "pytest.MonkeyPatch",
+) -> None:
+    """Optional prerendering attaches HTML fragments and reuses unchanged plugins."""
+    from nonebot_plugin_picmenu_next import data_source
+    from nonebot_plugin_picmenu_next.config import config
+    from nonebot_plugin_picmenu_next.data_source import collect
+    from nonebot_plugin_picmenu_next.templates import jj_utils
+
+    def make_plugin(plugin_id: str, usage: str) -> SimpleNamespace:
+        return SimpleNamespace(
+            id_=plugin_id,
+            module_name=plugin_id,
+            metadata=PluginMetadata(
+                name=plugin_id,
+                description="description",
+                usage=usage,
+                extra={"pmn": {"markdown": True}},
+            ),
+        )
+
+    plugins = {x: make_plugin(x, f"**{x}**") for x in ("a_plugin", "b_plugin")}
+    monkeypatch.setattr(data_source, "_get_loaded_plugins", lambda: plugins.values())
+    monkeypatch.setattr(data_source, "_get_plugin", plugins.get)
+    monkeypatch.setattr(collect, "collect_menus", dict)
+    monkeypatch.setattr(config, "info_cache", False)
+    monkeypatch.setattr(config, "prerender_html", True)
+    monkeypatch.setattr(jj_utils, "prerender_processors", [None])
+
+    key = ("html_fragments", None)
+    snapshot = await data_source.refresh_infos()
+    fragments = snapshot.peek(key)
+    assert fragments is not None
+    kept = fragments["**b_plugin**", True, "b_plugin"]
+    assert "<strong>b_plugin</strong>" in kept
+    assert ("description", True, None) in fragments
+
+    plugins["a_plugin"] = make_plugin("a_plugin", "*changed*")
+    refreshed = await data_source.refresh_plugin_info("a_plugin")
+    new_fragments = refreshed.peek(key)
+    assert new_fragments is not None
+    assert new_fragments["**b_plugin**", True, "b_plugin"] is kept
+    assert "<em>changed</em>" in new_fragments["*changed*", True, "a_plugin"]
+    assert ("**a_plugin**", True, "a_plugin") not in new_fragments
+
+
+async def test_refreshes_publish_new_immutable_snapshots(
+    picmenu_plugin: object,
+    monkeypatch: "pytest.MonkeyPatch",
+) -> None:
+    """Each refresh publishes a new generation and leaves older snapshots intact."""
+    import pytest
+    from nonebot_plugin_picmenu_next import data_source
+    from nonebot_plugin_picmenu_next.config import config
+    from nonebot_plugin_picmenu_next.data_source import collect
+
+    metadata = PluginMetadata(name="插件", description="d", usage="u", extra={})
+    plugins = {
+        x: SimpleNamespace(id_=x, module_name=x, metadata=metadata)
+        for x in ("a_plugin", "b_plugin")
+    }
+    monkeypatch.setattr(data_source, "_get_loaded_plugins", lambda: plugins.values())
+    monkeypatch.setattr(data_source, "_get_plugin", plugins.get)
+    monkeypatch.setattr(collect, "collect_menus", dict)
+    monkeypatch.setattr(config, "info_cache", False)
+
+    first = await data_source.refresh_infos()
+    assert isinstance(first.infos, tuple)
+    assert first.get("b_plugin") is first[1]
+    assert first.get("missing") is None
+    with pytest.raises(TypeError):
+        first.by_plugin_id["c_plugin"] = first[0]  # pyright: ignore[reportIndexIssue]
+
+    del plugins["a_plugin"]
+    second = await data_source.refresh_plugin_info("a_plugin")
+
+    assert second.generation > first.generation
+    assert second.built_at >= first.built_at
+    assert [x.plugin_id for x in second] == ["b_plugin"]
+    assert [x.plugin_id for x in first] == ["a_plugin", "b_plugin"]
+    assert first.get("a_plugin") is not None
+
+
+async def test_refresh_infos_records_a_collection_profile(
+    picmenu_plugin: object,
+    monkeypatch: "pytest.MonkeyPatch",
+) -> None:
+    """A full refresh times plugins, stages and the self time of each mixin."""
+    import asyncio
+    from typing import Any, cast
+
+    from nonebot_plugin_picmenu_next import data_source
+    from nonebot_plugin_picmenu_next.config import config
+    from nonebot_plugin_picmenu_next.data_source import collect, mixin
+
+    async def outer(next_chain: Any, infos: list[Any]) -> list[Any]:
+        return await next_chain(infos)
+
+    async def inner(next_chain: Any, infos: list[Any]) -> list[Any]:
+        await asyncio.sleep(0.05)
+        return await next_chain(infos)
+
+    source = cast(
+        "Any", SimpleNamespace(plugin_id="owner", module_name="owner.mixins", lineno=3)
+    )
+    monkeypatch.setattr(
+        mixin.plugin_collect_mixins,
+        "data",
+        [
+            mixin.MixinInfo(func=outer, priority=1, source=source),
+            mixin.MixinInfo(func=inner, priority=2, source=None),
+        ],
+    )
+    metadata = PluginMetadata(name="插件", description="d", usage="u", extra={})
+    plugins = [
+        SimpleNamespace(id_=x, module_name=x, metadata=metadata)
+        for x in ("a_plugin", "b_plugin")
+    ]
+    monkeypatch.setattr(data_source, "_get_loaded_plugins", lambda: plugins)
+    monkeypatch.setattr(collect, "collect_menus", dict)
+    monkeypatch.setattr(config, "info_cache", False)
+
+    await data_source.refresh_infos()
+    profile = data_source.get_collect_profile()
+
+    assert profile is not None
+    assert set(profile.plugins) == {"a_plugin", "b_plugin"}
+    assert {
+        "get_info_from_plugin",
+        "collect_menus",
+        "apply_alconna_command_infos",
+        "plugin_collect_mixins",
+        "sort_infos",
+    } <= set(profile.stages)
+    assert profile.mixins["owner:owner.mixins:3"] < 0.05
+    assert profile.mixins[inner.__qualname__] >= 0.05
+    assert profile.total >= profile.stages["plugin_collect_mixins"]
+
+    report = profile.format_report()
+    assert report.splitlines()[1].startswith("总耗时")
+    assert "  owner:owner.mixins:3: " in report
@@ -0,0 +1,56 @@
+"""Tests for the menu bundle compiler command."""
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def test_bundle_compiler_runs_without_nonebot(tmp_path: "Path") -> None:
+    """The shipped compiler works in a bare interpreter and writes nothing else."""
+    import json
+    import subprocess
+    import sys
+
+    source_dir = tmp_path / "menus"
+    source_dir.mkdir()
+    (source_dir / "a_plugin.json").write_text('{"name": "A"}', encoding="utf-8")
+    (source_dir / "b_plugin.toml").write_text('name = "B"', encoding="utf-8")
+
+    proc = subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "nonebot_plugin_picmenu_next.data_source.bundle",
+            "menus",
+            "out.bundle.json",
+        ],
+        cwd=tmp_path,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    assert "Compiled 2 menus into out.bundle.json" in proc.stdout
+    bundle = json.loads((tmp_path / "out.bundle.json").read_text("u8"))
+    assert bundle == {"infos": {"a_plugin": {"name": "A"}, "b_plugin": {"name": "B"}}}
+    assert {x.name for x in tmp_path.iterdir()} == {"menus", "out.bundle.json"}
+
+
+def test_bundle_compiler_defaults_output_next_to_source(
+    picmenu_plugin: object,
+    tmp_path: "Path",
+) -> None:
+    """Without an output path the bundle is written beside the source directory."""
+    import pytest
+    from nonebot_plugin_picmenu_next.data_source import bundle
+
+    source_dir = tmp_path / "menus"
+    source_dir.mkdir()
+    (source_dir / "a_plugin.json").write_text('{"name": "A"}', encoding="utf-8")
+
+    bundle.main([str(source_dir)])
+    assert (tmp_path / "menus.bundle.json").exists()
+
+    with pytest.raises(SystemExit):
+        bundle.main([str(tmp_path / "missing")])
@@ -239,3 +239,329 @@ async def test_mixin_collector_preserves_equal_priority_registration_order(
         "second-exit",
         "first-exit",
     ]
+
+
+async def test_mixin_collector_compiles_chains_once_until_registration(
+    picmenu_plugin: object,
+) -> None:
+    """Compiled chains are reused until a new Mixin registers or data is edited."""
+    from nonebot_plugin_picmenu_next.data_source.mixin import MixinCollector
+
+    collector = MixinCollector()
+    source = cast("Any", SimpleNamespace(plugin_id="test"))
+
+    async def final(value: str) -> str:
+        return value
+
+    @collector(priority=2, _matcher_source=source)
+    async def suffix(next_chain: Any, value: str) -> str:
+        return await next_chain(f"{value}-suffix")
+
+    chain = collector.compile(final)
+    assert collector.compile(final) is chain
+    assert await chain("value") == "value-suffix"
+
+    @collector(priority=1, _matcher_source=source)
+    async def prefix(next_chain: Any, value: str) -> str:
+        return await next_chain(f"prefix-{value}")
+
+    registered = collector.compile(final)
+    assert registered is not chain
+    assert await registered("value") == "prefix-value-suffix"
+
+    collector.data.pop()
+    edited = collector.compile(final)
+    assert edited is not registered
+    assert await edited("value") == "prefix-value"
+    assert collector.compile(final) is edited
+
+    collector.data = [*collector.data]
+    replaced = collector.compile(final)
+    assert replaced is not edited
+    assert collector.compile(final) is replaced
+
+    collector.data[0] = collector.data[0]
+    assert collector.compile(final) is not replaced
+
+
+async def test_cacheable_mixin_chains_are_memoized_per_generation_and_key(
+    picmenu_plugin: object,
+) -> None:
+    """Chains of cacheable Mixins rerun only when their inputs or keys change."""
+    from nonebot_plugin_picmenu_next.data_source.mixin import (
+        MixinCollector,
+        MixinContext,
+        run_mixins,
+        use_mixin_context,
+    )
+
+    calls: list[str] = []
+    collector = MixinCollector()
+    source = cast("Any", SimpleNamespace(plugin_id="test"))
+
+    @collector(
+        _matcher_source=source,
+        cacheable=True,
+        cache_key=lambda ctx: ctx.show_hidden,
+    )
+    async def pure(next_chain: Any, values: list[str]) -> list[str]:
+        calls.append("pure")
+        return await next_chain([*values, "pure"])
+
+    def context(generation: int, *, show_hidden: bool = False) -> MixinContext:
+        return MixinContext(
+            generation=generation,
+            bot=cast("Any", SimpleNamespace()),
+            event=cast("Any", SimpleNamespace()),
+            show_hidden=show_hidden,
+        )
+
+    values = ["value"]
+    assert await run_mixins(collector, values) == ["value", "pure"]
+    with use_mixin_context(context(1)):
+        first = await run_mixins(collector, values)
+        assert await run_mixins(collector, values) is first
+        assert await run_mixins(collector, ["value"]) is not first
+    with use_mixin_context(context(1, show_hidden=True)):
+        await run_mixins(collector, values)
+    with use_mixin_context(context(2)):
+        assert await run_mixins(collector, values) is not first
+    assert calls == ["pure"] * 5
+
+    @collector(_matcher_source=source)
+    async def impure(next_chain: Any, values: list[str]) -> list[str]:
+        calls.append("impure")
+        return await next_chain(values)
+
+    calls.clear()
+    with use_mixin_context(context(2)):
+        await run_mixins(collector, values)
+        await run_mixins(collector, values)
+    assert calls == ["pure", "impure"] * 2
+
+
+async def test_failing_mixin_cache_keys_run_the_chain_without_memo(
+    picmenu_plugin: object,
+) -> None:
+    """A cache key that raises or cannot be hashed only disables the memo."""
+    from nonebot_plugin_picmenu_next.data_source.mixin import (
+        MixinCollector,
+        MixinContext,
+        run_mixins,
+        use_mixin_context,
+    )
+
+    calls: list[str] = []
+    source = cast("Any", SimpleNamespace(plugin_id="test"))
+
+    def broken_key(_ctx: MixinContext) -> Any:
+        raise RuntimeError("broken")
+
+    context = MixinContext(
+        generation=1,
+        bot=cast("Any", SimpleNamespace()),
+        event=cast("Any", SimpleNamespace()),
+    )
+    values = ["value"]
+    for cache_key in (broken_key, lambda _ctx: ["unhashable"]):
+        collector = MixinCollector()
+
+        @collector(_matcher_source=source, cacheable=True, cache_key=cache_key)
+        async def pure(next_chain: Any, values: list[str]) -> list[str]:
+            calls.append("pure")
+            return await next_chain([*values, "pure"])
+
+        with use_mixin_context(context):
+            assert await run_mixins(collector, values) == ["value", "pure"]
+            assert await run_mixins(collector, values) == ["value", "pure"]
+        assert not collector._memo  # noqa: SLF001
+
+    assert calls == ["pure"] * 4
+
+
+async def test_cacheable_plugin_mixins_are_reused_across_menu_requests(
+    picmenu_plugin: object,
+    monkeypatch: "pytest.MonkeyPatch",
+) -> None:
+    """Memoized main Mixin output is keyed by the view list, not the working copy."""
+    from nonebot_plugin_picmenu_next.data_source import mixin
+    from nonebot_plugin_picmenu_next.data_source.models import PMNPluginInfo
+
+    calls: list[int] = []
+
+    async def append(next_chain: Any, infos: list[PMNPluginInfo]) -> list[Any]:
+        calls.append(len(infos))
+        infos.append(PMNPluginInfo(name="extra"))
+        return await next_chain(infos)
+
+    monkeypatch.setattr(
+        mixin.plugin_mixins,
+        "data",
+        [mixin.MixinInfo(append, priority=1, source=None, cacheable=True)],
+    )
+    monkeypatch.setattr(mixin, "self_mixins", mixin.SelfMixinCollector())
+
+    infos = [PMNPluginInfo(name="plugin")]
+    context = mixin.MixinContext(
+        generation=1,
+        bot=cast("Any", SimpleNamespace()),
+        event=cast("Any", SimpleNamespace()),
+    )
+    with mixin.use_mixin_context(context):
+        first = await mixin.resolve_main_mixin(infos)
+        second = await mixin.resolve_main_mixin(infos)
+
+    assert [x.name for x in first] == ["plugin", "extra"]
+    assert second == first
+    assert second is not first
+    assert calls == [1]
+    assert len(infos) == 1
+
+
+async def test_runtime_mixins_are_timed_warned_and_skipped_after_deadline(
+    picmenu_plugin: object,
+    monkeypatch: "pytest.MonkeyPatch",
+) -> None:
+    """Slow Mixins are attributed by source and skipped once past the deadline."""
+    import asyncio
+
+    from nonebot_plugin_picmenu_next.config import config
+    from nonebot_plugin_picmenu_next.data_source import profile
+    from nonebot_plugin_picmenu_next.data_source.mixin import MixinCollector
+
+    stats = profile.MixinStats()
+    monkeypatch.setattr(profile, "mixin_stats", stats)
+    monkeypatch.setattr(config, "mixin_slow_threshold", 0.01)
+    monkeypatch.setattr(config, "mixin_timeout", 0.05)
+
+    events: list[str] = []
+    collector = MixinCollector()
+
+    def source(lineno: int) -> Any:
+        return SimpleNamespace(plugin_id="owner", module_name="mod", lineno=lineno)
+
+    @collector(priority=1, _matcher_source=source(1))
+    async def slow(next_chain: Any, value: str) -> str:
+        await asyncio.sleep(0.02)
+        events.append("slow")
+        return await next_chain(value)
+
+    @collector(priority=2, _matcher_source=source(2))
+    async def stuck(next_chain: Any, value: str) -> str:
+        await asyncio.sleep(1)
+        events.append("stuck")
+        return await next_chain(f"{value}-stuck")
+
+    @collector(priority=3, _matcher_source=source(3))
+    async def last(next_chain: Any, value: str) -> str:
+        result = await next_chain(f"{value}-last")
+        await asyncio.sleep(0.03)
+        events.append("last")
+        return result
+
+    # registration reads the source from the call site, replace it per Mixin
+    for i, x in enumerate(collector.data, 1):
+        x.source = source(i)
+
+    assert (
+        await collector.compile(lambda value: asyncio.sleep(0, value))("value")
+        == "value-last"
+    )
+    assert events == ["slow", "last"]
+
+    slow_timing = stats.timings["owner:mod:1"]
+    assert slow_timing.calls == 1
+    assert slow_timing.slow == 1
+    assert stats.timings["owner:mod:2"].timeouts == 1
+    # self time excludes the Mixins called through `next`
+    assert slow_timing.total < 0.05
+    last_timing = stats.timings["owner:mod:3"]
+    assert last_timing.timeouts == 0
+    assert last_timing.total >= 0.03
+    assert "超时跳过 1 次" in stats.format_report()
+
+
+async def test_chain_outputs_with_a_skipped_mixin_are_not_memoized(
+    picmenu_plugin: object,
+    monkeypatch: "pytest.MonkeyPatch",
+) -> None:
+    """A run that skipped a timed out Mixin is not served from the memo later."""
+    import asyncio
+
+    from nonebot_plugin_picmenu_next.config import config
+    from nonebot_plugin_picmenu_next.data_source import profile
+    from nonebot_plugin_picmenu_next.data_source.mixin import (
+        MixinCollector,
+        MixinContext,
+        run_mixins,
+        use_mixin_context,
+    )
+
+    monkeypatch.setattr(profile, "mixin_stats", profile.MixinStats())
+    monkeypatch.setattr(config, "mixin_timeout", 0.05)
+
+    delays = [1.0, 0.0, 0.0]
+    collector = MixinCollector()
+    source = cast("Any", SimpleNamespace(plugin_id="test"))
+
+    @collector(_matcher_source=source, cacheable=True)
+    async def flaky(next_chain: Any, values: list[str]) -> list[str]:
+        await asyncio.sleep(delays.pop(0))
+        return await next_chain([*values, "flaky"])
+
+    context = MixinContext(
+        generation=1,
+        bot=cast("Any", SimpleNamespace()),
+        event=cast("Any", SimpleNamespace()),
+    )
+    values = ["value"]
+    with use_mixin_context(context):
+        assert await run_mixins(collector, values) == ["value"]
+        recovered = await run_mixins(collector, values)
+        assert recovered == ["value", "flaky"]
+        assert await run_mixins(collector, values) is recovered
+    assert delays == [0.0]
+
+
+async def test_self_mixins_run_concurrently_in_order_with_isolated_errors(
+    picmenu_plugin: object,
+    monkeypatch: "pytest.MonkeyPatch",
+) -> None:
+    """Self Mixin chains of different plugins overlap up to the concurrency bound."""
+    import asyncio
+
+    from nonebot_plugin_picmenu_next.data_source import mixin
+    from nonebot_plugin_picmenu_next.data_source.models import PMNPluginInfo
+
+    running = 0
+    peak = 0
+
+    async def slow(next_chain: Any, info: PMNPluginInfo) -> PMNPluginInfo:
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.02)
+        running -= 1
+        return await next_chain(PMNPluginInfo(name=f"{info.name}!"))
+
+    async def failing(_next_chain: Any, _info: PMNPluginInfo) -> PMNPluginInfo:
+        raise RuntimeError
+
+    self_mixins = mixin.SelfMixinCollector()
+    for plugin_id in ("a", "b", "c", "d"):
+        self_mixins[plugin_id].data.append(
+            mixin.MixinInfo(slow, priority=1, source=None),
+        )
+    self_mixins["b"].data.insert(0, mixin.MixinInfo(failing, priority=0, source=None))
+    monkeypatch.setattr(mixin, "self_mixins", self_mixins)
+    monkeypatch.setattr(mixin.plugin_mixins, "data", [])
+    monkeypatch.setattr(mixin, "SELF_MIXIN_CONCURRENCY", 2)
+
+    infos = [
+        PMNPluginInfo(name=x, plugin_id=x or None) for x in ("d", "", "c", "b", "a")
+    ]
+    result = await mixin.resolve_main_mixin(infos)
+
+    assert [x.name for x in result] == ["d!", "", "c!", "b!", "a!"]
+    assert result[1] is infos[1]
+    assert peak == 2
@@ -175,3 +175,31 @@ def test_plugin_subtitle_uses_available_author_and_version_fields(
         PMNPluginInfo(name="both", author="Alice", version="1.0").subtitle
         == "By Alice | v1.0"
     )
+
+
+def test_plugin_info_sort_key_orders_like_pinyin_then_plugin_id(
+    picmenu_plugin: object,
+) -> None:
+    """The precomputed sort key matches ordering by pinyin chunks and plugin ID."""
+    from nonebot_plugin_picmenu_next.data_source.collect import sort_infos
+    from nonebot_plugin_picmenu_next.data_source.models import PMNPluginInfo
+
+    infos = [
+        PMNPluginInfo(name=name, plugin_id=plugin_id)
+        for name, plugin_id in (
+            ("菜单", "b"),
+            ("帮助", None),
+            ("菜单", "a"),
+            ("Plugin", "c"),
+            ("帮助文档", "d"),
+            ("plugin", "e"),
+        )
+    ]
+
+    expected = sorted(
+        infos,
+        key=lambda x: (list(x.name_pinyin), x.plugin_id or ""),
+    )
+    assert sort_infos(list(infos)) == expected
+    assert all(type(x) in (bool, str, int) for info in infos for x in info.sort_key[0])
+    assert infos[0].sort_key is infos[0].sort_key
@@ -27,12 +27,12 @@ def test_pinyin_chunks_keep_tone_and_non_chinese_text(
 def test_pinyin_chunk_casefold_calculation_lowercases_its_text(
     picmenu_plugin: object,
 ) -> None:
-    """The underlying casefold calculation normalizes a pinyin syllable."""
+    """The casefold calculation normalizes a pinyin syllable."""
     from nonebot_plugin_picmenu_next.data_source import pinyin as pinyin_module
 
     chunk = pinyin_module.PinyinChunk.from_pinyin_res("Bang1")
 
-    assert pinyin_module.PinyinChunk.casefold_str.func(chunk) == "bang"
+    assert chunk.casefold_str == "bang"
 
 
 def test_pinyin_sequence_uses_segmenter_and_pinyin_results(
@@ -40,11 +40,12 @@ def test_pinyin_sequence_uses_segmenter_and_pinyin_results(
     monkeypatch: "pytest.MonkeyPatch",
 ) -> None:
     """Menu sort data combines segmented Chinese output with literal segments."""
+    import pypinyin
     from nonebot_plugin_picmenu_next.data_source import pinyin as pinyin_module
 
     monkeypatch.setattr(pinyin_module, "_lcut", lambda _text: ["帮助", "Plugin"])
     monkeypatch.setattr(
-        pinyin_module,
+        pypinyin,
         "pinyin",
         lambda *_args, **_kwargs: [["bang1"], [pinyin_module._NotCHNStr("Plugin")]],  # noqa: SLF001
     )
@@ -53,3 +54,34 @@ def test_pinyin_sequence_uses_segmenter_and_pinyin_results(
 
     assert str(result) == "bang1 Plugin"
     assert result.casefold_str == "bang1 plugin"
+
+
+def test_compact_pinyin_sequence_keeps_chunk_order_semantics(
+    picmenu_plugin: object,
+) -> None:
+    """The packed sequence orders, indexes and prints like a list of chunks."""
+    from nonebot_plugin_picmenu_next.data_source.pinyin import (
+        PinyinChunk,
+        PinyinChunkSequence,
+    )
+
+    rows = [
+        [PinyinChunk(True, "bang", 1)],
+        [PinyinChunk(True, "bang", 1), PinyinChunk(False, "A")],
+        [PinyinChunk(True, "Bang", 3)],
+        [PinyinChunk(False, "Plugin")],
+        [PinyinChunk(True, "bang", 4)],
+        [],
+    ]
+    sequences = [PinyinChunkSequence(x) for x in rows]
+
+    assert sorted(sequences) == [PinyinChunkSequence(x) for x in sorted(rows)]
+    seq = sequences[1]
+    assert not hasattr(seq, "__dict__")
+    assert len(seq) == 2
+    assert seq[-1] == PinyinChunk(False, "A", 0)
+    assert seq[:1] == sequences[0]
+    assert list(seq) == rows[1]
+    assert str(seq) == "bang1 A"
+    assert seq.casefold_str == "bang1 a"
+    assert hash(seq) == hash(PinyinChunkSequence(rows[1]))
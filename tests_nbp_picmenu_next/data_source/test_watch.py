@@ -0,0 +1,179 @@
+"""Tests for external menu hot reload."""
+
+from pathlib import Path
+from types import SimpleNamespace
+from typing import TYPE_CHECKING
+
+from nonebot.plugin import PluginMetadata
+
+if TYPE_CHECKING:
+    import pytest
+
+
+async def test_external_menu_change_rebuilds_only_affected_plugins(
+    picmenu_plugin: object,
+    monkeypatch: "pytest.MonkeyPatch",
+    tmp_path: Path,
+) -> None:
+    """A changed menu file re-merges its plugin and leaves other infos untouched."""
+    from nonebot_plugin_picmenu_next import data_source
+    from nonebot_plugin_picmenu_next.config import config
+    from nonebot_plugin_picmenu_next.data_source import collect
+    from nonebot_plugin_picmenu_next.data_source.watch import ExternalMenuWatcher
+
+    external_dir = tmp_path / "external_infos"
+    external_dir.mkdir()
+    (external_dir / "b_plugin.json").write_text('{"name": "B"}', encoding="utf-8")
+    (external_dir / "c_plugin.json").write_text('{"name": "C"}', encoding="utf-8")
+    monkeypatch.setattr(collect, "external_infos_dir", external_dir)
+    monkeypatch.setattr(collect, "pm_menus_dir", tmp_path / "missing-legacy-dir")
+    monkeypatch.setattr(config, "info_cache", False)
+
+    plugins = [
+        SimpleNamespace(
+            id_=plugin_id,
+            module_name=plugin_id,
+            metadata=PluginMetadata(
+                name=plugin_id,
+                description=f"{plugin_id} description",
+                usage="usage",
+                extra={},
+            ),
+        )
+        for plugin_id in ("a_plugin", "b_plugin")
+    ]
+    monkeypatch.setattr(data_source, "_get_loaded_plugins", lambda: plugins)
+    infos = await data_source.refresh_infos()
+    assert [x.name for x in infos] == ["A Plugin", "B", "C"]
+    untouched = infos[0]
+
+    watcher = ExternalMenuWatcher()
+    watcher.reset()
+    assert watcher.poll() == {}
+
+    (external_dir / "b_plugin.json").write_text(
+        '{"name": "Z", "usage": "changed"}', encoding="utf-8"
+    )
+    (external_dir / "c_plugin.json").unlink()
+    (external_dir / "d_plugin.json").write_text('{"name": "D"}', encoding="utf-8")
+    changes = watcher.poll()
+
+    assert set(changes) == {"b_plugin", "c_plugin", "d_plugin"}
+    assert changes["c_plugin"] is None
+
+    updated = await data_source.apply_external_info_changes(changes)
+
+    assert [x.name for x in updated] == ["A Plugin", "D", "Z"]
+    assert updated[0] is untouched
+    assert updated[2].description == "b_plugin description"
+    assert updated[2].usage == "changed"
+    assert data_source.get_infos() is updated
+
+
+async def test_external_menu_change_without_collect_state_refreshes_fully(
+    picmenu_plugin: object,
+    monkeypatch: "pytest.MonkeyPatch",
+) -> None:
+    """Infos restored from the startup cache fall back to a full refresh."""
+    from nonebot_plugin_picmenu_next import data_source
+
+    calls: list[bool] = []
+
+    async def refresh(use_cache: bool = False) -> list[object]:
+        calls.append(use_cache)
+        return []
+
+    monkeypatch.setattr(data_source, "_collect_state", None)
+    monkeypatch.setattr(data_source, "refresh_infos", refresh)
+
+    assert await data_source.apply_external_info_changes({"x": None}) == []
+    assert calls == [False]
+
+
+def test_external_menu_bundle_change_reports_old_and_new_ids(
+    picmenu_plugin: object,
+    monkeypatch: "pytest.MonkeyPatch",
+    tmp_path: Path,
+) -> None:
+    """Editing a bundle affects every id it defined before or after the edit."""
+    from nonebot_plugin_picmenu_next.data_source import collect
+    from nonebot_plugin_picmenu_next.data_source.watch import ExternalMenuWatcher
+
+    external_dir = tmp_path / "external_infos"
+    external_dir.mkdir()
+    bundle = external_dir / "a.bundle.json"
+    bundle.write_text(
+        '{"infos": {"x": {"name": "X"}, "y": {"name": "Y"}}}', encoding="utf-8"
+    )
+    (external_dir / "y.json").write_text('{"name": "Y file"}', encoding="utf-8")
+    monkeypatch.setattr(collect, "external_infos_dir", external_dir)
+    monkeypatch.setattr(collect, "pm_menus_dir", tmp_path / "missing-legacy-dir")
+
+    watcher = ExternalMenuWatcher()
+    watcher.reset()
+
+    bundle.write_text('{"infos": {"x": {"name": "X2"}, "z": {}}}', encoding="utf-8")
+    changes = watcher.poll()
+
+    assert set(changes) == {"x", "y", "z"}
+    assert changes["x"] is not None
+    assert changes["x"].name == "X2"
+    assert changes["y"] is not None
+    assert changes["y"].name == "Y file"
+
+
+async def test_incremental_rebuilds_do_not_share_infos_with_collect_state(
+    picmenu_plugin: object,
+    monkeypatch: "pytest.MonkeyPatch",
+    tmp_path: Path,
+) -> None:
+    """Collect mixins editing items in place run on fresh copies for each rebuild."""
+    from typing import Any
+
+    from nonebot_plugin_picmenu_next import data_source
+    from nonebot_plugin_picmenu_next.config import config
+    from nonebot_plugin_picmenu_next.data_source import collect, mixin
+
+    async def exclaim(next_chain: Any, infos: list[Any]) -> list[Any]:
+        for info in infos:
+            for item in info.pm_data or ():
+                item.func += "!"
+        return await next_chain(infos)
+
+    external_dir = tmp_path / "external_infos"
+    external_dir.mkdir()
+    (external_dir / "a_plugin.json").write_text(
+        '{"funcs": [{"func": "f", "trigger_method": "m", "trigger_condition": "c",'
+        ' "brief_des": "b", "detail_des": "d"}]}',
+        encoding="utf-8",
+    )
+    monkeypatch.setattr(collect, "external_infos_dir", external_dir)
+    monkeypatch.setattr(collect, "pm_menus_dir", tmp_path / "missing-legacy-dir")
+    monkeypatch.setattr(config, "info_cache", False)
+    monkeypatch.setattr(
+        mixin.plugin_collect_mixins,
+        "data",
+        [mixin.MixinInfo(func=exclaim, priority=1, source=None)],
+    )
+
+    metadata = PluginMetadata(name="A", description="d", usage="u", extra={})
+    plugins = {
+        "a_plugin": SimpleNamespace(
+            id_="a_plugin", module_name="a_plugin", metadata=metadata
+        )
+    }
+    monkeypatch.setattr(data_source, "_get_loaded_plugins", lambda: plugins.values())
+    monkeypatch.setattr(data_source, "_get_plugin", plugins.get)
+
+    def func_names(snapshot: Any) -> list[str]:
+        return [x.func for x in snapshot.get("a_plugin").pm_data]
+
+    first = await data_source.refresh_infos()
+    second = await data_source.refresh_plugin_info("a_plugin")
+    third = await data_source.apply_external_info_changes({"b_plugin": None})
+    fourth = await data_source.refresh_plugin_info("a_plugin")
+
+    assert func_names(first) == ["f!"]
+    assert func_names(second) == ["f!"]
+    assert func_names(third) == ["f!"]
+    assert func_names(fourth) == ["f!"]
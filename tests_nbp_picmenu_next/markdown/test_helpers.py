@@ -72,6 +72,36 @@ def test_markdown_helpers_escape_and_render_math(
     assert "<span" in markdown.highlight_code("print(1)", "python", {})
 
 
+def test_code_highlighting_caches_lexers_outputs_and_skips_huge_blocks(
+    picmenu_plugin: object,
+    monkeypatch: "pytest.MonkeyPatch",
+) -> None:
+    """Lexer lookups, including unknown languages, and outputs are cached."""
+    import pygments.lexers
+    from nonebot_plugin_picmenu_next import markdown
+
+    lookups: list[str] = []
+    original = pygments.lexers.get_lexer_by_name
+
+    def counted(name: str) -> Any:
+        lookups.append(name)
+        return original(name)
+
+    monkeypatch.setattr(pygments.lexers, "get_lexer_by_name", counted)
+    markdown.get_lexer.cache_clear()
+    markdown.highlight_code_cached.cache_clear()
+
+    first = markdown.highlight_code("print(1)", "python", {})
+    assert markdown.highlight_code("print(1)", "python", {}) is first
+    assert "<span" in markdown.highlight_code("print(2)", "python", {})
+    assert markdown.highlight_code("<a>", "no-such-lang", {}) == "&lt;a&gt;"
+    assert markdown.highlight_code("<b>", "no-such-lang", {}) == "&lt;b&gt;"
+    assert lookups == ["python", "no-such-lang"]
+
+    monkeypatch.setattr(markdown, "HIGHLIGHT_MAX_CODE_LENGTH", 4)
+    assert markdown.highlight_code("print(3)", "python", {}) == "print(3)"
+
+
 def test_default_resource_processor_leaves_invalid_references_unchanged(
     picmenu_plugin: object,
     monkeypatch: "pytest.MonkeyPatch",
@@ -92,6 +122,47 @@ def test_default_resource_processor_leaves_invalid_references_unchanged(
     assert processor(info, "plugin:missing,file.txt") == "plugin:missing,file.txt"
 
 
+def test_resource_resolution_is_cached_until_prp_caches_are_cleared(
+    picmenu_plugin: object,
+    monkeypatch: "pytest.MonkeyPatch",
+    tmp_path: Path,
+) -> None:
+    """Warm plugin: references skip lookups, including unresolvable paths.
+
+    The transformer still runs per reference, so it can see the file change.
+    """
+    from nonebot_plugin_picmenu_next import markdown
+
+    (tmp_path / "asset.txt").write_text("asset", encoding="utf-8")
+    plugin = SimpleNamespace(module=SimpleNamespace(__path__=[str(tmp_path)]))
+    lookups: list[str] = []
+
+    def get_plugin(plugin_id: str) -> Any:
+        lookups.append(plugin_id)
+        return plugin
+
+    transformed: list[str] = []
+
+    def transformer(path: str, *_args: object) -> str:
+        transformed.append(path)
+        return f"/res/{path}"
+
+    monkeypatch.setattr(markdown, "get_plugin", get_plugin)
+    processor = markdown.build_default_prp_processor(transformer)
+    info = _make_info()
+
+    for _ in range(2):
+        assert processor(info, "plugin:self,asset.txt") == "/res/asset.txt"
+        assert processor(info, "plugin:self,missing.txt") == "plugin:self,missing.txt"
+    assert lookups == ["test_plugin", "test_plugin"]
+    assert transformed == ["asset.txt", "asset.txt"]
+
+    (tmp_path / "missing.txt").write_text("late", encoding="utf-8")
+    markdown.clear_prp_caches()
+    assert processor(info, "plugin:self,missing.txt") == "/res/missing.txt"
+    assert len(lookups) == 3
+
+
 def test_b64_resource_transformer_reads_a_resolved_relative_path(
     picmenu_plugin: object,
     tmp_path: Path,
@@ -111,6 +182,43 @@ def test_b64_resource_transformer_reads_a_resolved_relative_path(
     assert result == "data:text/plain;base64,YXNzZXQ="
 
 
+def test_b64_resource_transformer_caches_by_stat_and_falls_back_when_large(
+    picmenu_plugin: object,
+    monkeypatch: "pytest.MonkeyPatch",
+    tmp_path: Path,
+) -> None:
+    """Data URLs are reused until the file changes; large files use the route."""
+    import os
+
+    from nonebot_plugin_picmenu_next import markdown
+
+    cache = markdown.ResourceB64Cache()
+    monkeypatch.setattr(markdown, "resource_b64_cache", cache)
+    monkeypatch.setattr(markdown.config, "resource_b64_max_size", 8)
+    asset = tmp_path / "asset.txt"
+    asset.write_text("asset", encoding="utf-8")
+    info = _make_info()
+    plugin = cast("Any", SimpleNamespace())
+
+    def transform(path: str) -> str:
+        return markdown.b64_prp_transformer(path, tmp_path, info, plugin)
+
+    assert transform("asset.txt") == "data:text/plain;base64,YXNzZXQ="
+    assert transform("asset.txt") == "data:text/plain;base64,YXNzZXQ="
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert cache.size == len("data:text/plain;base64,YXNzZXQ=")
+
+    stat = asset.stat()
+    asset.write_text("other", encoding="utf-8")
+    os.utime(asset, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert transform("asset.txt") == "data:text/plain;base64,b3RoZXI="
+    assert cache.misses == 2
+
+    (tmp_path / "large.txt").write_text("0123456789", encoding="utf-8")
+    assert transform("large.txt").startswith("/local-file?path=")
+    assert len(cache.items) == 2
+
+
 def test_plugin_self_resource_uses_the_rendered_plugin_root(
     picmenu_plugin: object,
     monkeypatch: "pytest.MonkeyPatch",
@@ -172,3 +280,33 @@ def test_explicit_cross_plugin_resource_uses_named_plugin_root(
     result = processor(_make_info(), "plugin:target,asset.txt")
 
     assert result == "target"
+
+
+def test_cached_markdown_renders_resolve_resource_paths_every_time(
+    picmenu_plugin: object,
+    monkeypatch: "pytest.MonkeyPatch",
+) -> None:
+    """The render cache keeps resource paths out, the processor runs per render."""
+    from nonebot_plugin_picmenu_next import markdown
+
+    cache = markdown.MarkdownRenderCache()
+    monkeypatch.setattr(markdown, "md_render_cache", cache)
+    urls = iter(["/a?x=1&y=2", "/b", "/c", "/d"])
+    calls: list[str] = []
+
+    def prp(_info: "PMNPluginInfo", path: str) -> str:
+        calls.append(path)
+        return next(urls)
+
+    info = _make_info()
+    source = '![img](plugin:self,a.png)\n\n<img src="plugin:self,b.png">'
+
+    first = markdown.render_markdown(source, info, prp)
+    assert 'src="/a?x=1&amp;y=2"' in first
+    assert 'src="/b"' in first
+    second = markdown.render_markdown(source, info, prp)
+    assert 'src="/c"' in second
+    assert 'src="/d"' in second
+    assert calls == ["plugin:self,a.png", "plugin:self,b.png"] * 2
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert "plugin:self,a.png" in markdown.render_markdown(source, info)
@@ -146,6 +146,54 @@ def test_plugin_resource_within_module_root_is_rendered(
     assert 'src="data:text/plain;base64,bG9nbw=="' in result
 
 
+def test_changed_plugin_resource_is_reencoded(
+    picmenu_plugin: object,
+    monkeypatch: "pytest.MonkeyPatch",
+    tmp_path: Path,
+) -> None:
+    """Only the resolved path is cached, edits to the file show up on next render."""
+    module_root = tmp_path / "plugin"
+    module_root.mkdir()
+    logo = module_root / "logo.txt"
+    logo.write_text("logo", encoding="utf-8")
+    processor = _make_default_prp_processor(module_root, monkeypatch)
+    info = _make_info()
+
+    assert processor(info, "plugin:self,logo.txt") == "data:text/plain;base64,bG9nbw=="
+    logo.write_text("new logo", encoding="utf-8")
+    assert (
+        processor(info, "plugin:self,logo.txt") == "data:text/plain;base64,bmV3IGxvZ28="
+    )
+    logo.unlink()
+    assert processor(info, "plugin:self,logo.txt") == "plugin:self,logo.txt"
+
+
+def test_cached_markdown_render_picks_up_changed_plugin_resource(
+    picmenu_plugin: object,
+    monkeypatch: "pytest.MonkeyPatch",
+    tmp_path: Path,
+) -> None:
+    """A warm markdown render re-encodes a resource edited since the last one."""
+    from nonebot_plugin_picmenu_next import markdown
+
+    cache = markdown.MarkdownRenderCache()
+    monkeypatch.setattr(markdown, "md_render_cache", cache)
+    module_root = tmp_path / "plugin"
+    module_root.mkdir()
+    logo = module_root / "logo.txt"
+    logo.write_text("logo", encoding="utf-8")
+    processor = _make_default_prp_processor(module_root, monkeypatch)
+    info = _make_info()
+    source = "![alt](plugin:self,logo.txt)"
+
+    first = markdown.render_markdown(source, info, processor)
+    assert 'src="data:text/plain;base64,bG9nbw=="' in first
+    logo.write_text("new logo", encoding="utf-8")
+    second = markdown.render_markdown(source, info, processor)
+    assert 'src="data:text/plain;base64,bmV3IGxvZ28="' in second
+    assert cache.hits == 1
+
+
 def test_missing_plugin_resource_is_unchanged(
     picmenu_plugin: object,
     monkeypatch: "pytest.MonkeyPatch",
@@ -1,5 +1,10 @@
 """Tests for templates.jj_utils."""
 
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import pytest
+
 
 def test_jinja_render_helpers_support_markdown_and_legacy_layout(
     picmenu_plugin: object,
@@ -28,3 +33,113 @@ def test_legacy_rich_text_renders_and_malformed_content_falls_back_safely(
     assert "color: red" in valid
     assert "legacy" in valid
     assert str(layout(malformed)) == str(safe_layout(malformed))
+
+
+def test_markdown_renders_are_cached_by_source_and_environment(
+    picmenu_plugin: object,
+    monkeypatch: "pytest.MonkeyPatch",
+) -> None:
+    """Repeated Markdown renders hit the byte-bounded LRU cache."""
+    from nonebot_plugin_picmenu_next import markdown
+    from nonebot_plugin_picmenu_next.data_source.models import PMNPluginInfo
+    from nonebot_plugin_picmenu_next.templates.jj_utils import build_base_render_kwargs
+
+    cache = markdown.MarkdownRenderCache(max_bytes=120)
+    monkeypatch.setattr(markdown, "md_render_cache", cache)
+
+    def prp(_info: PMNPluginInfo, path: str) -> str:
+        return path.replace("plugin:self,", "/self/")
+
+    info = PMNPluginInfo(name="plugin", plugin_id="plugin")
+    render = build_base_render_kwargs(info, prp)["markdown"]
+    image = "![img](plugin:self,a.png)"
+
+    first = render(image)
+    assert render(image) == first
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    other_info = PMNPluginInfo(name="other", plugin_id="other")
+    assert build_base_render_kwargs(other_info, prp)["markdown"](image) == first
+    assert "plugin:self" in str(build_base_render_kwargs(info)["markdown"](image))
+    assert (cache.hits, cache.misses) == (1, 3)
+    assert cache.size <= cache.max_bytes
+    assert len(cache.items) < 3
+
+    render("x" * 200)
+    assert cache.size <= cache.max_bytes
+    assert ("x" * 200, "plugin", prp, markdown.get_md()) not in cache.items
+
+
+def test_layout_inserts_prerendered_fragments_without_parsing(
+    picmenu_plugin: object,
+    monkeypatch: "pytest.MonkeyPatch",
+) -> None:
+    """Prerendered fragments respect `pmn.markdown` and skip per-render parsing."""
+    from nonebot_plugin_picmenu_next.data_source.models import (
+        PMDataItem,
+        PMNData,
+        PMNPluginInfo,
+    )
+    from nonebot_plugin_picmenu_next.templates import jj_utils
+
+    info = PMNPluginInfo(
+        name="plugin",
+        plugin_id="plugin",
+        description="**desc**",
+        pmn=PMNData(markdown=False),
+        pm_data=[
+            PMDataItem(
+                func="func",
+                trigger_method="<ft color=red>cmd</ft>",
+                trigger_condition="condition",
+                brief_des="brief",
+                detail_des="detail",
+            ),
+        ],
+    )
+    fragments = jj_utils.build_fragments([info])
+
+    assert fragments["**desc**", False, None] == fragments["**desc**", False, "plugin"]
+    assert "<strong>" not in fragments["**desc**", False, "plugin"]
+    assert "color: red" in fragments["<ft color=red>cmd</ft>", False, "plugin"]
+
+    def fail(*_args: object) -> None:
+        raise AssertionError("fragments should be reused")
+
+    monkeypatch.setattr(jj_utils, "render_markdown", fail)
+    monkeypatch.setattr(jj_utils, "transform_ft", fail)
+    layout = jj_utils.build_base_render_kwargs(info, fragments=fragments)["layout"]
+    assert (
+        layout("<ft color=red>cmd</ft>")
+        is fragments["<ft color=red>cmd</ft>", False, "plugin"]
+    )
+    assert layout("detail") is fragments["detail", False, "plugin"]
+
+
+def test_prerendered_markdown_fragments_resolve_resource_paths_on_use(
+    picmenu_plugin: object,
+    monkeypatch: "pytest.MonkeyPatch",
+) -> None:
+    """Fragments keep resource paths unresolved, layout resolves them each time."""
+    from nonebot_plugin_picmenu_next import markdown
+    from nonebot_plugin_picmenu_next.data_source.models import PMNData, PMNPluginInfo
+    from nonebot_plugin_picmenu_next.templates import jj_utils
+
+    monkeypatch.setattr(markdown, "md_render_cache", markdown.MarkdownRenderCache())
+    urls = iter(["/first.png", "/second.png"])
+
+    def prp(_info: PMNPluginInfo, _path: str) -> str:
+        return next(urls)
+
+    info = PMNPluginInfo(
+        name="plugin",
+        plugin_id="plugin",
+        usage="![img](plugin:self,a.png)",
+        pmn=PMNData(markdown=True),
+    )
+    fragments = jj_utils.build_fragments([info], prp)
+    assert isinstance(fragments[info.usage, True, "plugin"], markdown.RenderedMarkdown)
+
+    layout = jj_utils.build_base_render_kwargs(info, prp, fragments)["layout"]
+    assert 'src="/first.png"' in layout(info.usage, True)
+    assert 'src="/second.png"' in layout(info.usage, True)
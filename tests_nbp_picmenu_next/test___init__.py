@@ -3,6 +3,8 @@
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
+    from pathlib import Path
+
     import pytest
 
 
@@ -13,14 +15,73 @@ async def test_startup_refreshes_plugin_information(
     """The registered startup hook refreshes PicMenu's plugin information once."""
     import nonebot_plugin_picmenu_next as plugin
 
-    calls: list[str] = []
+    calls: list[bool] = []
 
-    async def refresh() -> list[object]:
-        calls.append("refresh")
+    async def refresh(use_cache: bool = False) -> list[object]:
+        calls.append(use_cache)
         return []
 
     monkeypatch.setattr(plugin, "refresh_infos", refresh)
+    monkeypatch.setattr(plugin.config, "info_cache", True)
 
     await plugin._()
 
-    assert calls == ["refresh"]
+    assert calls == [True]
+
+
+# cumulative `python -X importtime` cost of requiring the plugin, in microseconds
+IMPORT_TIME_BUDGET_US = 600_000
+
+LAZY_IMPORTED_MODULES = {
+    "jieba",
+    "jieba_fast",
+    "markdown_it",
+    "mdit_py_plugins",
+    "pygments",
+    "pypinyin",
+    "rjieba",
+    "spacy_pkuseg",
+    "thefuzz",
+}
+
+IMPORT_SCRIPT = """
+import sys
+
+import nonebot
+
+nonebot.init(
+    localstore_cache_dir=sys.argv[1],
+    localstore_config_dir=sys.argv[1],
+    localstore_data_dir=sys.argv[1],
+)
+sys.stderr.write("PMN-IMPORT-START\\n")
+sys.stderr.flush()
+nonebot.require("nonebot_plugin_picmenu_next")
+"""
+
+
+def test_plugin_import_stays_within_import_time_budget(tmp_path: "Path") -> None:
+    """Requiring the plugin defers heavy dependencies and stays within budget."""
+    import re
+    import subprocess
+    import sys
+
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", IMPORT_SCRIPT, str(tmp_path)],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    _, _, output = proc.stderr.partition("PMN-IMPORT-START")
+
+    total = 0
+    imported: set[str] = set()
+    for line in output.splitlines():
+        if not (m := re.match(r"import time:\s+\d+ \|\s+(\d+) \|( *)(\S+)", line)):
+            continue
+        imported.add(m[3].partition(".")[0])
+        if len(m[2]) == 1:
+            total += int(m[1])
+
+    assert not (imported & LAZY_IMPORTED_MODULES)
+    assert total < IMPORT_TIME_BUDGET_US, f"plugin import took {total}us"